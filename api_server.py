@@ -0,0 +1,431 @@
+"""Local HTTP/JSON API over the notes, reminders and GPA data.
+
+Other tools on the same machine can query and update the Student Assistant
+data without the Tk UI:
+
+    GET    /notes/search?q=...          notes matching a query (folder:/tag: filters work)
+    GET    /notes/filter?tags=...       notes matching a tag filter ("Work AND NOT Personal")
+    GET    /notes/tags                  tag names with note counts
+    GET    /notes/folders               folder names with note counts
+    GET    /notes/<id>                  one note
+    POST   /notes                       {"folder", "title", "content"?} -> new note
+    PUT    /notes/<id>                  {"content"} -> updated note
+    GET    /reminders                   every reminder
+    POST   /reminders                   {"title", "message"?, "date", "time", "repeat"?}
+    GET    /reminders/<id>              one reminder
+    PUT    /reminders/<id>              any of the POST fields
+    DELETE /reminders/<id>
+    GET    /gpa                         GPA statistics
+    GET    /gpa/courses                 every course
+    POST   /gpa/courses                 {"name", "grade", "credits", "scale"?, "student"?, "term"?}
+    GET    /gpa/students                student names ("" is the app's own user)
+    GET    /gpa/students/<student>      term and cumulative GPA for one student
+
+Usage: python api_server.py [--host 127.0.0.1] [--port 8765]
+
+The server runs on one asyncio loop in front of the headless services, so
+every read is served from memory: the data files are only read at start-up
+and only written by updates. Encoded GET responses are also cached, in a
+bounded LRU, until a write to the same data set. Connections are HTTP/1.1 keep-alive, and
+pipelined requests are answered in order. While it runs the server owns the
+data files, like the app does, so don't run both on the same data at once.
+"""
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Dict, List, Tuple, Any, Optional
+from urllib.parse import urlsplit, parse_qs, unquote
+from gpa_service import CourseService
+from notes_service import NotesService
+from reminder_service import ReminderService
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Limits on one request
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_SECONDS = 15
+# How often reminders the scheduler found due are fired (rescheduled or dropped)
+DUE_POLL_SECONDS = 1.0
+# Encoded GET responses kept; the least recently used are dropped beyond this
+MAX_CACHED_RESPONSES = 256
+
+
+class HTTPError(Exception):
+    """An error answered with an HTTP status and a JSON message"""
+    def __init__(self, status: HTTPStatus, message: Optional[str] = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class ResponseCache:
+    """Encoded GET responses, grouped by the data set they were built from.
+
+    A write to a data set drops that set's entries, so cached responses are
+    never stale and repeated reads skip both the services and JSON encoding.
+    At most ``max_entries`` are kept, least recently used first out, since
+    every distinct query string is a target of its own.
+    """
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        # Using OrderedDict as an LRU: (data set, request target) -> body, oldest first
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def get(self, dataset: str, target: str) -> Optional[bytes]:
+        body = self._entries.get((dataset, target))
+        if body is not None:
+            self._entries.move_to_end((dataset, target))
+        return body
+
+    def put(self, dataset: str, target: str, body: bytes) -> None:
+        self._entries[(dataset, target)] = body
+        self._entries.move_to_end((dataset, target))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, dataset: str) -> None:
+        for key in [key for key in self._entries if key[0] == dataset]:
+            del self._entries[key]
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def _require(body: Dict[str, Any], *fields: str) -> None:
+    missing = [field for field in fields if field not in body]
+    if missing:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Missing field(s): {', '.join(missing)}")
+
+
+def _optional_str(body: Dict[str, Any], field: str) -> Optional[str]:
+    """A field as a string, or None if it is absent or null"""
+    value = body.get(field)
+    return None if value is None else str(value)
+
+
+class APIServer:
+    """Routes JSON requests to the course, reminder and notes services"""
+    def __init__(self, courses: Optional[CourseService] = None, reminders: Optional[ReminderService] = None,
+                 notes: Optional[NotesService] = None):
+        self.courses = courses if courses is not None else CourseService()
+        self.reminders = reminders if reminders is not None else ReminderService()
+        self.notes = notes if notes is not None else NotesService()
+        self.cache = ResponseCache()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._due_task: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        # Loading the index can re-index many notes; do it before serving rather than in the first search
+        self.notes.load_search_index()
+        self.reminders.start_scheduler()
+        self._due_task = asyncio.create_task(self._fire_due_reminders())
+        self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                  limit=MAX_HEADER_BYTES)
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections and flush every service to disk"""
+        if self._due_task is not None:
+            self._due_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for service in (self.courses, self.reminders, self.notes):
+            service.close()
+
+    async def _fire_due_reminders(self) -> None:
+        # The scheduler thread only queues ids; firing happens on the loop like every other write
+        while True:
+            await asyncio.sleep(DUE_POLL_SECONDS)
+            due = self.reminders.take_due()
+            if due and self.reminders.fire_reminders(due)[0]:
+                self.cache.invalidate("reminders")
+
+#==================================================
+# HTTP
+#==================================================
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests from one connection in order until it closes"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_SECONDS)
+                except HTTPError as e:
+                    writer.write(self._response(e.status, _encode({"error": str(e)}), keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = self.handle(method, target, body)
+                keep_alive = self._keep_alive(headers)
+                writer.write(self._response(status, payload, keep_alive, head=method == "HEAD"))
+                # Pipelined requests are already buffered; drain only applies back-pressure
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return None
+            header_lines = []
+            while (line := await reader.readline()) not in (b"\r\n", b"\n"):
+                if not line:
+                    return None
+                header_lines.append(line)
+                if len(header_lines) > 100:
+                    raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        except (asyncio.LimitOverrunError, ValueError):
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {"_version": version}
+        for line in header_lines:
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Send a Content-Length instead of chunks")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if not 0 <= length <= MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _keep_alive(headers: Dict[str, str]) -> bool:
+        connection = headers.get("connection", "").lower()
+        if headers["_version"] == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @staticmethod
+    def _response(status: HTTPStatus, body: bytes, keep_alive: bool, head: bool = False) -> bytes:
+        head_lines = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                      f"Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head_lines.encode("latin-1") + (b"" if head else body)
+
+#==================================================
+# Routing
+#==================================================
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, bytes]:
+        """Answer one request with (status, encoded JSON body)"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        dataset = parts[0] if parts else ""
+        read = method in ("GET", "HEAD")
+        if read:
+            cached = self.cache.get(dataset, target)
+            if cached is not None:
+                return HTTPStatus.OK, cached
+        try:
+            data = self._parse_body(body) if body else {}
+            status, payload = self._route(method if not read else "GET", parts, parse_qs(url.query), data)
+        except HTTPError as e:
+            return e.status, _encode({"error": str(e)})
+        except ValueError as e:
+            # The services raise ValueError with a user-facing message
+            return HTTPStatus.BAD_REQUEST, _encode({"error": str(e)})
+        except Exception as e:
+            # Answer instead of dropping the connection, and log it like other background errors
+            print(f"Error handling {method} {target}: {e!r}")
+            if not read:
+                # The write may have got partway, so cached reads can no longer be trusted
+                self.cache.invalidate(dataset)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, _encode({"error": "Internal server error"})
+
+        encoded = _encode(payload)
+        if read and status == HTTPStatus.OK:
+            self.cache.put(dataset, target, encoded)
+        elif not read:
+            self.cache.invalidate(dataset)
+        return status, encoded
+
+    @staticmethod
+    def _parse_body(body: bytes) -> Dict[str, Any]:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return data
+
+    def _route(self, method: str, parts: List[str], query: Dict[str, List[str]],
+               body: Dict[str, Any]) -> Tuple[HTTPStatus, Any]:
+        # Using match statement on (method, path) for routing
+        match method, parts:
+            case "GET", ["notes", "search"]:
+                return HTTPStatus.OK, self._search_notes(query)
+            case "GET", ["notes", "filter"]:
+                return HTTPStatus.OK, self._filter_notes(query)
+            case "GET", ["notes", "tags"]:
+                return HTTPStatus.OK, self.notes.tag_counts()
+            case "GET", ["notes", "folders"]:
+                return HTTPStatus.OK, {folder: self.notes.note_count(folder) for folder in self.notes.folders()}
+            case "GET", ["notes", note_id]:
+                folder, position = self._locate_note(note_id)
+                return HTTPStatus.OK, {"folder": folder, **self.notes.note(folder, position)}
+            case "POST", ["notes"]:
+                return HTTPStatus.CREATED, self._create_note(body)
+            case "PUT", ["notes", note_id]:
+                _require(body, "content")
+                folder, position = self._locate_note(note_id)
+                formats = self.notes.note(folder, position).get("formats", [])
+                return HTTPStatus.OK, self.notes.update_note(folder, position, str(body["content"]), formats)
+
+            case "GET", ["reminders"]:
+                return HTTPStatus.OK, self.reminders.get_reminders()
+            case "GET", ["reminders", reminder_id]:
+                return HTTPStatus.OK, self.reminders.get_reminders()[self._reminder_index(reminder_id)]
+            case "POST", ["reminders"]:
+                _require(body, "title", "date", "time")
+                when = self.reminders.parse_reminder_time(str(body["date"]), str(body["time"]))
+                reminder = self.reminders.add_reminder(str(body["title"]), str(body.get("message", "")),
+                                                       when, str(body.get("repeat", "none")))
+                return HTTPStatus.CREATED, reminder
+            case "PUT", ["reminders", reminder_id]:
+                return HTTPStatus.OK, self._update_reminder(self._reminder_index(reminder_id), body)
+            case "DELETE", ["reminders", reminder_id]:
+                self.reminders.delete_reminders([self._reminder_index(reminder_id)])
+                return HTTPStatus.OK, {"deleted": reminder_id}
+
+            case "GET", ["gpa"]:
+                return HTTPStatus.OK, self.courses.get_statistics()
+            case "GET", ["gpa", "courses"]:
+                return HTTPStatus.OK, self.courses.get_courses()
+            case "POST", ["gpa", "courses"]:
+                _require(body, "name", "grade", "credits")
+                course = self.courses.create_course(str(body["name"]), str(body["grade"]), body["credits"],
+                                                    str(body.get("scale", "4.0")), str(body.get("student", "")),
+                                                    str(body.get("term", "")))
+                return HTTPStatus.CREATED, course
+            case "GET", ["gpa", "students"]:
+                return HTTPStatus.OK, self.courses.students()
+            case "GET", ["gpa", "students", student]:
+                return HTTPStatus.OK, self._student_summary(student)
+
+            case _, [("notes" | "reminders" | "gpa"), *_]:
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED if method in ("GET", "POST", "PUT", "DELETE")
+                                else HTTPStatus.NOT_IMPLEMENTED)
+            case _:
+                raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    def _search_notes(self, query: Dict[str, List[str]]) -> List[Dict[str, str]]:
+        text = query.get("q", [""])[0]
+        if not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing query parameter 'q'")
+        try:
+            limit = int(query.get("limit", ["50"])[0])
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid limit")
+        return [{"id": note_id, "folder": folder, "title": title}
+                for note_id, folder, title in self.notes.search(text, limit=limit)]
+
+    def _filter_notes(self, query: Dict[str, List[str]]) -> List[Dict[str, str]]:
+        tags = query.get("tags", [""])[0]
+        if not tags.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing query parameter 'tags'")
+        return [{"id": note_id, "folder": folder, "title": title}
+                for note_id, folder, title in self.notes.filter_notes(tags)]
+
+    def _locate_note(self, note_id: str) -> Tuple[str, int]:
+        location = self.notes.locate_note(note_id)
+        if location is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No note with id '{note_id}'")
+        return location
+
+    def _create_note(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        _require(body, "folder", "title")
+        folder, title = str(body["folder"]), str(body["title"]).strip()
+        if folder not in self.notes.folders():
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No folder named '{folder}'")
+        if not title:
+            raise ValueError("Title required")
+        note = self.notes.create_note(folder, title)
+        if body.get("content"):
+            note = self.notes.update_note(folder, len(self.notes.folder_notes(folder)) - 1, str(body["content"]))
+        return note
+
+    def _reminder_index(self, reminder_id: str) -> int:
+        index = self.reminders.find_reminder(reminder_id)
+        if index is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No reminder with id '{reminder_id}'")
+        return index
+
+    def _update_reminder(self, index: int, body: Dict[str, Any]) -> Dict[str, Any]:
+        when = None
+        if "date" in body or "time" in body:
+            current = self.reminders.get_reminders()[index]["time"].split()
+            when = self.reminders.parse_reminder_time(str(body.get("date", current[0])),
+                                                      str(body.get("time", current[1])))
+        return self.reminders.update_reminder(
+            index, title=_optional_str(body, "title"), message=_optional_str(body, "message"), when=when,
+            repeat=_optional_str(body, "repeat"))
+
+    def _student_summary(self, student: str) -> Dict[str, Any]:
+        terms = self.courses.term_summary(student)
+        if not terms:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No courses for student '{student}'")
+        return {
+            "student": student,
+            "cumulative_gpa": self.courses.cumulative_gpa(student),
+            "terms": [{"term": term, "gpa": totals.gpa, "credits": totals.credits, "courses": totals.courses,
+                       "cumulative_gpa": cumulative, "deans_list": deans_list}
+                      for term, totals, cumulative, deans_list in terms],
+        }
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    server = APIServer()
+    await server.start(host, port)
+    print(f"Student Assistant API on http://{host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,1158 @@
+import atexit
+import hashlib
 import json
 import os
-from typing import List, Dict, Any
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterator, Callable
 from abc import ABC, abstractmethod
 
-class BaseApp(ABC):
+# A change is ("set", path, value) or ("del", path) where path is a tuple of
+# dict keys / list indices leading from the top of the document.
+Change = Tuple[Any, ...]
+
+#==================================================
+# Storage backends
+#==================================================
+class StorageBackend(ABC):
+    """Interface for the persistence engines used by BaseApp"""
     def __init__(self, filename: str):
         self.filename = filename
 
-    def save_data(self, data: List[Dict[str, Any]]) -> None:
-        """Save data to JSON file with error handling"""
+    @abstractmethod
+    def load(self) -> Any:
+        """Return the stored document, or None if nothing was saved yet"""
+        pass
+
+    @abstractmethod
+    def save(self, data: Any) -> None:
+        """Persist the whole document"""
+        pass
+
+    def apply(self, data: Any, changes: Sequence[Change]) -> None:
+        """Persist only the given changes (defaults to a full save)"""
+        self.save(data)
+
+    def load_note_body(self, note: Dict[str, Any]) -> None:
+        """Fill in content/formats of a note loaded without them (no-op by default)"""
+        pass
+
+    def export(self, data: Any) -> Any:
+        """Return ``data`` as plain JSON-serialisable objects"""
+        return data
+
+    def flush(self) -> None:
+        """Block until everything written so far is on disk"""
+        pass
+
+    def close(self) -> None:
+        """Release files and background workers"""
+        self.flush()
+
+
+#==================================================
+# Write pipeline
+#==================================================
+# Saves to the same target within this window collapse into one disk write
+DEFAULT_DEBOUNCE_SECONDS = 0.25
+
+def match_permissions(tmp_filename: str, filename: str) -> None:
+    """Give a temp file the permissions a plain open() of ``filename`` would.
+
+    mkstemp creates files owner-only, so a file renamed over ``filename``
+    would otherwise lose its mode.
+    """
+    if os.path.exists(filename):
+        os.chmod(tmp_filename, stat.S_IMODE(os.stat(filename).st_mode))
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_filename, 0o666 & ~umask)
+
+
+def atomic_write_json(filename: str, data: Any, indent: Optional[int] = 4) -> None:
+    """Write JSON to a temp file, fsync it and rename it over ``filename``"""
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.", suffix=".tmp",
+                                        dir=folder)
+    try:
+        match_permissions(tmp_filename, filename)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    # Make the rename itself durable (not supported on Windows)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=4)
-        except IOError as e:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_json(filename: str) -> Any:
+    """Read a JSON file, moving it aside instead of letting a save overwrite it if corrupt"""
+    if not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, 'r') as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        corrupt_filename = f"{filename}.corrupt-{time.strftime('%Y%m%d_%H%M%S')}"
+        os.replace(filename, corrupt_filename)
+        print(f"{filename} is corrupt, moved it to {corrupt_filename}")
+        raise
+
+
+class BackgroundWriter:
+    """Single daemon thread that runs debounced write jobs off the Tk thread.
+
+    Jobs are keyed by their target: submitting a job for a key that is still
+    waiting replaces it but keeps the original deadline, so a burst of saves
+    becomes one write at most ``delay`` seconds after the first of them.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: Dict[Any, Tuple[float, Callable[[], None]]] = {}
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: Any, job: Callable[[], None], delay: float = DEFAULT_DEBOUNCE_SECONDS) -> None:
+        with self._cond:
+            deadline = self._pending[key][0] if key in self._pending else time.monotonic() + delay
+            self._pending[key] = (deadline, job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, (deadline, _) in self._pending.items() if deadline <= now]
+                    if due:
+                        break
+                    timeout = (min(deadline for deadline, _ in self._pending.values()) - now
+                               if self._pending else None)
+                    self._cond.wait(timeout)
+                jobs = [self._pending.pop(key)[1] for key in due]
+                self._busy = True
+            for job in jobs:
+                try:
+                    job()
+                except Exception as e:
+                    print(f"Background write failed: {e}")
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Run every pending job now and wait until they are done"""
+        if threading.current_thread() is self._thread:
+            return
+        with self._cond:
+            self._pending = {key: (0.0, job) for key, (_, job) in self._pending.items()}
+            self._cond.notify_all()
+            while self._pending or self._busy:
+                self._cond.wait()
+
+
+_background_writer = BackgroundWriter()
+atexit.register(_background_writer.flush)
+
+
+class JsonStorage(StorageBackend):
+    """Plain JSON document, rewritten atomically by the background writer"""
+    def __init__(self, filename: str, debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+                 writer: Optional[BackgroundWriter] = None):
+        super().__init__(filename)
+        self.debounce = debounce
+        self._writer = writer or _background_writer
+
+    def load(self) -> Any:
+        self.flush()
+        return read_json(self.filename)
+
+    def save(self, data: Any) -> None:
+        self._writer.submit(self.filename, lambda: self._write(data), self.debounce)
+
+    def _write(self, data: Any) -> None:
+        # The Tk thread may mutate ``data`` while we serialise it; it always
+        # queues another save afterwards, so just retry with the newer state
+        for _ in range(5):
+            try:
+                payload = json.loads(json.dumps(data))
+                break
+            except RuntimeError:
+                time.sleep(0.01)
+        else:
+            raise IOError(f"{self.filename} kept changing while being saved")
+        atomic_write_json(self.filename, payload)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+
+def apply_change(data: Any, change: Change) -> Any:
+    """Apply one change to a document in place and return the document"""
+    op, path = change[0], change[1]
+    if not path:
+        return change[2] if op == "set" else None
+
+    parent = data
+    for key in path[:-1]:
+        try:
+            parent = parent[key]
+        except (KeyError, IndexError, TypeError):
+            # Parent was removed by a later change, nothing to do
+            return data
+
+    key = path[-1]
+    match op:
+        case "set" if isinstance(parent, list):
+            if key < len(parent):
+                parent[key] = change[2]
+            elif key == len(parent):
+                parent.append(change[2])
+        case "set" if isinstance(parent, dict):
+            parent[key] = change[2]
+        case "del" if isinstance(parent, dict):
+            parent.pop(key, None)
+    return data
+
+
+# Compact separators; reused because building an encoder per record is costly
+_journal_encoder = json.JSONEncoder(separators=(",", ":"))
+# Start of an encoded "del" record
+DEL_RECORD_PREFIX = '{"op":"del"'
+
+
+class JournaledJsonStorage(StorageBackend):
+    """JSON snapshot plus an append-only journal of changes.
+
+    Saves only append the changed records to ``<filename>.journal``. Records
+    wait in memory for the debounce window, where a newer record for the same
+    path replaces the older one, and each batch is appended with one fsync.
+    Once the journal grows past ``compact_bytes`` (or the snapshot size, if
+    larger, to keep compaction cost proportional to writes) it is sealed and a background
+    thread folds the sealed segments into the snapshot. Changes only ever
+    assign or remove dict keys, so replaying a segment twice is harmless if we
+    crash between writing the snapshot and deleting the segment.
+    """
+    def __init__(self, filename: str, compact_bytes: int = 1024 * 1024,
+                 debounce: float = DEFAULT_DEBOUNCE_SECONDS, writer: Optional[BackgroundWriter] = None,
+                 indent: Optional[int] = 4):
+        super().__init__(filename)
+        self.journal_filename = f"{filename}.journal"
+        self.compact_bytes = compact_bytes
+        self.indent = indent
+        self.debounce = debounce
+        self._writer = writer or _background_writer
+        # _lock guards the queued records, _io_lock the journal files
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: Dict[Tuple, str] = {}
+        self._journal = None
+        self._journal_size = 0
+        self._snapshot_size = 0
+        self._compactor: Optional[threading.Thread] = None
+        # Whether a snapshot or journal exists (or is queued) for records to apply to
+        self._has_base = False
+
+    def _sealed_segments(self) -> List[str]:
+        """Sealed journal segments in the order they were written"""
+        folder = os.path.dirname(self.journal_filename) or "."
+        prefix = os.path.basename(self.journal_filename) + "."
+        segments = []
+        for name in os.listdir(folder):
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit():
+                segments.append((int(suffix), os.path.join(folder, name)))
+        return [path for _, path in sorted(segments)]
+
+    @staticmethod
+    def _replay(data: Any, journal_path: str) -> Any:
+        with open(journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write at the end of the journal
+                    break
+                change = (record["op"], tuple(record["path"]), record.get("value"))
+                if data is None and change[1]:
+                    raise IOError(f"{journal_path} changes {change[1]} but there is no document to change")
+                data = apply_change(data, change)
+        return data
+
+    def _truncate_torn_tail(self) -> None:
+        """Drop a half-written last record so new records start on a fresh line"""
+        if not os.path.exists(self.journal_filename):
+            return
+        with open(self.journal_filename, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(max(0, size - 1024 * 1024))
+            tail = f.read()
+            f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+
+    def load(self) -> Any:
+        self.flush()
+        with self._io_lock:
+            data = read_json(self.filename)
+            if os.path.exists(self.filename):
+                self._snapshot_size = os.path.getsize(self.filename)
+            for segment in self._sealed_segments():
+                data = self._replay(data, segment)
+            if os.path.exists(self.journal_filename):
+                data = self._replay(data, self.journal_filename)
+                self._journal_size = os.path.getsize(self.journal_filename)
+        if self._journal_size >= self._compact_threshold() or self._sealed_segments():
+            self._seal_and_compact()
+        return data
+
+    def save(self, data: Any) -> None:
+        self.apply(data, [("set", (), data)])
+
+    def _base_exists(self) -> bool:
+        if not self._has_base:
+            self._has_base = (os.path.exists(self.filename) or os.path.exists(self.journal_filename)
+                              or bool(self._sealed_segments()))
+        return self._has_base
+
+    def apply(self, data: Any, changes: Sequence[Change]) -> None:
+        if data is not None and not self._base_exists():
+            # Nothing on disk yet to apply records to, so write the whole document
+            changes = [("set", (), data)]
+        self._has_base = True
+        # Serialise now: the records must capture the values as of this save
+        records = []
+        for change in changes:
+            record = {"op": change[0], "path": list(change[1])}
+            if change[0] == "set":
+                record["value"] = change[2]
+            records.append((tuple(change[1]), _journal_encoder.encode(record) + "\n"))
+
+        with self._lock:
+            for path, line in records:
+                if not path:
+                    # A whole-document record supersedes everything queued before it
+                    self._pending.clear()
+                self._queue_record(path, line)
+        self._writer.submit(self.journal_filename, self._write_pending, self.debounce)
+
+    def _queue_record(self, path: Tuple, line: str) -> None:
+        """Queue a record, replacing any queued record for the same path.
+
+        The replacement keeps the old record's place, so a dict key is still
+        created where it was first queued and replays in the same key order.
+        It only moves to the end when a record for an ancestor path was
+        queued after it (that one must not overwrite the newer value) or
+        when it re-creates a key whose deletion is queued (the deletion stays
+        in front of it in the same slot). Records for descendant paths queued
+        after it are dropped, since the new value already contains them.
+        """
+        old_line = self._pending.get(path)
+        if old_line is None:
+            self._pending[path] = line
+            return
+        move = False
+        if old_line.startswith(DEL_RECORD_PREFIX) and not line.startswith(DEL_RECORD_PREFIX):
+            # A re-created key: its deletion still has to replay first, so the
+            # key ends up last like in the live dict
+            move = old_line.count("\n") == 1
+            line = old_line.split("\n", 1)[0] + "\n" + line
+        descendants = []
+        after = False
+        for queued in self._pending:
+            if queued == path:
+                after = True
+            elif after and len(queued) != len(path) and queued[:len(path)] == path:
+                descendants.append(queued)
+            elif after and len(queued) < len(path) and path[:len(queued)] == queued:
+                move = True
+                break
+        if move:
+            del self._pending[path]
+        else:
+            for queued in descendants:
+                del self._pending[queued]
+        self._pending[path] = line
+
+    def _write_pending(self) -> None:
+        """Writer thread: append the queued records with a single fsync"""
+        with self._lock:
+            if not self._pending:
+                return
+            payload = "".join(self._pending.values())
+            self._pending.clear()
+        with self._io_lock:
+            if self._journal is None:
+                self._truncate_torn_tail()
+                self._journal = open(self.journal_filename, 'a')
+            self._journal.write(payload)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_size += len(payload)
+            should_compact = self._journal_size >= self._compact_threshold()
+        if should_compact:
+            self._seal_and_compact()
+
+    def _compact_threshold(self) -> int:
+        return max(self.compact_bytes, self._snapshot_size)
+
+    def compact(self, wait: bool = False) -> None:
+        """Fold everything written so far into the snapshot in the background"""
+        self.flush()
+        compactor = self._seal_and_compact()
+        if wait and compactor is not None:
+            compactor.join()
+
+    def _seal_and_compact(self) -> Optional[threading.Thread]:
+        """Seal the active journal and start the compactor if it is not running"""
+        with self._io_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_filename):
+                segments = self._sealed_segments()
+                next_id = int(segments[-1].rsplit(".", 1)[1]) + 1 if segments else 1
+                os.replace(self.journal_filename, f"{self.journal_filename}.{next_id}")
+            self._journal_size = 0
+
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact_segments, daemon=True)
+                self._compactor.start()
+            return self._compactor
+
+    def _compact_segments(self) -> None:
+        """Background worker: merge sealed segments into the snapshot file"""
+        while True:
+            with self._io_lock:
+                segments = self._sealed_segments()
+                if not segments:
+                    self._compactor = None
+                    return
+            try:
+                data = read_json(self.filename)
+                for segment in segments:
+                    data = self._replay(data, segment)
+                # A load() racing with the rename just replays these segments twice
+                atomic_write_json(self.filename, data, self.indent)
+                with self._io_lock:
+                    self._snapshot_size = os.path.getsize(self.filename)
+                    for segment in segments:
+                        os.remove(segment)
+            except (IOError, OSError, json.JSONDecodeError) as e:
+                print(f"Journal compaction failed: {e}")
+                with self._io_lock:
+                    self._compactor = None
+                return
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self.flush()
+        with self._io_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+
+class LazyFolders(MutableMapping):
+    """Folder name -> notes list mapping that asks its loader for a folder on first access"""
+    def __init__(self, loader, names: Sequence[str]):
+        self._loader = loader
+        self._folders: Dict[str, Optional[List[Dict[str, Any]]]] = {name: None for name in names}
+
+    def __getitem__(self, name: str) -> List[Dict[str, Any]]:
+        notes = self._folders[name]
+        if notes is None:
+            notes = self._folders[name] = self._loader.load_folder(name)
+        return notes
+
+    def __setitem__(self, name: str, notes: List[Dict[str, Any]]) -> None:
+        self._folders[name] = notes
+
+    def __delitem__(self, name: str) -> None:
+        del self._folders[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._folders)
+
+    def __len__(self) -> int:
+        return len(self._folders)
+
+    def note_count(self, name: str) -> int:
+        """Number of notes in a folder without loading it"""
+        notes = self._folders[name]
+        return len(notes) if notes is not None else self._loader.count_folder(name)
+
+    def loaded_items(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Folders that have been loaded (and so may have been changed)"""
+        return [(name, notes) for name, notes in self._folders.items() if notes is not None]
+
+
+def folder_note_count(folders, name: str) -> int:
+    """Number of notes in a folder, without loading it when the mapping is lazy"""
+    if isinstance(folders, LazyFolders):
+        return folders.note_count(name)
+    return len(folders[name])
+
+
+def new_note_id() -> str:
+    """Return a fresh note id"""
+    return uuid.uuid4().hex
+
+
+# JSON data file -> SQLite dataset it migrates into
+JSON_DATASETS: Dict[str, str] = {
+    "gpa_data.json": "courses",
+    "reminder_data.json": "reminders",
+    "notes_data.json": "notes"
+}
+
+# Column layout of the list datasets; other keys are kept in the "extra" column
+ROW_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "courses": ("name", "grade", "credits", "points"),
+    "reminders": ("title", "message", "time", "repeat", "priority")
+}
+
+NOTE_COLUMNS = ("title", "images", "links", "created", "last_modified")
+JSON_NOTE_COLUMNS = ("images", "links")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS courses (
+    position INTEGER PRIMARY KEY, name TEXT, grade TEXT, credits REAL, points REAL, extra TEXT);
+CREATE TABLE IF NOT EXISTS reminders (
+    position INTEGER PRIMARY KEY, title TEXT, message TEXT, time TEXT, repeat TEXT,
+    priority TEXT, extra TEXT);
+CREATE TABLE IF NOT EXISTS folders (name TEXT PRIMARY KEY, position INTEGER);
+CREATE TABLE IF NOT EXISTS notes (
+    id TEXT PRIMARY KEY, folder TEXT, position INTEGER, title TEXT, content TEXT, formats TEXT,
+    images TEXT, links TEXT, created TEXT, last_modified TEXT, extra TEXT);
+CREATE INDEX IF NOT EXISTS notes_by_folder ON notes (folder, position);
+CREATE TABLE IF NOT EXISTS tags (name TEXT PRIMARY KEY, position INTEGER);
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id TEXT, tag TEXT, position INTEGER, PRIMARY KEY (note_id, tag));
+CREATE TABLE IF NOT EXISTS images (id TEXT PRIMARY KEY, path TEXT);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """One dataset ("courses", "reminders" or "notes") of a shared SQLite database.
+
+    Notes are loaded lazily: load() only reads folder names, tags and the image
+    map, a folder's note rows are read when the folder is first opened, and a
+    note's content and formats only when load_note_body() asks for them.
+    """
+    def __init__(self, filename: str, dataset: str, source_filename: Optional[str] = None):
+        super().__init__(filename)
+        self.dataset = dataset
+        self.source_filename = source_filename
+        self._lock = threading.RLock()
+        # Tk callbacks and the reminder thread both save through this connection
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+
+    def load(self) -> Any:
+        with self._lock:
+            if self.source_filename and not self._is_migrated():
+                migrate_json_to_sqlite(self.filename, {self.source_filename: self.dataset})
+            if self.dataset == "notes":
+                return self._load_notes()
+            return self._load_rows()
+
+    def save(self, data: Any) -> None:
+        self.apply(data, [("set", (), data)])
+
+    def apply(self, data: Any, changes: Sequence[Change]) -> None:
+        with self._lock, self._conn:
+            for change in changes:
+                if self.dataset == "notes":
+                    self._apply_notes_change(data, change)
+                else:
+                    self._apply_rows_change(data, change)
+
+    def export(self, data: Any) -> Any:
+        if self.dataset != "notes":
+            return data
+        folders = {}
+        for name in data["folders"]:
+            for note in data["folders"][name]:
+                self.load_note_body(note)
+            folders[name] = data["folders"][name]
+        return {**data, "folders": folders}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    # ----- migration bookkeeping -----
+    def _is_migrated(self) -> bool:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?",
+                                 (f"migrated:{self.dataset}",)).fetchone()
+        return row is not None
+
+    def mark_migrated(self, source: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               (f"migrated:{self.dataset}", source))
+
+    # ----- courses / reminders -----
+    def _load_rows(self) -> List[Dict[str, Any]]:
+        columns = ROW_COLUMNS[self.dataset]
+        rows = self._conn.execute(
+            f"SELECT {', '.join(columns)}, extra FROM {self.dataset} ORDER BY position")
+        items = []
+        for row in rows:
+            item = {col: row[col] for col in columns if row[col] is not None}
+            if row["extra"]:
+                item.update(json.loads(row["extra"]))
+            items.append(item)
+        return items
+
+    def _write_row(self, position: int, item: Dict[str, Any]) -> None:
+        columns = ROW_COLUMNS[self.dataset]
+        extra = {k: v for k, v in item.items() if k not in columns}
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.dataset} (position, {', '.join(columns)}, extra) "
+            f"VALUES ({', '.join('?' * (len(columns) + 2))})",
+            (position, *(item.get(col) for col in columns), json.dumps(extra) if extra else None))
+
+    def _apply_rows_change(self, data: List[Dict[str, Any]], change: Change) -> None:
+        op, path = change[0], change[1]
+        if not path:
+            self._conn.execute(f"DELETE FROM {self.dataset}")
+            for position, item in enumerate(data or []):
+                self._write_row(position, item)
+        elif op == "set":
+            self._write_row(path[0], data[path[0]])
+
+    # ----- notes -----
+    def _load_notes(self) -> Optional[Dict[str, Any]]:
+        names = [row["name"] for row in
+                 self._conn.execute("SELECT name FROM folders ORDER BY position")]
+        if not names and not self._is_migrated():
+            return None
+        tags = [row["name"] for row in self._conn.execute("SELECT name FROM tags ORDER BY position")]
+        images = {row["id"]: row["path"] for row in self._conn.execute("SELECT id, path FROM images")}
+        return {"folders": LazyFolders(self, names), "tags": tags, "images": images}
+
+    def load_folder(self, name: str) -> List[Dict[str, Any]]:
+        """Read the note rows of one folder, without content and formats"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(NOTE_COLUMNS)}, extra FROM notes "
+                "WHERE folder = ? ORDER BY position", (name,)).fetchall()
+            tag_rows = self._conn.execute(
+                "SELECT note_tags.note_id, note_tags.tag FROM note_tags "
+                "JOIN notes ON notes.id = note_tags.note_id "
+                "WHERE notes.folder = ? ORDER BY note_tags.position", (name,))
+            tags_by_note: Dict[str, List[str]] = {}
+            for row in tag_rows:
+                tags_by_note.setdefault(row["note_id"], []).append(row["tag"])
+
+        notes = []
+        for row in rows:
+            note = {"id": row["id"]}
+            for col in NOTE_COLUMNS:
+                note[col] = json.loads(row[col]) if col in JSON_NOTE_COLUMNS else row[col]
+            note["tags"] = tags_by_note.get(row["id"], [])
+            if row["extra"]:
+                note.update(json.loads(row["extra"]))
+            notes.append(note)
+        return notes
+
+    def count_folder(self, name: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notes WHERE folder = ?",
+                                      (name,)).fetchone()[0]
+
+    def load_note_body(self, note: Dict[str, Any]) -> None:
+        if "content" in note or "id" not in note:
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT content, formats FROM notes WHERE id = ?",
+                                     (note["id"],)).fetchone()
+        note["content"] = row["content"] if row else ""
+        if row and row["formats"] is not None:
+            note["formats"] = json.loads(row["formats"])
+
+    def _write_folder(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO folders (name, position) "
+            "VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM folders)) "
+            "ON CONFLICT (name) DO NOTHING", (name,))
+
+    def _write_note(self, folder: str, position: int, note: Dict[str, Any]) -> None:
+        if "id" not in note:
+            note["id"] = new_note_id()
+        known = ("id", "content", "formats", "tags", *NOTE_COLUMNS)
+        extra = {k: v for k, v in note.items() if k not in known}
+        values = [json.dumps(note.get(col, [])) if col in JSON_NOTE_COLUMNS else note.get(col)
+                  for col in NOTE_COLUMNS]
+        extra_json = json.dumps(extra) if extra else None
+
+        if "content" in note:
+            formats = json.dumps(note["formats"]) if "formats" in note else None
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO notes (id, folder, position, content, formats, "
+                f"{', '.join(NOTE_COLUMNS)}, extra) VALUES ({', '.join('?' * (len(NOTE_COLUMNS) + 6))})",
+                (note["id"], folder, position, note["content"], formats, *values, extra_json))
+        else:
+            # Body was never loaded, so keep whatever content is stored
+            assignments = ", ".join(f"{col} = ?" for col in NOTE_COLUMNS)
+            self._conn.execute(
+                f"UPDATE notes SET folder = ?, position = ?, {assignments}, extra = ? WHERE id = ?",
+                (folder, position, *values, extra_json, note["id"]))
+
+        self._conn.execute("DELETE FROM note_tags WHERE note_id = ?", (note["id"],))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO note_tags (note_id, tag, position) VALUES (?, ?, ?)",
+            [(note["id"], tag, i) for i, tag in enumerate(note.get("tags", []))])
+
+    def _delete_notes(self, where: str, params: Sequence[Any]) -> None:
+        self._conn.execute(
+            f"DELETE FROM note_tags WHERE note_id IN (SELECT id FROM notes WHERE {where})", params)
+        self._conn.execute(f"DELETE FROM notes WHERE {where}", params)
+
+    def _write_folder_notes(self, name: str, notes: List[Dict[str, Any]]) -> None:
+        self._write_folder(name)
+        for position, note in enumerate(notes):
+            self._write_note(name, position, note)
+        keep = [note["id"] for note in notes]
+        self._delete_notes(f"folder = ? AND id NOT IN ({', '.join('?' * len(keep))})",
+                           (name, *keep))
+
+    def _apply_notes_change(self, data: Dict[str, Any], change: Change) -> None:
+        op, path = change[0], change[1]
+        match path:
+            case ():
+                folders = data["folders"]
+                items = folders.loaded_items() if isinstance(folders, LazyFolders) else folders.items()
+                names = list(folders)
+                self._delete_notes(f"folder NOT IN ({', '.join('?' * len(names))})", names)
+                self._conn.execute(f"DELETE FROM folders WHERE name NOT IN "
+                                   f"({', '.join('?' * len(names))})", names)
+                for name in names:
+                    self._write_folder(name)
+                for name, notes in items:
+                    self._write_folder_notes(name, notes)
+                self._apply_notes_change(data, ("set", ("tags",)))
+                self._conn.execute("DELETE FROM images")
+                for image_id in data["images"]:
+                    self._apply_notes_change(data, ("set", ("images", image_id)))
+            case ("folders", name) if op == "del":
+                self._delete_notes("folder = ?", (name,))
+                self._conn.execute("DELETE FROM folders WHERE name = ?", (name,))
+            case ("folders", name):
+                self._write_folder_notes(name, data["folders"][name])
+            case ("folders", name, position, *_):
+                self._write_folder(name)
+                self._write_note(name, position, data["folders"][name][position])
+            case ("tags",):
+                self._conn.execute("DELETE FROM tags")
+                self._conn.executemany("INSERT OR IGNORE INTO tags (name, position) VALUES (?, ?)",
+                                       [(tag, i) for i, tag in enumerate(data["tags"])])
+            case ("images", image_id) if op == "del":
+                self._conn.execute("DELETE FROM images WHERE id = ?", (image_id,))
+            case ("images", image_id):
+                self._conn.execute("INSERT OR REPLACE INTO images (id, path) VALUES (?, ?)",
+                                   (image_id, data["images"][image_id]))
+
+
+def migrate_json_to_sqlite(db_filename: str, sources: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+    """Copy the JSON data files (plus any journal) into the SQLite database.
+
+    Each dataset is migrated once; the database remembers which ones are done.
+    Returns the number of records imported per dataset.
+    """
+    imported = {}
+    for json_filename, dataset in (sources or JSON_DATASETS).items():
+        target = SQLiteStorage(db_filename, dataset)
+        if target._is_migrated():
+            continue
+        data = JournaledJsonStorage(json_filename).load() if os.path.exists(json_filename) else None
+        if data is not None:
+            target.save(data)
+            imported[dataset] = (sum(len(notes) for notes in data["folders"].values())
+                                 if dataset == "notes" else len(data))
+        target.mark_migrated(json_filename)
+        target._conn.close()
+    return imported
+
+
+# Note fields kept in the per-note body files rather than the folder indexes
+NOTE_BODY_KEYS = ("content", "formats")
+
+# Note bodies kept in memory by ShardedJsonStorage
+DEFAULT_BODY_CACHE_SIZE = 200
+
+SHARDS_VERSION = 1
+
+
+class ShardedJsonStorage(StorageBackend):
+    """Notes split into a small manifest, one index per folder and one file per note body.
+
+    Layout under ``<filename without .json>/``::
+
+        manifest.json              folder names with note counts, tags, image map
+        folders/<hash>.json        metadata of one folder's notes (no content/formats)
+        notes/<id[:2]>/<id>.json   content and formats of one note
+
+    load() only reads the manifest, a folder's index is read when the folder
+    is first opened and a note's body when load_note_body() asks for it. At
+    most ``body_cache_size`` bodies stay in memory; the least recently used
+    ones are dropped from their note dicts and re-read on demand. The
+    manifest and folder indexes are journaled, and bodies are rewritten
+    atomically by the background writer. A single-file notes_data.json is
+    split into this layout the first time it is loaded.
+    """
+    def __init__(self, filename: str, body_cache_size: int = DEFAULT_BODY_CACHE_SIZE,
+                 debounce: float = DEFAULT_DEBOUNCE_SECONDS, writer: Optional[BackgroundWriter] = None):
+        super().__init__(filename)
+        self.directory = os.path.splitext(filename)[0]
+        self.body_cache_size = body_cache_size
+        self.debounce = debounce
+        self._writer = writer or _background_writer
+        self._lock = threading.RLock()
+        self._manifest = JournaledJsonStorage(os.path.join(self.directory, "manifest.json"), indent=None)
+        self._counts: Dict[str, int] = {}
+        self._has_manifest = False
+        self._folder_storages: Dict[str, JournaledJsonStorage] = {}
+        self._folder_ids: Dict[str, List[str]] = {}
+        # Note id -> note dict whose body is loaded, least recently used first
+        self._bodies: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Body path -> body (None once deleted) queued but not yet on disk;
+        # its own lock because writer jobs must never wait for self._lock
+        self._unwritten: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._unwritten_lock = threading.Lock()
+
+    def load(self) -> Any:
+        with self._lock:
+            manifest = None
+            if os.path.isdir(self.directory):
+                manifest = self._manifest.load()
+            if manifest is None:
+                return self._migrate()
+            self._has_manifest = True
+            self._counts = dict(manifest["folders"])
+            return {"folders": LazyFolders(self, list(manifest["folders"])),
+                    "tags": manifest["tags"], "images": manifest["images"]}
+
+    def _migrate(self) -> Optional[Dict[str, Any]]:
+        """Split the single-file notes document (plus any journal) into shards"""
+        if not (os.path.exists(self.filename) or os.path.exists(f"{self.filename}.journal")):
+            return None
+        data = JournaledJsonStorage(self.filename).load()
+        if data is None:
+            return None
+        for name in data["folders"]:
+            for note in data["folders"][name]:
+                note.setdefault("id", new_note_id())
+        self.save(data)
+        self.flush()
+        return data
+
+    def save(self, data: Any) -> None:
+        self.apply(data, [("set", (), data)])
+
+    def apply(self, data: Any, changes: Sequence[Change]) -> None:
+        with self._lock:
+            if not self._has_manifest:
+                # Nothing on disk yet to apply records to, so lay out everything
+                changes = [("set", (), data)]
+            for change in changes:
+                self._apply_change(data, change)
+            self._evict_bodies()
+
+    def _apply_change(self, data: Dict[str, Any], change: Change) -> None:
+        op, path = change[0], change[1]
+        match path:
+            case ():
+                folders = data["folders"]
+                items = folders.loaded_items() if isinstance(folders, LazyFolders) else folders.items()
+                for name in set(self._counts) - set(folders):
+                    self._drop_folder(name)
+                for name, notes in items:
+                    self._write_folder(name, notes)
+                self._counts = {name: folder_note_count(folders, name) for name in folders}
+                self._manifest.save({"version": SHARDS_VERSION, "folders": self._counts,
+                                     "tags": data["tags"], "images": data["images"]})
+                self._has_manifest = True
+            case ("folders", name) if op == "del":
+                self._drop_folder(name)
+                self._set_count(name, None)
+            case ("folders", name):
+                self._write_folder(name, data["folders"][name])
+            case ("folders", name, position):
+                notes = data["folders"][name]
+                note = notes[position]
+                self._folder_storage(name).apply(None, [("set", (position,), self._note_meta(note))])
+                ids = self._folder_ids.setdefault(name, [])
+                if position < len(ids):
+                    ids[position] = note["id"]
+                else:
+                    ids.append(note["id"])
+                self._write_body(note)
+                self._set_count(name, len(notes))
+            case ("folders", name, position, key, *_) if key in NOTE_BODY_KEYS:
+                self._write_body(data["folders"][name][position])
+            case ("folders", name, position, *rest):
+                self._folder_storage(name).apply(None, [(op, (position, *rest), *change[2:])])
+            case _:
+                # Tags and the image map live in the manifest under the same paths
+                self._manifest.apply(None, [change])
+
+    # ----- folders -----
+    def _folder_storage(self, name: str) -> JournaledJsonStorage:
+        storage = self._folder_storages.get(name)
+        if storage is None:
+            key = hashlib.sha1(name.encode("utf-8")).hexdigest()[:20]
+            storage = JournaledJsonStorage(os.path.join(self.directory, "folders", f"{key}.json"), indent=None)
+            os.makedirs(os.path.dirname(storage.filename), exist_ok=True)
+            self._folder_storages[name] = storage
+        return storage
+
+    def load_folder(self, name: str) -> List[Dict[str, Any]]:
+        """Read one folder's note index, without content and formats"""
+        with self._lock:
+            notes = self._folder_storage(name).load() or []
+            self._folder_ids[name] = [note["id"] for note in notes]
+            return notes
+
+    def count_folder(self, name: str) -> int:
+        return self._counts.get(name, 0)
+
+    def _set_count(self, name: str, count: Optional[int]) -> None:
+        if count is None:
+            if self._counts.pop(name, None) is not None:
+                self._manifest.apply(None, [("del", ("folders", name))])
+        elif self._counts.get(name) != count:
+            self._counts[name] = count
+            self._manifest.apply(None, [("set", ("folders", name), count)])
+
+    def _note_meta(self, note: Dict[str, Any]) -> Dict[str, Any]:
+        if "id" not in note:
+            note["id"] = new_note_id()
+        return {key: value for key, value in note.items() if key not in NOTE_BODY_KEYS}
+
+    def _write_folder(self, name: str, notes: List[Dict[str, Any]]) -> None:
+        """Rewrite a folder index, writing new bodies and deleting those of removed notes"""
+        old_ids = set(self._folder_ids.get(name, ()))
+        self._folder_storage(name).save([self._note_meta(note) for note in notes])
+        ids = [note["id"] for note in notes]
+        for note in notes:
+            if note["id"] not in old_ids:
+                self._write_body(note)
+        for note_id in old_ids - set(ids):
+            self._delete_body(note_id)
+        self._folder_ids[name] = ids
+        self._set_count(name, len(notes))
+
+    def _drop_folder(self, name: str) -> None:
+        """Delete a folder's index files and the bodies of its notes"""
+        storage = self._folder_storage(name)
+        ids = self._folder_ids.pop(name, None)
+        if ids is None:
+            ids = [note["id"] for note in storage.load() or []]
+        storage.close()
+        del self._folder_storages[name]
+        for path in [storage.filename, storage.journal_filename, *storage._sealed_segments()]:
+            if os.path.exists(path):
+                os.remove(path)
+        for note_id in ids:
+            self._delete_body(note_id)
+
+    # ----- note bodies -----
+    def _body_path(self, note_id: str) -> str:
+        return os.path.join(self.directory, "notes", note_id[:2], f"{note_id}.json")
+
+    def load_note_body(self, note: Dict[str, Any]) -> None:
+        if "id" not in note:
+            return
+        with self._lock:
+            if "content" not in note:
+                body = self._read_body(note["id"])
+                note["content"] = body.get("content", "")
+                if "formats" in body:
+                    note["formats"] = body["formats"]
+            self._touch_body(note)
+            self._evict_bodies()
+
+    def _read_body(self, note_id: str) -> Dict[str, Any]:
+        """A note's body, including one that is still waiting to be written"""
+        path = self._body_path(note_id)
+        with self._unwritten_lock:
+            if path in self._unwritten:
+                return self._unwritten[path] or {}
+        return read_json(path) or {}
+
+    def _submit_body_job(self, path: str, body: Optional[Dict[str, Any]]) -> None:
+        """Queue writing (or, for None, deleting) one body file"""
+        def job():
+            if body is None:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write_json(path, body, indent=None)
+            with self._unwritten_lock:
+                if self._unwritten.get(path, body) is body:
+                    self._unwritten.pop(path, None)
+
+        with self._unwritten_lock:
+            self._unwritten[path] = body
+        # Keyed by path, so a queued write cannot resurrect a deleted body
+        self._writer.submit(path, job, self.debounce)
+
+    def _write_body(self, note: Dict[str, Any]) -> None:
+        if "content" not in note:
+            return  # Never loaded, so the file on disk is current
+        # Copy now: the Tk thread keeps editing the note while the write waits
+        body = {key: note[key] for key in NOTE_BODY_KEYS if key in note}
+        if "formats" in body:
+            body["formats"] = [dict(fmt) for fmt in body["formats"]]
+        self._submit_body_job(self._body_path(note["id"]), body)
+        self._touch_body(note)
+
+    def _delete_body(self, note_id: str) -> None:
+        self._bodies.pop(note_id, None)
+        self._submit_body_job(self._body_path(note_id), None)
+
+    def _touch_body(self, note: Dict[str, Any]) -> None:
+        self._bodies[note["id"]] = note
+        self._bodies.move_to_end(note["id"])
+
+    def _evict_bodies(self) -> None:
+        while len(self._bodies) > self.body_cache_size:
+            _, note = self._bodies.popitem(last=False)
+            for key in NOTE_BODY_KEYS:
+                note.pop(key, None)
+
+    def export(self, data: Any) -> Any:
+        folders = {}
+        for name in data["folders"]:
+            notes = []
+            for note in data["folders"][name]:
+                # Copied rather than loaded, so exporting does not churn the body cache
+                if "content" not in note and "id" in note:
+                    note = {**note, "content": "", **self._read_body(note["id"])}
+                notes.append(note)
+            folders[name] = notes
+        return {**data, "folders": folders}
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._manifest.close()
+        for storage in list(self._folder_storages.values()):
+            storage.close()
+
+
+# Select the engine with STUDENT_ASSISTANT_STORAGE=sharded|journal|json|sqlite
+# ("sharded" splits the notes; the small course and reminder files stay journaled)
+STORAGE_ENV_VAR = "STUDENT_ASSISTANT_STORAGE"
+SQLITE_DB_FILENAME = "student_assistant.db"
+
+# One backend per file, so apps re-created from the main menu never append
+# to (or compact) the same journal from two places at once
+_open_storages: Dict[str, StorageBackend] = {}
+_open_storages_lock = threading.Lock()
+
+def open_storage(filename: str) -> StorageBackend:
+    """Return the shared storage backend for a data file"""
+    key = os.path.abspath(filename)
+    with _open_storages_lock:
+        if key not in _open_storages:
+            match os.environ.get(STORAGE_ENV_VAR, "sharded"):
+                case "sharded" if JSON_DATASETS.get(os.path.basename(filename)) == "notes":
+                    storage = ShardedJsonStorage(filename)
+                case "sqlite":
+                    dataset = JSON_DATASETS[os.path.basename(filename)]
+                    storage = SQLiteStorage(SQLITE_DB_FILENAME, dataset, source_filename=filename)
+                case "json":
+                    storage = JsonStorage(filename)
+                case _:
+                    storage = JournaledJsonStorage(filename)
+            _open_storages[key] = storage
+        return _open_storages[key]
+
+
+#==================================================
+# Base applications
+#==================================================
+class BaseApp(ABC):
+    def __init__(self, filename: str, storage: Optional[StorageBackend] = None):
+        self.filename = filename
+        self.storage = storage if storage is not None else open_storage(filename)
+        # Set by load_data overrides that leave out invalid stored entries: the
+        # positions in change records would then miss the stored list, so the
+        # next save writes the whole list instead
+        self._stored_differs = False
+
+    def save_data(self, data: List[Dict[str, Any]], changes: Optional[Sequence[Change]] = None) -> None:
+        """Save data with error handling, writing only ``changes`` when given.
+
+        ``changes`` is ignored, and the whole list saved, while the stored list
+        still holds entries that loading skipped.
+        """
+        try:
+            if changes is None or self._stored_differs:
+                self.storage.save(data)
+                self._stored_differs = False
+            else:
+                self.storage.apply(data, changes)
+        except (IOError, sqlite3.Error) as e:
             raise Exception(f"Error saving data: {e}")
 
     def load_data(self) -> List[Dict[str, Any]]:
-        """Load data from JSON file with error handling"""
-        if not os.path.exists(self.filename):
-            return []
+        """Load data from storage with error handling"""
         try:
-            with open(self.filename, 'r') as f:
-                return json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
+            data = self.storage.load()
+        except (IOError, json.JSONDecodeError, sqlite3.Error) as e:
             print(f"Error loading data: {e}")
             return []
+        return data if data is not None else []
+
+    def suspend(self) -> None:
+        """App hidden but kept alive: write pending data to disk"""
+        self.storage.flush()
+
+    def resume(self) -> None:
+        """Suspended app shown again"""
+        pass
+
+    def close(self) -> None:
+        """Flush pending writes and stop storage workers"""
+        self.storage.close()
 
     @abstractmethod
     def get_statistics(self) -> Dict[str, Any]:
@@ -33,7 +1161,7 @@ class BaseApp(ABC):
 
     def backup_data(self, backup_filename: str) -> bool:
         """Additional method to demonstrate inheritance"""
-        data = self.load_data()
+        data = self.storage.export(self.load_data())
         backup_file = f"backup_{backup_filename}"
         try:
             with open(backup_file, 'w') as f:
@@ -45,42 +1173,45 @@ class BaseApp(ABC):
 
 class BaseNotesApp(BaseApp):
     """Extended base class for notes applications"""
-    def __init__(self, filename: str):
-        super().__init__(filename)
-    
+    def __init__(self, filename: str, storage: Optional[StorageBackend] = None):
+        super().__init__(filename, storage)
+
     def load_notes_data(self) -> Dict[str, Any]:
         """Load notes-specific data structure"""
-        if not os.path.exists(self.filename):
-            return {
-                "folders": {"General": []},
-                "tags": ["Important", "Work", "Personal"],
-                "images": {}
-            }
         try:
-            with open(self.filename, 'r') as f:
-                return json.load(f)
-        except (IOError, json.JSONDecodeError) as e:
+            data = self.storage.load()
+        except (IOError, json.JSONDecodeError, sqlite3.Error) as e:
             print(f"Error loading notes data: {e}")
+            data = None
+        if data is None:
             return {
                 "folders": {"General": []},
                 "tags": ["Important", "Work", "Personal"],
                 "images": {}
             }
-    
-    def save_notes_data(self, data: Dict[str, Any]) -> None:
-        """Save notes-specific data structure"""
+        return data
+
+    def save_notes_data(self, data: Dict[str, Any], changes: Optional[Sequence[Change]] = None) -> None:
+        """Save notes-specific data structure, writing only ``changes`` when given"""
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=4)
-        except IOError as e:
+            if changes is None:
+                self.storage.save(data)
+            else:
+                self.storage.apply(data, changes)
+        except (IOError, sqlite3.Error) as e:
             raise Exception(f"Error saving notes data: {e}")
-    
+
+    def load_note_body(self, note: Dict[str, Any]) -> Dict[str, Any]:
+        """Make sure a lazily loaded note has its content and formats"""
+        self.storage.load_note_body(note)
+        return note
+
     def get_statistics(self) -> Dict[str, Any]:
         """Default implementation for notes statistics"""
         data = self.load_notes_data()
         return {
             "total_folders": len(data.get("folders", {})),
-            "total_notes": sum(len(notes) for notes in data.get("folders", {}).values()),
+            "total_notes": sum(folder_note_count(data["folders"], name) for name in data.get("folders", {})),
             "total_tags": len(data.get("tags", [])),
             "total_images": len(data.get("images", {}))
-        }
\ No newline at end of file
+        }
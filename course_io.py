@@ -0,0 +1,99 @@
+import csv
+import itertools
+import json
+import os
+import tempfile
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Sequence
+from base_app import match_permissions
+
+# Rows validated and committed per batch during an import
+IMPORT_BATCH_SIZE = 5000
+
+# Columns written by export, in order; optional ones only when some course has them
+EXPORT_FIELDS = ("name", "grade", "credits", "points", "term", "student")
+OPTIONAL_FIELDS = ("term", "student")
+
+# Header spellings found in registrar exports, mapped to course keys
+FIELD_ALIASES = {
+    "course": "name", "course name": "name", "title": "name",
+    "credit": "credits", "credit hours": "credits", "units": "credits",
+    "semester": "term", "student id": "student", "student_id": "student",
+}
+
+# File dialog filters for the supported formats
+FILETYPES = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl *.ndjson")]
+
+# Using dictionary to map file extensions to formats
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# (line number, row) pairs; row is None when the line could not be parsed
+Row = Tuple[int, Optional[Dict[str, Any]]]
+
+
+def file_format(path: str) -> str:
+    """'csv' or 'jsonl', from the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file type '{ext}' (use .csv or .jsonl)")
+    return FORMATS[ext]
+
+
+def _normalise(row: Dict[Any, Any]) -> Dict[str, Any]:
+    normalised = {}
+    for key, value in row.items():
+        if key is None:
+            continue  # Extra CSV cells without a header
+        key = str(key).strip().lower()
+        normalised[FIELD_ALIASES.get(key, key)] = value
+    return normalised
+
+
+def read_course_rows(path: str) -> Iterator[Row]:
+    """Stream raw course rows from a CSV (with a header row) or JSON Lines file"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format(path) == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, _normalise(row)
+            return
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_number, _normalise(row) if isinstance(row, dict) else None
+
+
+def batches(rows: Iterable[Row], size: int = IMPORT_BATCH_SIZE) -> Iterator[List[Row]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def write_courses(path: str, courses: Sequence[Dict[str, Any]]) -> int:
+    """Stream courses to a CSV or JSON Lines file, replacing it atomically.
+
+    The optional columns are found by scanning ``courses`` in place, so
+    nothing is copied. Returns the number of courses written.
+    """
+    fmt = file_format(path)
+    fields = [f for f in EXPORT_FIELDS if f not in OPTIONAL_FIELDS or any(c.get(f) for c in courses)]
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=folder)
+    try:
+        match_permissions(tmp, path)
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            if fmt == "csv":
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(courses)
+            else:
+                f.writelines(json.dumps({k: c[k] for k in fields if k in c}) + "\n" for c in courses)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return len(courses)
@@ -0,0 +1,164 @@
+import numpy as np
+from typing import Dict, List, Any, Iterable
+
+# Starting capacity of the column arrays; they double when full
+INITIAL_CAPACITY = 64
+
+# Percentiles of grade points reported by summary()
+PERCENTILES = (25, 50, 75, 90)
+
+
+class CourseColumns:
+    """Course records as NumPy columns for fast GPA analytics.
+
+    Credits, grade points, grade codes and term codes sit in parallel arrays
+    that grow by doubling, so appending is amortised O(1). Grades and terms
+    are stored as small integer codes into ``grades`` / ``terms`` (in order
+    of first appearance), which lets distributions and per-term aggregates
+    come from ``np.bincount``. The credit and quality-point totals are kept
+    as running sums, so the GPA itself costs O(1) after every change.
+    """
+    def __init__(self, courses: Iterable[Dict[str, Any]] = ()):
+        self.grades: List[str] = []
+        self.terms: List[str] = []
+        self._grade_codes: Dict[str, int] = {}
+        self._term_codes: Dict[str, int] = {}
+        self._allocate(INITIAL_CAPACITY)
+        self.load(courses)
+
+    def _allocate(self, capacity: int) -> None:
+        self._credits = np.zeros(capacity)
+        self._points = np.zeros(capacity)
+        self._grade = np.zeros(capacity, dtype=np.int32)
+        self._term = np.zeros(capacity, dtype=np.int32)
+        self._size = 0
+        self.total_credits = 0.0
+        self.total_quality = 0.0  # Sum of points * credits
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._credits)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_credits", "_points", "_grade", "_term"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    @staticmethod
+    def _code(codes: Dict[str, int], names: List[str], name: str) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return self._size
+
+#==================================================
+# Updates
+#==================================================
+    def load(self, courses: Iterable[Dict[str, Any]]) -> None:
+        """Replace every row, building the columns in bulk"""
+        courses = list(courses)
+        self.grades.clear()
+        self.terms.clear()
+        self._grade_codes.clear()
+        self._term_codes.clear()
+        self._allocate(max(INITIAL_CAPACITY, len(courses)))
+        count = len(courses)
+        self._credits[:count] = [c["credits"] for c in courses]
+        self._points[:count] = [c["points"] for c in courses]
+        self._grade[:count] = [self._code(self._grade_codes, self.grades, c["grade"]) for c in courses]
+        self._term[:count] = [self._code(self._term_codes, self.terms, c.get("term", "")) for c in courses]
+        self._size = count
+        self._recompute_totals()
+
+    def append(self, course: Dict[str, Any]) -> None:
+        self._grow(self._size + 1)
+        i = self._size
+        self._credits[i] = course["credits"]
+        self._points[i] = course["points"]
+        self._grade[i] = self._code(self._grade_codes, self.grades, course["grade"])
+        self._term[i] = self._code(self._term_codes, self.terms, course.get("term", ""))
+        self._size += 1
+        self.total_credits += course["credits"]
+        self.total_quality += course["points"] * course["credits"]
+
+    def extend(self, courses: List[Dict[str, Any]]) -> None:
+        """Append many rows with one slice assignment per column"""
+        start, count = self._size, len(courses)
+        self._grow(start + count)
+        end = start + count
+        self._credits[start:end] = [c["credits"] for c in courses]
+        self._points[start:end] = [c["points"] for c in courses]
+        self._grade[start:end] = [self._code(self._grade_codes, self.grades, c["grade"]) for c in courses]
+        self._term[start:end] = [self._code(self._term_codes, self.terms, c.get("term", "")) for c in courses]
+        self._size = end
+        self.total_credits += float(self._credits[start:end].sum())
+        self.total_quality += float(self._points[start:end] @ self._credits[start:end])
+
+    def delete(self, index: int) -> None:
+        """Remove one row, shifting the later rows down"""
+        size = self._size
+        if not 0 <= index < size:
+            raise IndexError(index)
+        self.total_credits -= float(self._credits[index])
+        self.total_quality -= float(self._points[index] * self._credits[index])
+        for column in (self._credits, self._points, self._grade, self._term):
+            column[index:size - 1] = column[index + 1:size]
+        self._size -= 1
+        if not self._size:
+            self.total_credits = self.total_quality = 0.0  # Drop accumulated rounding
+
+    def clear(self) -> None:
+        self.load(())
+
+    def _recompute_totals(self) -> None:
+        credits = self._credits[:self._size]
+        self.total_credits = float(credits.sum())
+        self.total_quality = float(self._points[:self._size] @ credits)
+
+#==================================================
+# Analytics
+#==================================================
+    @property
+    def gpa(self) -> float:
+        return self.total_quality / self.total_credits if self.total_credits else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """GPA, distributions, percentiles and per-term aggregates in one vectorized pass"""
+        size = self._size
+        credits = self._credits[:size]
+        points = self._points[:size]
+        grade = self._grade[:size]
+        term = self._term[:size]
+        quality = points * credits
+
+        # Using bincount for per-code counts and weighted sums
+        grade_counts = np.bincount(grade, minlength=len(self.grades))
+        grade_credits = np.bincount(grade, weights=credits, minlength=len(self.grades))
+        term_counts = np.bincount(term, minlength=len(self.terms))
+        term_credits = np.bincount(term, weights=credits, minlength=len(self.terms))
+        term_quality = np.bincount(term, weights=quality, minlength=len(self.terms))
+
+        total_credits = float(credits.sum())
+        total_points = float(quality.sum())
+        percentiles = np.percentile(points, PERCENTILES) if size else np.zeros(len(PERCENTILES))
+
+        return {
+            "total_courses": size,
+            "total_credits": total_credits,
+            "total_points": total_points,
+            "gpa": total_points / total_credits if total_credits else 0.0,
+            "grade_distribution": {g: int(n) for g, n in zip(self.grades, grade_counts) if n},
+            "credit_distribution": {g: float(c) for g, c, n in zip(self.grades, grade_credits, grade_counts) if n},
+            "points_percentiles": {p: float(v) for p, v in zip(PERCENTILES, percentiles)},
+            "terms": {
+                t: {"courses": int(n), "credits": float(c), "gpa": float(q / c) if c else 0.0}
+                for t, n, c, q in zip(self.terms, term_counts, term_credits, term_quality) if n
+            },
+        }
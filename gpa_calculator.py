@@ -1,45 +1,42 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from base_app import BaseApp
-from typing import Dict, Set, Tuple, List, Any
-
-class GPACalculatorApp(BaseApp):
+from tkinter import ttk, messagebox, filedialog
+from virtual_list import VirtualList
+from gpa_service import CourseService
+from gpa_model import DEFAULT_STUDENT
+from course_io import FILETYPES
+from typing import Dict, Tuple, List, Any
+
+class GPACalculatorApp(CourseService):
+    """Tk view over CourseService: widgets, dialogs and the chart"""
     def __init__(self, parent):
         super().__init__("gpa_data.json")
         
         # Store parent reference
         self.parent = parent
         
-        # Encapsulation to make the data private
-        self._courses = self.load_data()
-        self._grade_scales = self._initialize_grade_scales()
+        # Chart below the results (gpa_chart.CourseChart), created on first use and then only updated
+        self._chart = None
         
         self.setup_ui()
         self.update_courses_list()
         self.calculate_gpa()
 
-    def _initialize_grade_scales(self) -> Dict[str, Dict[str, float]]:
-        """Initialize grade scale dictionaries for different grading systems"""
-        return {
-            "4.0": {
-                'A+': 4.00, 'A': 4.00, 'A-': 3.67,
-                'B+': 3.33, 'B': 3.00, 'B-': 2.67,
-                'C+': 2.33, 'C': 2.00, 'C-': 1.67,
-                'D+': 1.33, 'D': 1.00, 'D-': 0.67,
-                'F': 0.00
-            },
-            "100": {}  # Handled separately with match statement
-        }
-
-    # Encapsulation which is getter method for courses
-    def get_courses(self) -> List[Dict]:
-        return self._courses.copy()  # Return copy to prevent direct modification
-
-    # Encapsulation for Setter method for courses
     def set_courses(self, courses: List[Dict]) -> None:
-        self._courses = courses
-        self.save_data(self._courses)
+        super().set_courses(courses)
+        self.update_courses_list()
+        self.refresh_chart()
+
+    def resume(self) -> None:
+        super().resume()
+        # Courses may have changed while the screen was hidden
+        if self._chart is not None and self._chart.shown:
+            self._chart.show()
+
+    def close(self) -> None:
+        if self._chart is not None:
+            self._chart.close()
+            self._chart = None
+        super().close()
 #==================================================
 # Setup Screen
 #==================================================
@@ -58,10 +55,9 @@ class GPACalculatorApp(BaseApp):
         self.scale_frame.pack(fill=tk.X, pady=5)
 
         self.scale_var = tk.StringVar(value="4.0")
-        ttk.Radiobutton(self.scale_frame, text="4.0 Scale (A=4, B=3, C=2, D=1, F=0)", 
-                       variable=self.scale_var, value="4.0").pack(side=tk.LEFT, padx=5)
-        ttk.Radiobutton(self.scale_frame, text="100 Scale (Percentage)", 
-                       variable=self.scale_var, value="100").pack(side=tk.LEFT, padx=5)
+        for scale in self._scales.values():
+            ttk.Radiobutton(self.scale_frame, text=scale.label,
+                           variable=self.scale_var, value=scale.name).pack(side=tk.LEFT, padx=5)
 
         self.entry_frame = ttk.LabelFrame(self.main_frame, text="Add Course")
         self.entry_frame.pack(fill=tk.X, pady=5)
@@ -81,18 +77,25 @@ class GPACalculatorApp(BaseApp):
         self.add_button = ttk.Button(self.entry_frame, text="Add Course", command=self.add_course)
         self.add_button.grid(row=0, column=6, padx=5, pady=5)
 
+        # Optional: leave empty for your own courses
+        ttk.Label(self.entry_frame, text="Student:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.W)
+        self.student_entry = ttk.Entry(self.entry_frame, width=30)
+        self.student_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Label(self.entry_frame, text="Term:").grid(row=1, column=2, padx=5, pady=5, sticky=tk.W)
+        self.term_entry = ttk.Entry(self.entry_frame, width=10)
+        self.term_entry.grid(row=1, column=3, padx=5, pady=5)
+
         # Configure column weights for responsive layout
         self.entry_frame.columnconfigure(1, weight=1)  # Course name entry expands
         
         self.courses_frame = ttk.LabelFrame(self.main_frame, text="Your Courses")
         self.courses_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
-        self.courses_tree = ttk.Treeview(self.courses_frame, 
-                                       columns=("course", "grade", "credits", "points"), 
-                                       show="headings")
-        for col in ["course", "grade", "credits", "points"]:
-            self.courses_tree.heading(col, text=col.capitalize())
-        self.courses_tree.pack(fill=tk.BOTH, expand=True)
+        self.courses_list = VirtualList(self.courses_frame,
+                                        columns=[(col, col.capitalize(), None)
+                                                 for col in ["course", "grade", "credits", "points", "term", "student"]])
+        self.courses_list.pack(fill=tk.BOTH, expand=True)
 
         self.button_frame = ttk.Frame(self.courses_frame)
         self.button_frame.pack(fill=tk.X, pady=5)
@@ -100,7 +103,11 @@ class GPACalculatorApp(BaseApp):
         ttk.Button(self.button_frame, text="Calculate GPA", command=self.calculate_gpa).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.button_frame, text="Delete Selected", command=self.delete_course).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.button_frame, text="Clear All", command=self.clear_courses).pack(side=tk.LEFT, padx=5)
-        ttk.Button(self.button_frame, text="Show Chart", command=self.show_chart).pack(side=tk.LEFT, padx=5)
+        self.chart_button = ttk.Button(self.button_frame, text="Show Chart", command=self.show_chart)
+        self.chart_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Term Summary", command=self.show_term_summary).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Import...", command=self.import_courses_dialog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.button_frame, text="Export...", command=self.export_courses_dialog).pack(side=tk.LEFT, padx=5)
         
         #buttons for collection demonstration
         ttk.Button(self.button_frame, text="Show Unique Courses", 
@@ -124,93 +131,52 @@ class GPACalculatorApp(BaseApp):
 #==================================================
     
     def add_course(self):
-        name = self.course_entry.get().strip()
-        grade = self.grade_entry.get().upper().strip()
-        credit = self.credit_entry.get().strip()
-
-        if not name or not grade or not credit:
-            messagebox.showerror("Error", "Please fill all fields")
-            return
-
         try:
-            credit = float(credit)
-            if credit <= 0: 
-                raise ValueError("Credit must be positive")
+            course = self.create_course(self.course_entry.get(), self.grade_entry.get(), self.credit_entry.get(),
+                                        self.scale_var.get(), self.student_entry.get(), self.term_entry.get())
         except ValueError as e:
-            messagebox.showerror("Error", f"Invalid credit: {e}")
-            return
-
-        points = self.calculate_grade_points(grade, self.scale_var.get())
-        if points is None:
-            messagebox.showerror("Error", "Invalid grade")
+            messagebox.showerror("Error", str(e))
             return
-
-        # Using tuple for course data structure
-        course_data = (name, grade, credit, points)
-        course_dict = {"name": name, "grade": grade, "credits": credit, "points": points}
         
-        self._courses.append(course_dict)
-        self.save_data(self._courses)
-        self.update_courses_list()
+        self.courses_list.insert(tk.END, self._course_row(course))
+        self.refresh_chart()
         self.clear_entry_fields()
 
     def delete_course(self):
-        selected = self.courses_tree.selection()
+        selected = self.courses_list.curselection()
         if not selected:
             return
-        index = self.courses_tree.index(selected[0])
-        del self._courses[index]
-        self.save_data(self._courses)
-        self.update_courses_list()
+        index = selected[0]
+        self.remove_course(index)
+        self.courses_list.delete(index)
+        self.refresh_chart()
         self.calculate_gpa()
 
     def clear_courses(self):
         # Add confirmation dialog
         if not messagebox.askyesno("Confirm Clear", "Are you sure you want to clear all courses?"):
             return
-        self._courses = []
-        self.save_data(self._courses)
+        self.remove_all_courses()
         self.update_courses_list()
+        self.refresh_chart()
         self.calculate_gpa()
 
     def update_courses_list(self):
-        self.courses_tree.delete(*self.courses_tree.get_children())
-        for c in self._courses:
-            self.courses_tree.insert("", tk.END, 
-                                   values=(c["name"], c["grade"], c["credits"], f"{c['points']:.2f}"))
+        self.courses_list.set_rows(self._course_row(c) for c in self._courses)
+
+    def _course_row(self, c: Dict[str, Any]) -> Tuple:
+        return (c["name"], c["grade"], c["credits"], f"{c['points']:.2f}", c.get("term", ""), c.get("student", ""))
 
+    # Student and term stay filled in for entering the next course of the same term
     def clear_entry_fields(self):
         self.course_entry.delete(0, tk.END)
         self.grade_entry.delete(0, tk.END)
         self.credit_entry.delete(0, tk.END)
         self.course_entry.focus()
 
-    def calculate_grade_points(self, grade: str, scale: str) -> float:
-        """Calculate grade points using different collection types"""
-        if scale == "4.0":
-            # Using dictionary for grade mapping
-            return self._grade_scales["4.0"].get(grade, None)
-        elif scale == "100":
-            try:
-                grade_val = float(grade)
-                # Using match statement (Python 3.10+)
-                match grade_val:
-                    case g if g >= 80: return 4.0
-                    case g if g >= 75: return 3.67
-                    case g if g >= 70: return 3.33
-                    case g if g >= 65: return 3.00
-                    case g if g >= 60: return 2.67
-                    case g if g >= 55: return 2.33
-                    case g if g >= 50: return 2.00
-                    case _: return 0.0
-            except ValueError:
-                return None
-
     def calculate_gpa(self):
-        total_credits = sum(c["credits"] for c in self._courses)
-        total_points = sum(c["points"] * c["credits"] for c in self._courses)
-        gpa = total_points / total_credits if total_credits else 0
-        
+        # Running totals, so this is O(1) however many courses there are
+        total_credits, total_points, gpa = self.gpa_totals()
         self.total_credits_label.config(text=f"{total_credits:.1f}")
         self.total_points_label.config(text=f"{total_points:.2f}")
         self.gpa_label.config(text=f"{gpa:.2f}")
@@ -221,14 +187,60 @@ class GPACalculatorApp(BaseApp):
             messagebox.showinfo("Info", "No courses to analyze.")
             return
         
-        # Using set to get unique course names
-        unique_courses: Set[str] = {course["name"] for course in self._courses}
+        unique_courses = self.unique_course_count()
         
-        if len(unique_courses) == len(self._courses):
+        if unique_courses == len(self._courses):
             messagebox.showinfo("Unique Courses", "All courses have unique names!")
         else:
             messagebox.showinfo("Unique Courses", 
-                              f"Found {len(unique_courses)} unique courses out of {len(self._courses)} total courses.")
+                              f"Found {unique_courses} unique courses out of {len(self._courses)} total courses.")
+
+#==================================================
+# Bulk import / export
+#==================================================
+    def import_courses_dialog(self):
+        path = filedialog.askopenfilename(filetypes=FILETYPES)
+        if not path:
+            return
+        self.parent.config(cursor="watch")
+        self.parent.update_idletasks()
+        try:
+            added, errors = self.import_courses(path, self.scale_var.get())
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Import failed: {e}")
+            return
+        finally:
+            self.parent.config(cursor="")
+        
+        message = f"Imported {len(added)} course(s)."
+        if errors:
+            message += f"\n\n{len(errors)} row(s) skipped:\n" + "\n".join(errors[:10])
+            if len(errors) > 10:
+                message += f"\n... and {len(errors) - 10} more"
+        messagebox.showinfo("Import", message)
+
+    def import_courses(self, path: str, scale: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        added, errors = super().import_courses(path, scale)
+        if added:
+            # One view refresh for the whole file
+            self.courses_list.insert(tk.END, *(self._course_row(c) for c in added))
+            self.refresh_chart()
+            self.calculate_gpa()
+        return added, errors
+
+    def export_courses_dialog(self):
+        if not self._courses:
+            messagebox.showinfo("Info", "No courses to export.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=FILETYPES)
+        if not path:
+            return
+        try:
+            count = self.export_courses(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Export failed: {e}")
+            return
+        messagebox.showinfo("Export", f"Exported {count} course(s) to: {path}")
 
 #==================================================
 # Statistics
@@ -240,82 +252,68 @@ class GPACalculatorApp(BaseApp):
             messagebox.showinfo("Info", "No courses to analyze.")
             return
         
-        # Using tuple for fixed statistics and dictionary for grade distribution
-        total_courses = len(self._courses)
-        total_credits = sum(c["credits"] for c in self._courses)
-        
-        # Grade distribution using dictionary
-        grade_distribution: Dict[str, int] = {}
-        for course in self._courses:
-            grade = course["grade"]
-            grade_distribution[grade] = grade_distribution.get(grade, 0) + 1
+        summary = self.course_summary()
         
         # Create statistics tuple
-        stats: Tuple[int, float, Dict[str, int]] = (total_courses, total_credits, grade_distribution)
+        stats: Tuple[int, float, Dict[str, int]] = (summary["total_courses"], summary["total_credits"],
+                                                   summary["grade_distribution"])
         
         # Display statistics
         stats_text = f"Total Courses: {stats[0]}\nTotal Credits: {stats[1]:.1f}\n\nGrade Distribution:\n"
         for grade, count in stats[2].items():
-            stats_text += f"{grade}: {count} course(s)\n"
+            stats_text += f"{grade}: {count} course(s), {summary['credit_distribution'][grade]:.1f} credits\n"
+        
+        stats_text += "\nGrade Point Percentiles:\n"
+        for percentile, value in summary["points_percentiles"].items():
+            stats_text += f"{percentile}th: {value:.2f}\n"
         
         messagebox.showinfo("Course Statistics", stats_text)
 
-    def show_chart(self):
-        if not self._courses:
-            messagebox.showinfo("Info", "No data to display.")
+    def show_term_summary(self):
+        """Term and cumulative GPA per term for the selected course's student"""
+        selected = self.courses_list.curselection()
+        if selected:
+            student = self._courses[selected[0]].get("student", DEFAULT_STUDENT)
+        else:
+            student = self.student_entry.get().strip() or DEFAULT_STUDENT
+        terms = self.term_summary(student)
+        if not terms:
+            messagebox.showinfo("Info", "No courses for this student.")
             return
         
-        names = [c["name"] for c in self._courses]
-        points = [c["points"] for c in self._courses]
-        
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(names, points, color='skyblue')
-        plt.ylim(0, 4.1)
-        plt.title("Grade Points by Course")
-        plt.xlabel("Courses")
-        plt.ylabel("Grade Points")
-        
-        for bar, val in zip(bars, points):
-            plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.05, 
-                    f"{val:.2f}", ha='center')
-        
-        plt.tight_layout()
-        plt.show()
-
-    # Override base class method to demonstrate inheritance
-    def load_data(self) -> List[Dict]:
-        """Enhanced load_data method with additional validation"""
-        data = super().load_data()
-        
-        # Validate loaded data structure
-        valid_data = []
-        for item in data:
-            if (isinstance(item, dict) and 
-                all(key in item for key in ['name', 'grade', 'credits', 'points'])):
-                valid_data.append(item)
-        
-        return valid_data
+        summary_text = f"Student: {student or '(you)'}\n\n"
+        for term, totals, cumulative, deans_list in terms:
+            summary_text += (f"{term or '(no term)'}: GPA {totals.gpa:.2f} over {totals.credits:.1f} credits, "
+                             f"cumulative {cumulative:.2f}")
+            if deans_list:
+                summary_text += "  [Dean's List]"
+            summary_text += "\n"
+        summary_text += f"\nCumulative GPA: {self.cumulative_gpa(student):.2f}"
+        messagebox.showinfo("Term Summary", summary_text)
 
-    # Implement abstract method from BaseApp
-    def get_statistics(self) -> Dict[str, Any]:
-        """Return comprehensive statistics about the courses"""
+    def show_chart(self):
+        """Show the chart below the results, or hide it again if it is shown"""
+        if self._chart is not None and self._chart.shown:
+            self._chart.hide()
+            self.chart_button.config(text="Show Chart")
+            return
         if not self._courses:
-            return {"message": "No courses available"}
-        
-        total_credits = sum(c["credits"] for c in self._courses)
-        total_points = sum(c["points"] * c["credits"] for c in self._courses)
-        gpa = total_points / total_credits if total_credits else 0
+            messagebox.showinfo("Info", "No data to display.")
+            return
         
-        # Using dictionary for comprehensive statistics
-        return {
-            "total_courses": len(self._courses),
-            "total_credits": total_credits,
-            "total_points": total_points,
-            "gpa": gpa,
-            "course_names": [c["name"] for c in self._courses],
-            "grade_distribution": {c["grade"]: sum(1 for course in self._courses if course["grade"] == c["grade"]) 
-                                  for c in self._courses}
-        }
+        # The chart is reused; hiding it only unpacks its frame
+        if self._chart is None:
+            # Imported here: matplotlib takes longer to import than the rest of the app
+            from gpa_chart import CourseChart
+            self._chart = CourseChart(self.main_frame)
+        self._chart.update(self._courses)
+        self._chart.show()
+        self.chart_button.config(text="Hide Chart")
+
+    def refresh_chart(self):
+        """Update the chart after the courses changed (a hidden chart redraws when shown)"""
+        if self._chart is not None:
+            self._chart.update(self._courses)
 
 #====================================
 # Able this if want run independent
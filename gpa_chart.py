@@ -0,0 +1,143 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from typing import Dict, List, Tuple, Any
+
+# Beyond this many courses the value above each bar is left out
+MAX_VALUE_LABELS = 40
+
+# Beyond this many courses only every n-th course name is shown on the axis
+MAX_TICK_LABELS = 30
+
+# Beyond this many courses bars are drawn as one step outline without gaps,
+# at most MAX_COLUMNS wide, each column as tall as its tallest course: Agg
+# time grows with vertex count, and such bars are a pixel wide or less anyway
+DENSE_BARS = 300
+MAX_COLUMNS = 1000
+
+BAR_WIDTH = 0.8
+BAR_COLOR = "skyblue"
+
+Bar = Tuple[str, float]  # (course name, grade points)
+
+
+class CourseChart:
+    """Grade points per course, drawn with Agg into a frame of the GPA screen.
+
+    The figure, axes and bars are created once. ``update`` changes only the
+    artists whose data differs from the last update; all bars are one
+    compound path, so drawing cost barely grows with the number of
+    courses. The canvas redraws only when the data changed: Tk keeps showing
+    the last rendered image, and a hidden chart redraws once when shown.
+    Everything runs on the Tk thread, without pyplot's event loop.
+    ``show`` packs the frame into ``master`` and ``hide`` takes it out again.
+    """
+    def __init__(self, master):
+        self.frame = ttk.Frame(master)
+        self.shown = False
+
+        self.figure = Figure(figsize=(10, 4))
+        self.figure.subplots_adjust(left=0.07, right=0.98, top=0.9, bottom=0.28)
+        self.axes = self.figure.add_subplot()
+        self.axes.set_ylim(0, 4.1)
+        self.axes.set_title("Grade Points by Course")
+        self.axes.set_xlabel("Courses")
+        self.axes.set_ylabel("Grade Points")
+
+        # All bars are one compound path: one rectangle per course, each
+        # MOVETO + 3 LINETO + CLOSEPOLY, kept in NumPy arrays
+        self._bar_codes = np.array([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY],
+                                   dtype=Path.code_type)
+        self._bars = PathPatch(Path(np.zeros((0, 2))), facecolor=BAR_COLOR, edgecolor="none")
+        self.axes.add_patch(self._bars)
+        self._labels: List[Any] = []  # Text artists above the bars, reused
+        self._data: List[Bar] = []
+        self._dirty = True
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _bar_path(self, heights: np.ndarray) -> Path:
+        """Path of all the bars, built without a Python loop"""
+        count = len(heights)
+        if count > DENSE_BARS:
+            columns = min(count, MAX_COLUMNS)
+            starts = (np.arange(columns) * count) // columns
+            tops = np.maximum.reduceat(heights, starts)
+            edges = np.append(starts, count) - 0.5
+            return Path(np.column_stack((np.repeat(edges, 2),
+                                         np.concatenate(([0], np.repeat(tops, 2), [0])))))
+
+        left = np.arange(count) - BAR_WIDTH / 2
+        right = left + BAR_WIDTH
+        verts = np.empty((count, 5, 2))
+        verts[:, :, 0] = np.column_stack((left, left, right, right, left))
+        verts[:, 0, 1] = verts[:, 3, 1] = verts[:, 4, 1] = 0
+        verts[:, 1, 1] = verts[:, 2, 1] = heights
+        return Path(verts.reshape(-1, 2), np.tile(self._bar_codes, count))
+
+    def update(self, courses: List[Dict[str, Any]]) -> None:
+        """Bring the bars in line with ``courses``, redrawing only if something changed"""
+        data = [(c["name"], c["points"]) for c in courses]
+        if data == self._data:
+            return
+        old = self._data
+        count = len(data)
+
+        if [points for _, points in data] != [points for _, points in old]:
+            self._bars.set_path(self._bar_path(np.fromiter((points for _, points in data), float, count)))
+
+        self._update_value_labels(data, old)
+        if [name for name, _ in data] != [name for name, _ in old]:
+            self._update_ticks(data)
+        if count != len(old):
+            self.axes.set_xlim(-0.5, max(count, 1) - 0.5)
+
+        self._data = data
+        self._dirty = True
+        if self.shown and self.frame.winfo_viewable():
+            self.canvas.draw_idle()
+
+    def _update_value_labels(self, data: List[Bar], old: List[Bar]) -> None:
+        shown = len(data) if len(data) <= MAX_VALUE_LABELS else 0
+        while len(self._labels) > shown:
+            self._labels.pop().remove()
+        for i in range(shown):
+            value = data[i][1]
+            if i == len(self._labels):
+                self._labels.append(self.axes.text(i, value + 0.05, f"{value:.2f}", ha="center"))
+            elif i >= len(old) or old[i][1] != value:
+                self._labels[i].set_position((i, value + 0.05))
+                self._labels[i].set_text(f"{value:.2f}")
+
+    def _update_ticks(self, data: List[Bar]) -> None:
+        step = max(1, -(-len(data) // MAX_TICK_LABELS))
+        positions = range(0, len(data), step)
+        self.axes.set_xticks(list(positions), [data[i][0] for i in positions],
+                             rotation=45 if len(data) > 10 else 0,
+                             ha="right" if len(data) > 10 else "center")
+
+    def show(self) -> None:
+        """Pack the chart below the other widgets of ``master``, drawing it if the data changed"""
+        self.frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.shown = True
+        if self._dirty:
+            self.draw()
+
+    def hide(self) -> None:
+        self.frame.pack_forget()
+        self.shown = False
+
+    def draw(self) -> None:
+        self.canvas.draw()
+
+    def _on_draw(self, event) -> None:
+        self._dirty = False
+
+    def close(self) -> None:
+        self.frame.destroy()
@@ -0,0 +1,148 @@
+import bisect
+from typing import Dict, List, Set, Tuple, Any, Optional, Iterable
+
+# Courses without a student belong to the app's own user
+DEFAULT_STUDENT = ""
+
+# Dean's list: a term GPA of at least this over at least this many credits
+DEANS_LIST_GPA = 3.5
+DEANS_LIST_MIN_CREDITS = 12.0
+
+
+class Totals:
+    """Running credit and quality-point sums for one student, term or both"""
+    __slots__ = ("courses", "credits", "quality")
+
+    def __init__(self):
+        self.courses = 0
+        self.credits = 0.0
+        self.quality = 0.0  # Sum of points * credits
+
+    def add(self, credits: float, points: float, sign: int = 1) -> None:
+        self.courses += sign
+        if not self.courses:
+            self.credits = self.quality = 0.0  # Drop accumulated rounding
+            return
+        self.credits += sign * credits
+        self.quality += sign * points * credits
+
+    @property
+    def gpa(self) -> float:
+        return self.quality / self.credits if self.credits else 0.0
+
+
+class Gradebook:
+    """Courses grouped by student and term, with totals kept up to date.
+
+    Every add or remove updates the (student, term) totals and the student's
+    cumulative totals in O(1), so term GPA, cumulative GPA and dean's-list
+    checks are dictionary lookups rather than rescans. Cumulative GPA up to a
+    term uses the student's terms in sorted order, so term labels should sort
+    chronologically (e.g. "2024-1", "2024-2").
+    """
+    def __init__(self, courses: Iterable[Dict[str, Any]] = ()):
+        # Using nested dictionaries: student -> term -> totals
+        self._terms: Dict[str, Dict[str, Totals]] = {}
+        self._students: Dict[str, Totals] = {}
+        # Using sets for the students on each term's dean's list
+        self._deans_list: Dict[str, Set[str]] = {}
+        # Sorted terms with cumulative (credits, quality) through each, rebuilt lazily per student
+        self._running: Dict[str, Tuple[List[str], List[Tuple[float, float]]]] = {}
+        self.load(courses)
+
+    @staticmethod
+    def key(course: Dict[str, Any]) -> Tuple[str, str]:
+        return course.get("student", DEFAULT_STUDENT), course.get("term", "")
+
+#==================================================
+# Updates
+#==================================================
+    def load(self, courses: Iterable[Dict[str, Any]]) -> None:
+        self._terms.clear()
+        self._students.clear()
+        self._deans_list.clear()
+        self._running.clear()
+        for course in courses:
+            self.add(course)
+
+    def add(self, course: Dict[str, Any], sign: int = 1) -> None:
+        """Count a course in its term and student totals (``sign=-1`` removes it)"""
+        student, term = self.key(course)
+        credits, points = course["credits"], course["points"]
+        terms = self._terms.setdefault(student, {})
+        totals = terms.get(term)
+        if totals is None:
+            totals = terms[term] = Totals()
+        totals.add(credits, points, sign)
+        self._students.setdefault(student, Totals()).add(credits, points, sign)
+
+        if not totals.courses:
+            del terms[term]
+        if not self._students[student].courses:
+            del self._students[student]
+            del self._terms[student]
+        self._running.pop(student, None)
+        self._update_deans_list(student, term, totals)
+
+    def remove(self, course: Dict[str, Any]) -> None:
+        self.add(course, sign=-1)
+
+    def _update_deans_list(self, student: str, term: str, totals: Totals) -> None:
+        listed = self._deans_list.setdefault(term, set())
+        if totals.courses and totals.credits >= DEANS_LIST_MIN_CREDITS and totals.gpa >= DEANS_LIST_GPA:
+            listed.add(student)
+        else:
+            listed.discard(student)
+            if not listed:
+                del self._deans_list[term]
+
+#==================================================
+# Queries
+#==================================================
+    def students(self) -> List[str]:
+        return list(self._students)
+
+    def terms(self, student: str) -> List[str]:
+        return sorted(self._terms.get(student, {}))
+
+    def term_totals(self, student: str, term: str) -> Optional[Totals]:
+        return self._terms.get(student, {}).get(term)
+
+    def term_gpa(self, student: str, term: str) -> float:
+        totals = self.term_totals(student, term)
+        return totals.gpa if totals else 0.0
+
+    def cumulative_totals(self, student: str) -> Optional[Totals]:
+        return self._students.get(student)
+
+    def cumulative_gpa(self, student: str, through_term: Optional[str] = None) -> float:
+        """Cumulative GPA over all terms, or over the terms up to and including ``through_term``"""
+        if through_term is None:
+            totals = self._students.get(student)
+            return totals.gpa if totals else 0.0
+        running = self._running.get(student)
+        if running is None:
+            running = self._running[student] = self._build_running(student)
+        terms, sums = running
+        position = bisect.bisect_right(terms, through_term)
+        if not position:
+            return 0.0
+        credits, quality = sums[position - 1]
+        return quality / credits if credits else 0.0
+
+    def _build_running(self, student: str) -> Tuple[List[str], List[Tuple[float, float]]]:
+        terms = self.terms(student)
+        sums = []
+        credits = quality = 0.0
+        for term in terms:
+            totals = self._terms[student][term]
+            credits += totals.credits
+            quality += totals.quality
+            sums.append((credits, quality))
+        return terms, sums
+
+    def on_deans_list(self, student: str, term: str) -> bool:
+        return student in self._deans_list.get(term, ())
+
+    def deans_list(self, term: str) -> Set[str]:
+        return set(self._deans_list.get(term, ()))
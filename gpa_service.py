@@ -0,0 +1,239 @@
+from base_app import BaseApp, StorageBackend
+from gpa_analytics import CourseColumns
+from gpa_model import Gradebook, Totals
+from grade_scales import load_scales
+from course_io import read_course_rows, write_courses, batches, Row
+from typing import Dict, Set, Tuple, List, Any, Optional
+
+
+class CourseService(BaseApp):
+    """Courses, grade scales and GPA figures without any widgets.
+
+    GPACalculatorApp is the Tk view on top of this class; batch jobs and
+    benchmarks can use it directly, with no display. Every change keeps the
+    course list, its NumPy columns and the per-student gradebook in step and
+    is saved as a change record.
+    """
+    def __init__(self, filename: str = "gpa_data.json", storage: Optional[StorageBackend] = None):
+        super().__init__(filename, storage)
+
+        # Encapsulation to make the data private
+        self._courses = self.load_data()
+        # Column copy of the courses for analytics, kept in step with _courses
+        self._analytics = CourseColumns(self._courses)
+        # Per-student, per-term running totals, also kept in step with _courses
+        self._gradebook = Gradebook(self._courses)
+        # Using dictionary of compiled scales: built-in plus grade_scales.json
+        self._scales = load_scales()
+
+    # Encapsulation which is getter method for courses
+    def get_courses(self) -> List[Dict]:
+        return self._courses.copy()  # Return copy to prevent direct modification
+
+    # Encapsulation for Setter method for courses
+    def set_courses(self, courses: List[Dict]) -> None:
+        self._courses = courses
+        self._analytics.load(courses)
+        self._gradebook.load(courses)
+        self.save_data(self._courses)
+
+    @property
+    def scales(self):
+        return self._scales
+
+#==================================================
+# Courses
+#==================================================
+    def calculate_grade_points(self, grade: str, scale: str) -> Optional[float]:
+        """Grade points for a grade on one of the loaded scales, None if invalid"""
+        grade_scale = self._scales.get(scale)
+        return grade_scale.points(grade) if grade_scale else None
+
+    def create_course(self, name: str, grade: str, credits: Any, scale: str,
+                      student: str = "", term: str = "") -> Dict[str, Any]:
+        """Validate, add and save one course; raises ValueError with a user-facing message"""
+        name, grade, credits = name.strip(), grade.upper().strip(), str(credits).strip()
+        if not name or not grade or not credits:
+            raise ValueError("Please fill all fields")
+        try:
+            credits = float(credits)
+            if credits <= 0:
+                raise ValueError("Credit must be positive")
+        except ValueError as e:
+            raise ValueError(f"Invalid credit: {e}")
+
+        points = self.calculate_grade_points(grade, scale)
+        if points is None:
+            raise ValueError("Invalid grade")
+
+        course = {"name": name, "grade": grade, "credits": credits, "points": points}
+        # Student and term are stored only when given
+        for key, value in (("student", student.strip()), ("term", term.strip())):
+            if value:
+                course[key] = value
+
+        self._courses.append(course)
+        self._analytics.append(course)
+        self._gradebook.add(course)
+        # The first course saves the whole list: a fresh data file has no list to append to
+        changes = [("set", (len(self._courses) - 1,), course)] if len(self._courses) > 1 else None
+        self.save_data(self._courses, changes)
+        return course
+
+    def remove_course(self, index: int) -> Dict[str, Any]:
+        course = self._courses[index]
+        self._gradebook.remove(course)
+        del self._courses[index]
+        self._analytics.delete(index)
+        self.save_data(self._courses)
+        return course
+
+    def remove_all_courses(self) -> None:
+        self._courses = []
+        self._analytics.clear()
+        self._gradebook.load(())
+        self.save_data(self._courses)
+
+#==================================================
+# Bulk import / export
+#==================================================
+    def import_courses(self, path: str, scale: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Validate and add every course in a CSV / JSON Lines file.
+
+        The whole file is validated first, then committed with one save;
+        invalid rows are skipped and reported as "line N: reason". Returns
+        (courses added, error messages).
+        """
+        new_courses: List[Dict[str, Any]] = []
+        errors: List[str] = []
+        for batch in batches(read_course_rows(path)):
+            new_courses.extend(self._validate_batch(batch, scale, errors))
+        if not new_courses:
+            return [], errors
+
+        start = len(self._courses)
+        self._courses.extend(new_courses)
+        self._analytics.extend(new_courses)
+        for course in new_courses:
+            self._gradebook.add(course)
+        # One batch of changes: a single journal append / database transaction
+        changes = [("set", (start + i,), c) for i, c in enumerate(new_courses)] if start else None
+        self.save_data(self._courses, changes)
+        return new_courses, errors
+
+    def _validate_batch(self, batch: List[Row], scale: str, errors: List[str]) -> List[Dict[str, Any]]:
+        """Turn raw rows into course dicts, appending a message to ``errors`` per bad row"""
+        # First pass checks the fields; grade points then come from one batch call per scale
+        parsed: List[Tuple[int, Dict[str, Any], str, str, float, str]] = []
+        for line, row in batch:
+            if row is None:
+                errors.append(f"line {line}: not a valid row")
+                continue
+            name = str(row.get("name") or "").strip()
+            grade = str(row.get("grade") or "").upper().strip()
+            row_scale = str(row.get("scale") or scale).strip()
+            if not name or not grade:
+                errors.append(f"line {line}: missing course name or grade")
+                continue
+            try:
+                credits = float(row.get("credits"))
+            except (TypeError, ValueError):
+                errors.append(f"line {line}: invalid credits {row.get('credits')!r}")
+                continue
+            if not credits > 0:
+                errors.append(f"line {line}: credits must be positive")
+                continue
+            if row_scale not in self._scales:
+                errors.append(f"line {line}: unknown grade scale {row_scale!r}")
+                continue
+            parsed.append((line, row, name, grade, credits, row_scale))
+
+        # Using dictionary to group row positions by scale
+        by_scale: Dict[str, List[int]] = {}
+        for i, parsed_row in enumerate(parsed):
+            by_scale.setdefault(parsed_row[5], []).append(i)
+        points_by_row = [0.0] * len(parsed)
+        for scale_name, positions in by_scale.items():
+            points = self._scales[scale_name].points_batch([parsed[i][3] for i in positions])
+            for i, value in zip(positions, points.tolist()):
+                points_by_row[i] = value
+
+        courses = []
+        for (line, row, name, grade, credits, row_scale), points in zip(parsed, points_by_row):
+            if points != points:  # NaN: not a grade on this scale
+                errors.append(f"line {line}: invalid grade {grade!r} for the {row_scale} scale")
+                continue
+            course = {"name": name, "grade": grade, "credits": credits, "points": points}
+            for key in ("student", "term"):
+                value = str(row.get(key) or "").strip()
+                if value:
+                    course[key] = value
+            courses.append(course)
+        return courses
+
+    def export_courses(self, path: str) -> int:
+        """Write every course to a CSV / JSON Lines file; returns the number written"""
+        return write_courses(path, self._courses)
+
+#==================================================
+# Statistics
+#==================================================
+    def gpa_totals(self) -> Tuple[float, float, float]:
+        """(total credits, total grade points, GPA) from running totals, O(1)"""
+        return self._analytics.total_credits, self._analytics.total_quality, self._analytics.gpa
+
+    def unique_course_count(self) -> int:
+        # Using set to get unique course names
+        unique_courses: Set[str] = {course["name"] for course in self._courses}
+        return len(unique_courses)
+
+    def course_summary(self) -> Dict[str, Any]:
+        """GPA, distributions, percentiles and per-term aggregates"""
+        return self._analytics.summary()
+
+    def term_summary(self, student: str) -> List[Tuple[str, Totals, float, bool]]:
+        """(term, term totals, cumulative GPA through the term, on dean's list) per term"""
+        # Every figure is a lookup in the gradebook's running totals
+        return [(term, self._gradebook.term_totals(student, term),
+                 self._gradebook.cumulative_gpa(student, term), self._gradebook.on_deans_list(student, term))
+                for term in self._gradebook.terms(student)]
+
+    def students(self) -> List[str]:
+        return self._gradebook.students()
+
+    def cumulative_gpa(self, student: str) -> float:
+        return self._gradebook.cumulative_gpa(student)
+
+    # Override base class method to demonstrate inheritance
+    def load_data(self) -> List[Dict]:
+        """Enhanced load_data method with additional validation"""
+        data = super().load_data()
+
+        # Validate loaded data structure
+        valid_data = []
+        for item in data:
+            if (isinstance(item, dict) and
+                all(key in item for key in ['name', 'grade', 'credits', 'points'])):
+                valid_data.append(item)
+
+        # Positions in the stored list no longer match, so the next save is a whole one
+        if len(valid_data) != len(data):
+            self._stored_differs = True
+        return valid_data
+
+    # Implement abstract method from BaseApp
+    def get_statistics(self) -> Dict[str, Any]:
+        """Return comprehensive statistics about the courses"""
+        if not self._courses:
+            return {"message": "No courses available"}
+
+        # Using dictionary for comprehensive statistics
+        stats = self._analytics.summary()
+        stats["course_names"] = [c["name"] for c in self._courses]
+        stats["students"] = {
+            student: {"gpa": self._gradebook.cumulative_gpa(student),
+                      "terms": {term: self._gradebook.term_gpa(student, term)
+                                for term in self._gradebook.terms(student)}}
+            for student in self._gradebook.students()
+        }
+        return stats
@@ -0,0 +1,128 @@
+import bisect
+import json
+import os
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional, Sequence
+
+# Institution-specific scales are read from this file when it exists
+SCALES_FILENAME = "grade_scales.json"
+
+# Built-in scales, in the same format as the config file
+DEFAULT_SCALES: List[Dict[str, Any]] = [
+    {
+        "name": "4.0",
+        "label": "4.0 Scale (A=4, B=3, C=2, D=1, F=0)",
+        "type": "letter",
+        "grades": {
+            "A+": 4.00, "A": 4.00, "A-": 3.67,
+            "B+": 3.33, "B": 3.00, "B-": 2.67,
+            "C+": 2.33, "C": 2.00, "C-": 1.67,
+            "D+": 1.33, "D": 1.00, "D-": 0.67,
+            "F": 0.00,
+        },
+    },
+    {
+        "name": "100",
+        "label": "100 Scale (Percentage)",
+        "type": "bands",
+        # [lowest mark, points]: a mark earns the points of the highest band it reaches
+        "bands": [[80, 4.0], [75, 3.67], [70, 3.33], [65, 3.00], [60, 2.67], [55, 2.33], [50, 2.00]],
+        "below": 0.0,
+    },
+]
+
+
+class GradeScale:
+    """A grade scale compiled into a lookup table.
+
+    Letter scales are a dictionary from grade to points. Band scales keep the
+    band floors sorted ascending next to their points, so a mark is placed
+    with one bisect (``np.searchsorted`` for a whole array in ``points_batch``).
+    Unknown grades and unreadable marks give None (NaN in batches).
+    """
+    def __init__(self, name: str, label: str, kind: str,
+                 grades: Optional[Dict[str, float]] = None,
+                 bands: Optional[Sequence[Tuple[float, float]]] = None, below: float = 0.0):
+        self.name = name
+        self.label = label
+        self.kind = kind
+        # Using match statement to compile each kind of scale
+        match kind:
+            case "letter":
+                if not grades:
+                    raise ValueError(f"Scale '{name}' has no grades")
+                self._table = {grade.strip().upper(): float(points) for grade, points in grades.items()}
+            case "bands":
+                if not bands:
+                    raise ValueError(f"Scale '{name}' has no bands")
+                ordered = sorted((float(floor), float(points)) for floor, points in bands)
+                self._floors = [floor for floor, _ in ordered]
+                self._points = [points for _, points in ordered]
+                self._floor_array = np.array(self._floors)
+                self._point_array = np.array(self._points)
+                self._below = float(below)
+            case _:
+                raise ValueError(f"Scale '{name}' has unknown type '{kind}'")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "GradeScale":
+        name = str(config["name"])
+        return cls(name, config.get("label", name), config.get("type", "letter"),
+                   grades=config.get("grades"), bands=config.get("bands"), below=config.get("below", 0.0))
+
+    def points(self, grade: str) -> Optional[float]:
+        """Grade points for one letter grade or mark"""
+        if self.kind == "letter":
+            return self._table.get(str(grade).strip().upper())
+        try:
+            mark = float(grade)
+        except (TypeError, ValueError):
+            return None
+        if mark != mark:
+            return None  # NaN
+        index = bisect.bisect_right(self._floors, mark) - 1
+        return self._points[index] if index >= 0 else self._below
+
+    def points_batch(self, grades: Sequence[Any]) -> np.ndarray:
+        """Grade points for many grades in one call, NaN where a grade is invalid"""
+        if self.kind == "letter":
+            table = self._table
+            return np.fromiter((table.get(str(g).strip().upper(), np.nan) for g in grades),
+                               dtype=float, count=len(grades))
+        marks = np.fromiter((_to_float(g) for g in grades), dtype=float, count=len(grades))
+        index = np.searchsorted(self._floor_array, marks, side="right") - 1
+        points = np.where(index >= 0, self._point_array[np.maximum(index, 0)], self._below)
+        points[np.isnan(marks)] = np.nan
+        return points
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def load_scales(filename: str = SCALES_FILENAME) -> Dict[str, GradeScale]:
+    """Built-in scales plus those defined in ``filename``, keyed by name.
+
+    The file holds ``{"scales": [...]}`` in the DEFAULT_SCALES format; a scale
+    with a built-in's name replaces it. A bad file is reported and skipped.
+    """
+    configs = list(DEFAULT_SCALES)
+    if os.path.exists(filename):
+        try:
+            with open(filename) as f:
+                configs += json.load(f)["scales"]
+        except (IOError, ValueError, KeyError, TypeError) as e:
+            print(f"Error loading grade scales: {e}")
+
+    scales: Dict[str, GradeScale] = {}
+    for config in configs:
+        try:
+            scale = GradeScale.from_config(config)
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Skipping grade scale {config.get('name', '?') if isinstance(config, dict) else config!r}: {e}")
+            continue
+        scales[scale.name] = scale
+    return scales
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import Counter
+from typing import Dict, List, Iterable
+from base_app import JournaledJsonStorage, Change
+
+# Bytes read at a time while hashing
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Bumped whenever the blob layout or the refs file format changes
+STORE_VERSION = 1
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file's content as hex"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Content-addressed image blobs with reference counts.
+
+    An image id is ``<sha256><ext>`` and its blob lives at
+    ``<root>/<first two hex digits>/<id>``, so inserting a file that is
+    already stored only costs hashing it. Reference counts (how many note
+    image slots point at a blob) live in a journaled ``refs.json`` next to
+    the blobs; a blob is deleted once its last reference is released.
+    """
+    def __init__(self, root: str = "notes_images"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._storage = JournaledJsonStorage(os.path.join(root, "refs.json"), indent=None)
+
+        data = None
+        try:
+            data = self._storage.load()
+        except (IOError, ValueError) as e:
+            print(f"Error loading image references: {e}")
+        if not data or data.get("version") != STORE_VERSION:
+            data = {"version": STORE_VERSION, "refs": {}}
+            self._storage.save(data)
+        self._data = data
+        self._refs: Dict[str, int] = data["refs"]
+
+    @staticmethod
+    def is_blob_id(image_id: str) -> bool:
+        digest = os.path.splitext(image_id)[0]
+        return len(digest) == 64 and all(c in "0123456789abcdef" for c in digest)
+
+    def path(self, image_id: str) -> str:
+        return os.path.join(self.root, image_id[:2], image_id)
+
+    def exists(self, image_id: str) -> bool:
+        return os.path.exists(self.path(image_id))
+
+    def count(self) -> int:
+        """Number of distinct images referenced by notes"""
+        return len(self._refs)
+
+    def add_file(self, source: str, move: bool = False) -> str:
+        """Store a file (unless identical content is already stored) and take a reference to it.
+
+        With ``move`` the source is renamed into the store instead of copied.
+        """
+        image_id = self.import_file(source, move)
+        self.retain(image_id)
+        return image_id
+
+    def import_file(self, source: str, move: bool = False) -> str:
+        """Store a file's content without taking a reference"""
+        image_id = hash_file(source) + os.path.splitext(source)[1].lower()
+        target = self.path(image_id)
+        if os.path.exists(target):
+            if move:
+                os.remove(source)
+            return image_id
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if move:
+            try:
+                os.replace(source, target)
+                return image_id
+            except OSError:
+                pass  # Different filesystem; fall back to copy and delete
+        # Copy under a temporary name so a crash never leaves a partial blob
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        if move:
+            os.remove(source)
+        return image_id
+
+    def retain(self, image_id: str) -> None:
+        count = self._refs.get(image_id, 0) + 1
+        self._refs[image_id] = count
+        self._storage.apply(self._data, [("set", ("refs", image_id), count)])
+
+    def release(self, image_ids: Iterable[str]) -> None:
+        """Drop one reference per id, deleting blobs whose count reaches zero.
+
+        Ids without a count are left alone: another note may still use the
+        blob, and ``gc`` rebuilds the counts from the notes.
+        """
+        changes: List[Change] = []
+        for image_id in image_ids:
+            if image_id not in self._refs:
+                continue
+            count = self._refs[image_id] - 1
+            if count > 0:
+                self._refs[image_id] = count
+                changes.append(("set", ("refs", image_id), count))
+                continue
+            del self._refs[image_id]
+            changes.append(("del", ("refs", image_id)))
+            self._remove_blob(image_id)
+        if changes:
+            self._storage.apply(self._data, changes)
+
+    def gc(self, references: Iterable[str]) -> int:
+        """Reset the counts from every image reference in the notes and delete unreferenced blobs.
+
+        Returns the number of blobs deleted.
+        """
+        self._refs.clear()
+        self._refs.update(Counter(references))
+        self._storage.save(self._data)
+
+        removed = 0
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name not in self._refs:
+                    os.remove(os.path.join(shard_dir, name))
+                    removed += 1
+        return removed
+
+    def _remove_blob(self, image_id: str) -> None:
+        try:
+            os.remove(self.path(image_id))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._storage.close()
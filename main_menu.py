@@ -1,11 +1,93 @@
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk
-from gpa_calculator import GPACalculatorApp
-from reminder_app import ReminderApp
-from notes_organizer import NotesOrganizer
+from typing import Dict, Tuple, Any, Optional
+
+# Using dictionary to map each app to (module, class); modules are imported
+# the first time the app is opened so the menu shows without loading them
+APP_REGISTRY: Dict[str, Tuple[str, str]] = {
+    "GPA Calculator": ("gpa_calculator", "GPACalculatorApp"),
+    "Reminder App": ("reminder_app", "ReminderApp"),
+    "Notes Organizer": ("notes_organizer", "NotesOrganizer"),
+}
+
+# Modules imported in the background once the menu is on screen
+WARM_IMPORTS = ("gpa_calculator", "reminder_app", "notes_organizer", "PIL.ImageTk",
+                "gpa_chart")
+
+# Delay after first paint before warm imports start
+WARM_IMPORT_DELAY_MS = 500
+
+
+def load_app_class(app_name):
+    """Import an app's module and return its class"""
+    module_name, class_name = APP_REGISTRY[app_name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def preload_modules(modules=WARM_IMPORTS):
+    """Import modules so opening an app later finds them in sys.modules"""
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Error pre-loading {module_name}: {e}")
+
+
+class AppLifecycle:
+    """Creates each app once and keeps it alive across menu navigation.
+
+    Leaving an app suspends it and hides its frame instead of destroying it,
+    so going back needs no disk reads or widget rebuilding, and background
+    workers such as the reminder scheduler exist once per app. close_all
+    stops them when the window closes.
+    """
+    def __init__(self):
+        # Using dictionary of app name -> (frame, app instance)
+        self._apps: Dict[str, Tuple[ttk.Frame, Any]] = {}
+        self.active: Optional[str] = None
+
+    def __contains__(self, app_name):
+        return app_name in self._apps
+
+    def add(self, app_name, frame, app):
+        """Register a newly created app as the active one"""
+        self._apps[app_name] = (frame, app)
+        self.active = app_name
+
+    def show(self, app_name):
+        """Show a cached app again and resume it"""
+        frame, app = self._apps[app_name]
+        frame.grid()
+        app.resume()
+        self.active = app_name
+        return frame, app
+
+    def hide(self):
+        """Suspend the active app and hide its frame"""
+        if self.active is None:
+            return
+        frame, app = self._apps[self.active]
+        self.active = None
+        try:
+            app.suspend()
+        finally:
+            frame.grid_remove()
+
+    def close_all(self):
+        """Close every app, flushing its pending writes"""
+        for app_name, (frame, app) in self._apps.items():
+            try:
+                app.close()
+            except Exception as e:
+                print(f"Error closing {app_name}: {e}")
+        self._apps.clear()
+        self.active = None
+
 
 class StudentAssistantApp:
-    def __init__(self, root):
+    def __init__(self, root, warm_imports=True):
         self.root = root
         self.root.title("Student Assistant App")
         self.root.geometry("1000x800")
@@ -17,24 +99,23 @@ class StudentAssistantApp:
         # Store reference to current app
         self.current_app = None
         self.current_app_frame = None
+        self.apps = AppLifecycle()
         
-        # Create main menu frame
+        # Create main menu frame once; navigation only hides and shows it
         self.main_menu_frame = ttk.Frame(self.root)
         self.main_menu_frame.grid(row=0, column=0, sticky="nsew")
-        
-        self.show_main_menu()
+        self.build_main_menu()
 
-    def show_main_menu(self):
-        """Display the main menu"""
-        # Clear current app if any
-        if self.current_app_frame:
-            self.current_app_frame.destroy()
-            self.current_app = None
-        
-        # Recreate main menu frame
-        self.main_menu_frame = ttk.Frame(self.root)
-        self.main_menu_frame.grid(row=0, column=0, sticky="nsew")
-        
+        # Python's import lock makes switch_to_app wait for a module the
+        # warm-up thread is still importing instead of importing it twice
+        if warm_imports:
+            self.root.after(WARM_IMPORT_DELAY_MS, self._start_warm_imports)
+
+    def _start_warm_imports(self):
+        threading.Thread(target=preload_modules, name="warm-imports", daemon=True).start()
+
+    def build_main_menu(self):
+        """Create the main menu widgets"""
         self.main_menu_frame.rowconfigure(0, weight=1)
         self.main_menu_frame.columnconfigure(0, weight=1)
 
@@ -45,14 +126,10 @@ class StudentAssistantApp:
         ttk.Label(center_frame, text="TAR UMT Student Assistant", 
                  font=('Arial', 16, 'bold')).pack(pady=20)
         
-        # Using tuple for fixed button texts
-        button_texts = ("GPA Calculator", "Reminder App", "Notes Organizer")
-        button_commands = (self.open_gpa_calculator, self.open_reminder_app, 
-                           self.open_notes_organizer)
-
-        # Using zip with tuples
-        for text, command in zip(button_texts, button_commands):
-            btn = ttk.Button(center_frame, text=text, command=command, width=25)
+        # Using the registry order for the buttons
+        for text in APP_REGISTRY:
+            btn = ttk.Button(center_frame, text=text, width=25,
+                             command=lambda name=text: self.switch_to_app(name))
             btn.pack(pady=12)
             btn.configure(style="Big.TButton")
         
@@ -60,22 +137,37 @@ class StudentAssistantApp:
         style = ttk.Style()
         style.configure("Big.TButton", font=('Arial', 12), padding=10)
 
+    def show_main_menu(self):
+        """Display the main menu"""
+        # Suspend the current app; it stays cached for the next visit
+        self.apps.hide()
+        self.current_app = None
+        self.current_app_frame = None
+        self.main_menu_frame.grid()
+
     def open_gpa_calculator(self):
         """Switch to GPA Calculator"""
-        self.switch_to_app("GPA Calculator", GPACalculatorApp)
+        self.switch_to_app("GPA Calculator")
 
     def open_reminder_app(self):
         """Switch to Reminder App"""
-        self.switch_to_app("Reminder App", ReminderApp)
+        self.switch_to_app("Reminder App")
 
     def open_notes_organizer(self):
         """Switch to Notes Organizer"""
-        self.switch_to_app("Notes Organizer", NotesOrganizer)
+        self.switch_to_app("Notes Organizer")
 
-    def switch_to_app(self, app_name, app_class):
+    def switch_to_app(self, app_name, app_class=None):
         """Switch to a specific application"""
-        # Clear main menu
-        self.main_menu_frame.destroy()
+        if app_name in self.apps:
+            self.main_menu_frame.grid_remove()
+            self.current_app_frame, self.current_app = self.apps.show(app_name)
+            return
+        if app_class is None:
+            app_class = load_app_class(app_name)
+        
+        # Hide main menu
+        self.main_menu_frame.grid_remove()
         
         # Create container for the app
         self.current_app_frame = ttk.Frame(self.root)
@@ -100,12 +192,12 @@ class StudentAssistantApp:
         
         # Initialize the application
         self.current_app = app_class(app_container)
+        self.apps.add(app_name, self.current_app_frame, self.current_app)
 
     def on_closing(self):
         """Handle application closing"""
-        if self.current_app:
-            # Add any cleanup needed for current app
-            pass
+        # Flush pending writes and stop app threads before the process exits
+        self.apps.close_all()
         self.root.destroy()
 
 if __name__ == "__main__":
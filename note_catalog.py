@@ -0,0 +1,112 @@
+from typing import AbstractSet, Dict, List, Set, Tuple, Any, Optional, Iterable
+
+
+class NoteCatalog:
+    """In-memory indexes over the notes, keyed by their stable ids.
+
+    Keeps id -> note, id -> (folder, position), folder -> ordered ids and
+    tag -> ids, so lookups by id and by tag cost O(1) and tag edits touch
+    only the affected notes. Folders are added as they are loaded, which
+    keeps lazily loaded storages from reading every folder up front.
+    NotesService updates the catalog from each of its mutators.
+    """
+    def __init__(self):
+        self._notes: Dict[str, Dict[str, Any]] = {}
+        self._folders: Dict[str, List[str]] = {}
+        self._locations: Dict[str, Tuple[str, int]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+
+    def clear(self) -> None:
+        self._notes.clear()
+        self._folders.clear()
+        self._locations.clear()
+        self._tags.clear()
+
+#==================================================
+# Lookups
+#==================================================
+    def has_folder(self, folder: str) -> bool:
+        return folder in self._folders
+
+    def note(self, note_id: str) -> Optional[Dict[str, Any]]:
+        return self._notes.get(note_id)
+
+    def location(self, note_id: str) -> Optional[Tuple[str, int]]:
+        """(folder, position) of a note, or None if it is not indexed"""
+        return self._locations.get(note_id)
+
+    def folder_ids(self, folder: str) -> List[str]:
+        """Ids of a folder's notes in list order"""
+        return list(self._folders.get(folder, []))
+
+    def tagged(self, tag: str) -> AbstractSet[str]:
+        """Ids of the notes carrying a tag: the index's own set, not to be modified"""
+        return self._tags.get(tag, frozenset())
+
+    def used_tags(self) -> Set[str]:
+        return set(self._tags)
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Notes per used tag, read off the tag sets"""
+        return {tag: len(note_ids) for tag, note_ids in self._tags.items()}
+
+    def all_ids(self) -> AbstractSet[str]:
+        """Live view of every indexed id"""
+        return self._notes.keys()
+
+#==================================================
+# Updates
+#==================================================
+    def add_folder(self, folder: str, notes: Iterable[Dict[str, Any]]) -> None:
+        """Index a folder's notes (which must all have ids)"""
+        self._folders[folder] = []
+        for note in notes:
+            self.add_note(folder, note)
+
+    def drop_folder(self, folder: str) -> List[str]:
+        """Forget a folder; returns the ids of its notes"""
+        note_ids = self._folders.pop(folder, [])
+        for note_id in note_ids:
+            self._forget(note_id)
+        return note_ids
+
+    def add_note(self, folder: str, note: Dict[str, Any]) -> int:
+        """Index a note appended to a folder; returns its position"""
+        note_ids = self._folders.setdefault(folder, [])
+        note_id = note["id"]
+        self._notes[note_id] = note
+        self._locations[note_id] = (folder, len(note_ids))
+        note_ids.append(note_id)
+        self.retag(note_id, (), note.get("tags", []))
+        return len(note_ids) - 1
+
+    def remove_note(self, note_id: str) -> Optional[Tuple[str, int]]:
+        """Unindex a note; returns where it was. Later notes of its folder move up one."""
+        location = self._locations.get(note_id)
+        if location is None:
+            return None
+        folder, position = location
+        note_ids = self._folders[folder]
+        del note_ids[position]
+        for later_position in range(position, len(note_ids)):
+            self._locations[note_ids[later_position]] = (folder, later_position)
+        self._forget(note_id)
+        return location
+
+    def retag(self, note_id: str, old_tags: Iterable[str], new_tags: Iterable[str]) -> None:
+        """Move a note between tag sets after its tags changed"""
+        old_tags, new_tags = set(old_tags), set(new_tags)
+        for tag in old_tags - new_tags:
+            tagged = self._tags.get(tag)
+            if tagged is not None:
+                tagged.discard(note_id)
+                if not tagged:
+                    del self._tags[tag]
+        for tag in new_tags - old_tags:
+            self._tags.setdefault(tag, set()).add(note_id)
+
+    def _forget(self, note_id: str) -> None:
+        note = self._notes.pop(note_id, None)
+        self._locations.pop(note_id, None)
+        if note is not None:
+            self.retag(note_id, note.get("tags", []), ())
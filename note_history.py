@@ -0,0 +1,267 @@
+import base64
+import difflib
+import json
+import threading
+import time
+import zlib
+from typing import Dict, List, Tuple, Any, Optional, Iterable
+from base_app import JournaledJsonStorage, Change
+
+# Bumped whenever the revision encoding or the on-disk layout changes
+HISTORY_VERSION = 1
+
+# Every this many revisions the full text is stored instead of a delta,
+# so rebuilding a revision never applies more than SNAPSHOT_INTERVAL - 1 deltas
+SNAPSHOT_INTERVAL = 10
+# Revisions kept per note; older ones are dropped
+MAX_REVISIONS = 50
+# Saves this soon after the previous revision replace it instead of adding one,
+# so autosaves during a burst of typing end up as a single revision
+MERGE_SECONDS = 120
+
+
+def encode_payload(value: Any) -> str:
+    """JSON, zlib-compressed and base64-encoded so it fits in a JSON string"""
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 9)).decode("ascii")
+
+
+def decode_payload(payload: str) -> Any:
+    return json.loads(zlib.decompress(base64.b64decode(payload)).decode("utf-8"))
+
+
+def make_delta(old: str, new: str) -> List[Any]:
+    """Line delta turning ``old`` into ``new``.
+
+    Each op is a line count to copy from ``old`` (positive), to skip in
+    ``old`` (negative), or a string of lines to insert. Lines shared at the
+    start and end are copied without diffing, and only the middle is diffed,
+    as line numbers rather than strings, so a small edit to a large note
+    stays cheap.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    prefix = 0
+    limit = min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    ops: List[Any] = []
+    if prefix:
+        ops.append(prefix)
+    old_middle = old_lines[prefix:len(old_lines) - suffix]
+    new_middle = new_lines[prefix:len(new_lines) - suffix]
+    if old_middle and new_middle:
+        # Number the distinct lines so the matcher hashes and compares ints
+        numbers: Dict[str, int] = {}
+        old_numbers = [numbers.setdefault(line, len(numbers)) for line in old_middle]
+        new_numbers = [numbers.setdefault(line, len(numbers)) for line in new_middle]
+        matcher = difflib.SequenceMatcher(None, old_numbers, new_numbers)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            match tag:
+                case "equal":
+                    ops.append(i2 - i1)
+                case "delete":
+                    ops.append(i1 - i2)
+                case "insert":
+                    ops.append("".join(new_middle[j1:j2]))
+                case "replace":
+                    ops.append(i1 - i2)
+                    ops.append("".join(new_middle[j1:j2]))
+    elif old_middle:
+        ops.append(-len(old_middle))
+    elif new_middle:
+        ops.append("".join(new_middle))
+    if suffix:
+        ops.append(suffix)
+    return ops
+
+
+def apply_delta(old: str, ops: Iterable[Any]) -> str:
+    """Rebuild the newer text from ``old`` and a make_delta() result"""
+    old_lines = old.splitlines(keepends=True)
+    parts: List[str] = []
+    position = 0
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(old_lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return "".join(parts)
+
+
+class NoteHistory:
+    """Compressed revision history of note content and formats, per note id.
+
+    A revision is either a snapshot (the full content and formats) or a line
+    delta against the revision before it, both stored zlib-compressed. A
+    snapshot starts every SNAPSHOT_INTERVAL revisions, so any revision is
+    rebuilt from at most that many payloads. At most MAX_REVISIONS are kept
+    per note. Revisions are dict entries keyed by their number in a journaled
+    ``notes_history.json``, so recording one only appends that revision.
+    """
+    def __init__(self, filename: str = "notes_history.json"):
+        self._storage = JournaledJsonStorage(filename, indent=None)
+        self._lock = threading.RLock()
+
+        data = None
+        try:
+            data = self._storage.load()
+        except (IOError, ValueError) as e:
+            print(f"Error loading note history: {e}")
+        if not data or data.get("version") != HISTORY_VERSION:
+            data = {"version": HISTORY_VERSION, "notes": {}}
+            self._storage.save(data)
+        self._data = data
+        # Note id -> {revision number as str: revision}, oldest first
+        self._notes: Dict[str, Dict[str, Dict[str, Any]]] = data["notes"]
+        # Note id -> (number, content, formats) of its latest revision, filled on use
+        self._latest: Dict[str, Tuple[int, str, List[Dict[str, Any]]]] = {}
+
+#==================================================
+# Recording
+#==================================================
+    def record(self, note_id: str, content: str, formats: List[Dict[str, Any]],
+               previous: Optional[Tuple[str, List[Dict[str, Any]]]] = None) -> Optional[int]:
+        """Store a saved version of a note; returns its revision number, or None if unchanged.
+
+        ``previous`` is the (content, formats) the note had before this save.
+        It becomes the first revision of a note without history, so the
+        version the first edit replaced can be recovered too.
+        """
+        with self._lock:
+            revisions = self._notes.get(note_id)
+            changes: List[Change] = []
+            if not revisions:
+                revisions = self._notes[note_id] = {}
+                changes.append(("set", ("notes", note_id), revisions))
+                if previous is not None and previous != (content, formats):
+                    now = int(time.time())
+                    changes.extend(self._append(note_id, revisions, *previous, now=now, started=now))
+
+            latest = self._latest_revision(note_id)
+            if latest is not None and (latest[1], latest[2]) == (content, formats):
+                if changes:
+                    self._storage.apply(self._data, changes)
+                return None
+
+            now = int(time.time())
+            started = now
+            last_key = next(reversed(revisions), None)
+            if (last_key is not None and not changes and len(revisions) > 1
+                    and not revisions[last_key]["snapshot"]
+                    and now - revisions[last_key]["started"] < MERGE_SECONDS):
+                # Fold this save into the latest revision
+                started = revisions.pop(last_key)["started"]
+                self._latest.pop(note_id, None)
+                changes.append(("del", ("notes", note_id, last_key)))
+                latest = self._latest_revision(note_id)
+                if (latest[1], latest[2]) == (content, formats):
+                    # Edited back to the revision before
+                    self._storage.apply(self._data, changes)
+                    return None
+            changes.extend(self._append(note_id, revisions, content, formats, now, started))
+            changes.extend(self._prune(note_id, revisions))
+            self._storage.apply(self._data, changes)
+            return self._latest[note_id][0]
+
+    def _append(self, note_id: str, revisions: Dict[str, Dict[str, Any]], content: str,
+                formats: List[Dict[str, Any]], now: int, started: int) -> List[Change]:
+        """Add a revision after the latest one: a delta, or a snapshot at chain boundaries"""
+        latest = self._latest_revision(note_id)
+        number = latest[0] + 1 if latest is not None else 1
+        if latest is None or number % SNAPSHOT_INTERVAL == 1:
+            revision = {"time": now, "started": started, "snapshot": True,
+                        "data": encode_payload({"content": content, "formats": formats})}
+        else:
+            delta: Dict[str, Any] = {"ops": make_delta(latest[1], content)}
+            if formats != latest[2]:
+                delta["formats"] = formats
+            revision = {"time": now, "started": started, "snapshot": False, "data": encode_payload(delta)}
+        revisions[str(number)] = revision
+        self._latest[note_id] = (number, content, formats)
+        return [("set", ("notes", note_id, str(number)), revision)]
+
+    def _prune(self, note_id: str, revisions: Dict[str, Dict[str, Any]]) -> List[Change]:
+        """Drop the oldest revisions past MAX_REVISIONS, re-basing the first kept one as a snapshot"""
+        excess = len(revisions) - MAX_REVISIONS
+        if excess <= 0:
+            return []
+        keys = list(revisions)
+        first = keys[excess]
+        changes: List[Change] = []
+        if not revisions[first]["snapshot"]:
+            content, formats = self._rebuild(revisions, first)
+            revisions[first] = dict(revisions[first], snapshot=True,
+                                    data=encode_payload({"content": content, "formats": formats}))
+            changes.append(("set", ("notes", note_id, first), revisions[first]))
+        for key in keys[:excess]:
+            del revisions[key]
+            changes.append(("del", ("notes", note_id, key)))
+        return changes
+
+    def remove(self, note_id: str) -> None:
+        """Forget a deleted note's history"""
+        with self._lock:
+            self._latest.pop(note_id, None)
+            if self._notes.pop(note_id, None) is not None:
+                self._storage.apply(self._data, [("del", ("notes", note_id))])
+
+#==================================================
+# Reading
+#==================================================
+    def revisions(self, note_id: str) -> List[Tuple[int, int]]:
+        """(revision number, save time as epoch seconds) of a note's revisions, oldest first"""
+        with self._lock:
+            return [(int(key), revision["time"]) for key, revision in self._notes.get(note_id, {}).items()]
+
+    def revision(self, note_id: str, number: int) -> Optional[Dict[str, Any]]:
+        """Content and formats of one revision, or None if it is not kept"""
+        with self._lock:
+            revisions = self._notes.get(note_id, {})
+            key = str(number)
+            if key not in revisions:
+                return None
+            content, formats = self._rebuild(revisions, key)
+            return {"number": number, "time": revisions[key]["time"], "content": content, "formats": formats}
+
+    def stored_bytes(self, note_id: str) -> int:
+        """Size of a note's stored revision payloads"""
+        with self._lock:
+            return sum(len(revision["data"]) for revision in self._notes.get(note_id, {}).values())
+
+    def _latest_revision(self, note_id: str) -> Optional[Tuple[int, str, List[Dict[str, Any]]]]:
+        latest = self._latest.get(note_id)
+        revisions = self._notes.get(note_id)
+        if latest is None and revisions:
+            key = next(reversed(revisions))
+            latest = self._latest[note_id] = (int(key), *self._rebuild(revisions, key))
+        return latest
+
+    @staticmethod
+    def _rebuild(revisions: Dict[str, Dict[str, Any]], key: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Content and formats of a revision: its chain's snapshot plus the deltas up to it"""
+        target = int(key)
+        start = target
+        while str(start) in revisions and not revisions[str(start)]["snapshot"]:
+            start -= 1
+        snapshot = decode_payload(revisions[str(start)]["data"])
+        content, formats = snapshot["content"], snapshot["formats"]
+        for number in range(start + 1, target + 1):
+            delta = decode_payload(revisions[str(number)]["data"])
+            content = apply_delta(content, delta["ops"])
+            formats = delta.get("formats", formats)
+        return content, formats
+
+    def flush(self) -> None:
+        self._storage.flush()
+
+    def close(self) -> None:
+        self._storage.close()
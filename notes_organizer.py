@@ -5,15 +5,25 @@ from tkinter import font as tkfont
 import json
 import os
 import webbrowser
-from datetime import datetime
-from PIL import Image, ImageTk
-import shutil
-import base64
-from io import BytesIO
 from typing import Dict, List, Set, Tuple, Any, Optional
 import platform
-# Import from base_app
-from base_app import BaseNotesApp
+import queue
+import threading
+import time
+from notes_service import NotesService
+from rich_text import FORMAT_TAGS, formats_from_ranges, index_pairs
+from search_index import NoteSearchIndex, SearchResult, SearchWorker, parse_query
+from virtual_list import VirtualList
+from thumbnail_cache import ThumbnailCache
+
+# Live search waits this long after the last keystroke before querying
+SEARCH_DEBOUNCE_MS = 250
+# Interval for collecting finished queries from the search worker
+SEARCH_POLL_MS = 30
+# Edits are saved once the editor has been idle this long...
+AUTOSAVE_DELAY_MS = 1500
+# ...or at the latest this long after the first unsaved edit, during nonstop typing
+AUTOSAVE_MAX_DELAY_MS = 10000
 
 # Conditionally import winsound
 if platform.system() == "Windows":
@@ -21,41 +31,71 @@ if platform.system() == "Windows":
 else:
     winsound = None
 
-class NotesOrganizer(BaseNotesApp):  # Changed inheritance
+class NotesOrganizer(NotesService):
+    """Tk view over NotesService: the open folder and note, editor, previews and live search."""
     def __init__(self, parent):
-        super().__init__("notes_data.json")
+        super().__init__("notes_data.json", "notes_images")
         
         # Store parent reference
         self.parent = parent
+        self._thumbnails = ThumbnailCache(self.parent, self._images)
+        
+        # Live search: queries run on a worker thread whose results come back
+        # through a queue that the Tk thread polls
+        self._search_worker: Optional[SearchWorker] = None
+        self._search_queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._search_after_id = None
+        self._search_poll_id = None
+        self._index_loading = False
+        self._search_pending = False
+        self._result_ids: List[str] = []
+        
+        # Inline image previews, requested as their placeholders scroll into view
+        self._pending_thumbnails: Dict[str, str] = {}  # placeholder tag -> image id
+        self._editor_images: List[Any] = []  # PhotoImages shown in the editor must stay referenced
+        self._media_generation = 0
+        self._thumbnail_check_id = None
+        
+        # Autosave: the editor's modified flag marks the open note dirty and
+        # an idle timer saves what changed
+        self._dirty = False
+        self._dirty_since = 0.0
+        self._autosave_id = None
         
-        # Encapsulation: Make data private
-        self._notes = self.load_notes_data()
-        self._image_dir = "notes_images"
-        
-        self.setup_ui()
         self.current_note_id = None
         self.current_folder = None
         self._last_clicked_tag = None
+        self.setup_ui()
 
-        # Image storage setup
-        self.setup_image_storage()
-
-    # Encapsulation: Getter for notes
-    def get_notes(self) -> Dict[str, Any]:
-        return self._notes.copy()
-    
-    # Encapsulation: Setter for notes
-    def set_notes(self, notes: Dict[str, Any]) -> None:
-        self._notes = notes
-        self.save_notes_data(self._notes)  # Use parent method
-
-    def load_data(self) -> Dict[str, Any]:
-        """Override parent method for compatibility"""
-        return self.load_notes_data()
-
-    def save_data(self, data: Dict[str, Any]) -> None:
-        """Override parent method for compatibility"""
-        self.save_notes_data(data)
+    def _current_note(self) -> Dict[str, Any]:
+        return self._catalog.note(self.current_note_id)
+
+    def _current_location(self) -> Tuple[str, int]:
+        """(folder, position) of the open note, which current_note_id names by its stable id"""
+        return self.locate_note(self.current_note_id)
+
+    def suspend(self) -> None:
+        """Save the open note, stop preview checks while hidden and flush pending writes."""
+        self.flush_autosave()
+        if self._thumbnail_check_id is not None:
+            self.parent.after_cancel(self._thumbnail_check_id)
+            self._thumbnail_check_id = None
+        super().suspend()
+
+    def resume(self) -> None:
+        """Load previews that scrolled into view while hidden."""
+        self._schedule_thumbnail_check()
+
+    def close(self) -> None:
+        """Save the open note and flush pending notes and search index writes"""
+        self.flush_autosave()
+        for after_id in (self._search_after_id, self._search_poll_id, self._thumbnail_check_id):
+            if after_id is not None:
+                self.parent.after_cancel(after_id)
+        if self._search_worker is not None:
+            self._search_worker.close()
+        self._thumbnails.close()
+        super().close()
 
 #==================================================
 # Setup Screen
@@ -118,6 +158,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         ttk.Button(tag_btn_frame, text="Apply", command=self.apply_tags).pack(side=tk.LEFT, padx=2)
         ttk.Button(tag_btn_frame, text="Unapply", command=self.unapply_tags).pack(side=tk.LEFT, padx=2)
         ttk.Button(tag_btn_frame, text="- Delete", command=self.delete_tag).pack(side=tk.LEFT, padx=2)
+        ttk.Button(tag_btn_frame, text="Filter", command=self.filter_by_tags).pack(side=tk.LEFT, padx=2)
 
         self.tag_listbox = tk.Listbox(tag_frame, selectmode=tk.MULTIPLE, height=6)
         tag_scroll = ttk.Scrollbar(tag_frame, orient=tk.VERTICAL, command=self.tag_listbox.yview)
@@ -129,6 +170,14 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         self.tag_listbox.configure(exportselection=False)  # keeps selection even if focus changes
         self.tag_listbox.bind("<ButtonRelease-1>", self._on_tag_click)
 
+        # Search results, filled in as you type
+        results_frame = ttk.LabelFrame(left_panel, text="Search Results", padding=10)
+        results_frame.pack(fill=tk.BOTH, padx=5, pady=5, expand=True)
+
+        self.results_list = VirtualList(results_frame, columns=[("result", "", 200)], height=6, show_headings=False)
+        self.results_list.pack(fill=tk.BOTH, expand=True)
+        self.results_list.bind("<<ListboxSelect>>", self.open_search_result)
+
         # Right Panel (Notes & Editor)
         right_panel = ttk.Frame(content_pane)
         content_pane.add(right_panel, weight=3)
@@ -146,6 +195,8 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_note_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side=tk.LEFT, padx=2)
+        search_entry.bind("<Return>", lambda e: self.search_notes())
+        self.search_var.trace_add("write", self._on_search_changed)
         ttk.Button(search_note_frame, text="Search", command=self.search_notes).pack(side=tk.LEFT, padx=2)
         ttk.Button(search_note_frame, text="+ New Note", command=self.new_note).pack(side=tk.LEFT, padx=2)
         ttk.Button(search_note_frame, text="- Delete", command=self.delete_note).pack(side=tk.LEFT, padx=2)
@@ -154,13 +205,10 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         notes_list_frame = ttk.Frame(right_panel)
         notes_list_frame.pack(fill=tk.BOTH, padx=5, pady=5, expand=True)
 
-        self.notes_listbox = tk.Listbox(notes_list_frame, font=("Arial", 10), height=8)
-        notes_scroll = ttk.Scrollbar(notes_list_frame, orient=tk.VERTICAL, command=self.notes_listbox.yview)
-        self.notes_listbox.configure(yscrollcommand=notes_scroll.set)
-        
-        self.notes_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        notes_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        self.notes_listbox.bind("<<ListboxSelect>>", self.load_note)
+        # Only the rows in view are rendered, so large folders open instantly
+        self.notes_list = VirtualList(notes_list_frame, columns=[("note", "", 400)], height=8, show_headings=False)
+        self.notes_list.pack(fill=tk.BOTH, expand=True)
+        self.notes_list.bind("<<ListboxSelect>>", self.load_note)
 
         # Note Editor section
         editor_section = ttk.LabelFrame(right_panel, text="Note Editor", padding=10)
@@ -175,6 +223,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         ttk.Button(toolbar_frame, text="I", command=lambda: self.format_text("italic")).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar_frame, text="📷 Image", command=self.insert_image).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar_frame, text="🔗 Link", command=self.insert_link).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar_frame, text="🕘 History", command=self.show_history).pack(side=tk.LEFT, padx=2)
 
         # Text Editor with improved visibility
         self.note_editor = ScrolledText(
@@ -187,6 +236,13 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             height=15
         )
         self.note_editor.pack(fill=tk.BOTH, expand=True)
+        
+        # Image previews load as they scroll into view
+        self.note_editor.configure(yscrollcommand=self._on_editor_scroll)
+        self.note_editor.bind("<Configure>", lambda e: self._schedule_thumbnail_check())
+        
+        # Edits set the modified flag, which fires <<Modified>> once until it is reset
+        self.note_editor.bind("<<Modified>>", self._on_editor_modified)
 
         # Status Bar with more information
         status_frame = ttk.Frame(right_panel)
@@ -207,20 +263,10 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         )
         if backup_path:
             try:
-                # Copy the current data file to the backup location
-                if os.path.exists("notes_data.json"):
-                    import shutil
-                    shutil.copy2("notes_data.json", backup_path)
-                    messagebox.showinfo("Success", f"Backup created at: {backup_path}")
-                else:
-                    # If no data file exists, create an empty backup with notes structure
-                    with open(backup_path, 'w') as f:
-                        json.dump({
-                            "folders": {"General": []},
-                            "tags": ["Important", "Work", "Personal"],
-                            "images": {}
-                        }, f, indent=4)
-                    messagebox.showinfo("Success", f"Empty backup created at: {backup_path}")
+                # The data file can lag behind its journal, so dump the live notes instead
+                with open(backup_path, 'w') as f:
+                    json.dump(self.storage.export(self._notes), f, indent=4)
+                messagebox.showinfo("Success", f"Backup created at: {backup_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Backup failed: {str(e)}")
 
@@ -237,8 +283,8 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
     def refresh_folders(self):
         """Reload folders into the Treeview."""
         self.folder_tree.delete(*self.folder_tree.get_children())
-        for folder in self._notes["folders"]:
-            self.folder_tree.insert("", tk.END, text=folder, values=(len(self._notes["folders"][folder]),))
+        for folder in self.folders():
+            self.folder_tree.insert("", tk.END, text=folder, values=(self.note_count(folder),))
         
         # Configure column if not already configured
         if not self.folder_tree['columns']:
@@ -254,9 +300,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
     def add_folder(self):
         """Add a new folder."""
         folder_name = simpledialog.askstring("New Folder", "Enter folder name:")
-        if folder_name and folder_name not in self._notes["folders"]:
-            self._notes["folders"][folder_name] = []
-            self.save_data(self._notes)
+        if self.create_folder(folder_name):
             self.refresh_folders()
             self.status_bar.config(text=f"Created new folder: {folder_name}")
 
@@ -274,47 +318,46 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             case "General":
                 messagebox.showerror("Error", "Cannot delete the General folder!")
             case _:
-                if messagebox.askyesno("Confirm", f"Delete folder '{folder}' and all {len(self._notes['folders'][folder])} notes inside?"):
-                    # Using set to track affected images for cleanup
-                    images_to_remove: Set[str] = set()
-                    
-                    for note in self._notes["folders"][folder]:
-                        images_to_remove.update(note.get("images", []))
-                    
-                    # Remove images from storage
-                    for img_id in images_to_remove:
-                        if img_id in self._notes["images"]:
-                            try:
-                                os.remove(self._notes["images"][img_id])
-                            except:
-                                pass
-                            del self._notes["images"][img_id]
-                    
-                    del self._notes["folders"][folder]
-                    self.save_data(self._notes)
+                if messagebox.askyesno("Confirm", f"Delete folder '{folder}' and all {self.note_count(folder)} notes inside?"):
+                    if folder == self.current_folder:
+                        self._discard_autosave()
+                    self.remove_folder(folder)
                     self.refresh_folders()
                     self.status_bar.config(text=f"Deleted folder: {folder}")
 
+    def _note_row(self, note: Dict[str, Any]) -> Tuple[str]:
+        """Notes list row: the title with the modification date."""
+        mod_date = note.get("last_modified", "")[:10]  # Get just the date part
+        return (f"{note['title']} ({mod_date})",)
+
+    def _update_folder_count(self, folder: str):
+        """Refresh one folder's note count in the folder tree."""
+        for item in self.folder_tree.get_children():
+            if self.folder_tree.item(item)["text"] == folder:
+                self.folder_tree.item(item, values=(self.note_count(folder),))
+                return
+
     def load_folder_notes(self, event=None):
         """Load notes from selected folder."""
         selected = self.folder_tree.selection()
         if not selected:
             return
-        self.current_folder = self.folder_tree.item(selected)["text"]
-        self.notes_listbox.delete(0, tk.END)
+        folder = self.folder_tree.item(selected)["text"]
+        # Re-selecting the open folder (e.g. from open_search_result) keeps the open note
+        if event is not None and folder == self.current_folder:
+            return
+        self.flush_autosave()
+        self.current_folder = folder
         
-        folder_notes = self._notes["folders"][self.current_folder]
-        for note in folder_notes:
-            # Show note title with modification date
-            mod_date = note.get("last_modified", "").split()[0]  # Get just the date part
-            display_text = f"{note['title']} ({mod_date})"
-            self.notes_listbox.insert(tk.END, display_text)
+        folder_notes = self.folder_notes(self.current_folder)
+        self.notes_list.set_rows(self._note_row(note) for note in folder_notes)
         
         # Reset current note selection
         self.current_note_id = None
         
         # Clear editor
         self.note_editor.delete(1.0, tk.END)
+        self.note_editor.edit_modified(False)
         
         # Clear tag selection
         self.tag_listbox.selection_clear(0, tk.END)
@@ -327,15 +370,13 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
     def refresh_tags(self):
         """Reload tags into the Listbox."""
         self.tag_listbox.delete(0, tk.END)
-        for tag in self._notes["tags"]:
+        for tag in self.tags():
             self.tag_listbox.insert(tk.END, tag)
 
     def add_tag(self):
         """Add a new tag."""
         tag = simpledialog.askstring("New Tag", "Enter tag name:")
-        if tag and tag not in self._notes["tags"]:
-            self._notes["tags"].append(tag)
-            self.save_data(self._notes)
+        if self.create_tag(tag):
             self.refresh_tags()
             self.status_bar.config(text=f"Added new tag: {tag}")
 
@@ -347,13 +388,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         
         # Using set for selected tags to avoid duplicates
         selected_tags: Set[str] = {self.tag_listbox.get(i) for i in self.tag_listbox.curselection()}
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
-        
-        # Add selected tags to note (avoid duplicates)
-        current_tags = set(note.get("tags", []))
-        note["tags"] = list(current_tags.union(selected_tags))
-        
-        self.save_data(self._notes)
+        self.tag_note(*self._current_location(), selected_tags)
         self.status_bar.config(text=f"Applied {len(selected_tags)} tags to current note")
 
     def unapply_tags(self):
@@ -362,8 +397,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             messagebox.showinfo("Info", "Please select a note first")
             return
 
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
-        note_tags = set(note.get("tags", []))
+        note_tags = set(self._current_note().get("tags", []))
 
         # What the UI currently reports as selected
         selected_indices = self.tag_listbox.curselection()
@@ -388,8 +422,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             self.status_bar.config(text="No matching tags to remove.")
             return
 
-        note["tags"] = list(note_tags - tags_to_remove)
-        self.save_data(self._notes)
+        self.untag_note(*self._current_location(), tags_to_remove)
         self.update_tag_selection()
         self.status_bar.config(text=f"Removed: {', '.join(sorted(tags_to_remove))}")
 
@@ -404,18 +437,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         tags_to_delete = [self.tag_listbox.get(i) for i in selected_indices]
         
         if messagebox.askyesno("Confirm", f"Delete {len(tags_to_delete)} tag(s) from all notes?"):
-            # Remove tag from global tag list
-            for tag in tags_to_delete:
-                if tag in self._notes["tags"]:
-                    self._notes["tags"].remove(tag)
-            
-            # Remove tag from all notes
-            for folder in self._notes["folders"]:
-                for note in self._notes["folders"][folder]:
-                    if "tags" in note:
-                        note["tags"] = [t for t in note["tags"] if t not in tags_to_delete]
-            
-            self.save_data(self._notes)
+            self.remove_tags(tags_to_delete)
             self.refresh_tags()
             
             # Update tag selection for current note
@@ -424,19 +446,30 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             
             self.status_bar.config(text=f"Deleted {len(tags_to_delete)} tag(s)")
 
+    def filter_by_tags(self):
+        """List the notes matching a tag filter in the results pane."""
+        query = simpledialog.askstring("Tag Filter", "Tags to match, e.g. Work AND NOT (Personal OR Old):")
+        if not query:
+            return
+        try:
+            results = self.filter_notes(query)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self._show_search_results(results)
+
     def update_tag_selection(self):
         """Update tag listbox selection based on current note's tags."""
         if self.current_note_id is None or not self.current_folder:
             return
         
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
-        note_tags = set(note.get("tags", []))
+        note_tags = set(self._current_note().get("tags", []))
         
         # Clear current selection
         self.tag_listbox.selection_clear(0, tk.END)
         
         # Select tags that are applied to the current note
-        for i, tag in enumerate(self._notes["tags"]):
+        for i, tag in enumerate(self.tags()):
             if tag in note_tags:
                 self.tag_listbox.selection_set(i)
 
@@ -446,16 +479,7 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             messagebox.showinfo("Info", "No data to analyze.")
             return
         
-        # Using sets for unique operations
-        all_tags: Set[str] = set(self._notes["tags"])
-        used_tags: Set[str] = set()
-        total_notes = 0
-        
-        for folder_notes in self._notes["folders"].values():
-            total_notes += len(folder_notes)
-            for note in folder_notes:
-                used_tags.update(note.get("tags", []))
-        
+        all_tags, used_tags, total_notes = self.tag_usage()
         unused_tags = all_tags - used_tags
         
         stats_text = f"Total Notes: {total_notes}\n"
@@ -467,6 +491,12 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         if unused_tags:
             stats_text += f"\nUnused Tags: {', '.join(sorted(unused_tags))}"
         
+        # Counts are kept by the tag index, so no note is visited here
+        tag_counts = self.tag_counts()
+        if tag_counts:
+            stats_text += "\n\nNotes per Tag:\n"
+            stats_text += "\n".join(f"{tag}: {count}" for tag, count in sorted(tag_counts.items()))
+        
         messagebox.showinfo("Unique Statistics", stats_text)
 
     # ======================
@@ -480,33 +510,24 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         
         title = simpledialog.askstring("New Note", "Enter note title:")
         if title:
-            new_note = {
-                "title": title,
-                "content": "",
-                "tags": [],
-                "images": [],
-                "links": [],
-                "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M")
-            }
-            self._notes["folders"][self.current_folder].append(new_note)
-            self.save_data(self._notes)
-            self.refresh_folders()
-            self.load_folder_notes()
-            self.notes_listbox.selection_clear(0, tk.END)
-            self.notes_listbox.selection_set(tk.END)
-            self.notes_listbox.activate(tk.END)
+            new_note = self.create_note(self.current_folder, title)
+            self._update_folder_count(self.current_folder)
+            self.notes_list.insert(tk.END, self._note_row(new_note))
+            self.notes_list.selection_set(tk.END)
+            self.notes_list.see(tk.END)
             self.load_note()
             self.status_bar.config(text=f"Created new note: {title}")
 
     def load_note(self, event=None):
         """Load selected note into editor."""
-        selected = self.notes_listbox.curselection()
+        selected = self.notes_list.curselection()
         if not selected or not self.current_folder:
             return
         
-        self.current_note_id = selected[0]
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
+        # Save edits to the note being left before the editor is reused
+        self.flush_autosave()
+        self.current_note_id = self.folder_notes(self.current_folder)[selected[0]]["id"]
+        note = self.note_by_id(self.current_note_id)
         
         # Clear editor and reset formatting tags
         self.note_editor.delete(1.0, tk.END)
@@ -520,33 +541,22 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         
         # Insert content
         content = note.get("content", "")
-        self.note_editor.insert(tk.END, note["content"])
+        self.note_editor.insert(tk.END, content)
 
-        # Restore format (convert back to Text index using saved character offsets)
-        for fmt in note.get("formats", []):
-            tag = fmt.get("tag")
+        # Restore format: offsets become "line.column" indices through one line table,
+        # and each style is applied with a single tag_add over all of its ranges
+        for tag, indices in index_pairs(note.get("formats", []), content).items():
             try:
-                start = int(fmt.get("start", 0))
-                end = int(fmt.get("end", 0))
-            except Exception:
-                continue
-
-        # Check and trim the range to prevent out-of-bounds or invalidity
-            if start >= len(content) or start >= end:
-                continue
-            end = min(end, len(content))
-
-            start_index = self.offset_to_text_index(start)
-            end_index = self.offset_to_text_index(end)
-
-            try:
-                self.note_editor.tag_add(tag, start_index, end_index)
-            except Exception:
+                self.note_editor.tag_add(tag, *indices)
+            except tk.TclError:
                 pass
         
         # Display images and links as visual elements (not in content)
         self.display_media_elements(note)
         
+        # Loading is not an edit
+        self.note_editor.edit_modified(False)
+        
         # Update tag selection based on current note
         self.update_tag_selection()
         
@@ -577,6 +587,8 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
 
     def display_media_elements(self, note):
         """Display images and links as visual elements below the content."""
+        # Media elements are not note content, so they leave the modified flag as it was
+        modified = self.note_editor.edit_modified()
         
         # 1. Delete the old media elements (from --- Media Elements --- to the end of the article)
         full_text = self.note_editor.get("1.0", tk.END)
@@ -585,15 +597,23 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             if start_index:
                 self.note_editor.delete(start_index, tk.END)
 
+        # Previews still loading for the previous media section are dropped
+        self._media_generation += 1
+        self._pending_thumbnails.clear()
+        self._editor_images.clear()
+        
         # Add a separator
         if note.get("images") or note.get("links"):
             self.note_editor.insert(tk.END, "\n\n--- Media Elements ---\n")
         
-        # Display images
-        for img_id in note.get("images", []):
-            if img_id in self._notes["images"]:
-                img_path = self._notes["images"][img_id]
-                self.note_editor.insert(tk.END, f"\n[Image: {os.path.basename(img_path)}]", "image")
+        # Display images: a placeholder each, replaced by a preview once it is in view
+        for position, img_id in enumerate(note.get("images", [])):
+            if self._images.exists(img_id):
+                placeholder = f"thumb_{position}"
+                self.note_editor.insert(tk.END, "\n")
+                self.note_editor.insert(tk.END, f"[Image: {img_id}]", ("image", placeholder))
+                self._pending_thumbnails[placeholder] = img_id
+        self._schedule_thumbnail_check()
         
         # Display links
         for link in note.get("links", []):
@@ -601,6 +621,52 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             # Make links clickable
             self.note_editor.tag_bind("link", "<Button-1>", 
                                     lambda e, url=link: webbrowser.open(url))
+        self.note_editor.edit_modified(modified)
+
+    def _on_editor_scroll(self, first, last):
+        """Editor yscrollcommand: move the scrollbar and look for previews that came into view."""
+        self.note_editor.vbar.set(first, last)
+        self._schedule_thumbnail_check()
+
+    def _schedule_thumbnail_check(self):
+        if self._pending_thumbnails and self._thumbnail_check_id is None:
+            self._thumbnail_check_id = self.parent.after_idle(self._load_visible_thumbnails)
+
+    def _load_visible_thumbnails(self):
+        """Request previews for placeholders within a screen of the visible lines."""
+        self._thumbnail_check_id = None
+        top = int(self.note_editor.index("@0,0").split(".")[0])
+        bottom = int(self.note_editor.index(f"@0,{self.note_editor.winfo_height()}").split(".")[0])
+        margin = bottom - top + 1
+        size = ThumbnailCache.size_for(self.note_editor.winfo_width() - 40)
+        generation = self._media_generation
+        
+        for placeholder, img_id in list(self._pending_thumbnails.items()):
+            ranges = self.note_editor.tag_ranges(placeholder)
+            if not ranges:
+                del self._pending_thumbnails[placeholder]
+                continue
+            line = int(str(ranges[0]).split(".")[0])
+            if top - margin <= line <= bottom + margin:
+                del self._pending_thumbnails[placeholder]
+                photo = self._thumbnails.request(
+                    img_id, size, lambda photo, placeholder=placeholder: self._show_thumbnail(generation, placeholder, photo))
+                if photo is not None:
+                    self._show_thumbnail(generation, placeholder, photo)
+
+    def _show_thumbnail(self, generation: int, placeholder: str, photo):
+        """Swap a placeholder for its preview, unless the note has been redisplayed since."""
+        if photo is None or generation != self._media_generation:
+            return
+        ranges = self.note_editor.tag_ranges(placeholder)
+        if not ranges:
+            return
+        start, end = ranges
+        modified = self.note_editor.edit_modified()
+        self.note_editor.delete(start, end)
+        self.note_editor.image_create(start, image=photo)
+        self.note_editor.edit_modified(modified)
+        self._editor_images.append(photo)
 
     def save_note(self):
         """Save current note with formatting."""
@@ -608,68 +674,163 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             messagebox.showinfo("Info", "No note selected to save")
             return
         
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
-        
-        # Get content but exclude media elements (everything after the separator)
-        content = self.note_editor.get(1.0, tk.END)
-        if "--- Media Elements ---" in content:
-            content = content.split("--- Media Elements ---")[0].strip()
-        
-        content_length = len(content)
-        # Collect formatting information (bold, italic, etc.) as character offsets
-        formats = []
-        for tag in ("bold", "italic", "bold_italic"):
-            ranges = self.note_editor.tag_ranges(tag)
-            for i in range(0, len(ranges), 2):
-                start_idx = ranges[i]
-                end_idx = ranges[i + 1]
-
-            # Convert a Text index to a character offset
-                start_offset = self.text_index_to_offset(start_idx)
-                end_offset = self.text_index_to_offset(end_idx)
-
-            # If the starting position is after media, skip
-                if start_offset >= content_length:
-                    continue
-
-            # Truncate to the end of content (to ensure the range does not exceed the limit)
-                end_offset = min(end_offset, content_length)
-
-                if start_offset < end_offset:
-                    formats.append({
-                        "tag": tag,
-                        "start": start_offset,
-                        "end": end_offset
-                    })
-        # Save the text content only (without media elements)
-        note["content"] = content
-        note["formats"] = formats
-        note["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.save_data(self._notes)
+        self._cancel_autosave()
+        note = self._save_editor()
         self.status_bar.config(text=f"Note saved at {note['last_modified']}")
 
+    def _save_editor(self) -> Dict[str, Any]:
+        """Save the editor's text and formats into the open note; unchanged fields are not written."""
+        # Get content but exclude media elements (everything after the separator);
+        # "end-1c" leaves out the newline Tk keeps after the last line
+        text = self.note_editor.get(1.0, "end-1c")
+        content, content_start = text, 0
+        if "--- Media Elements ---" in content:
+            content = content.split("--- Media Elements ---")[0]
+            content_start = len(content) - len(content.lstrip())
+            content = content.strip()
+        
+        # Collect formatting information (bold, italic, etc.) as character offsets,
+        # converted through one line table of the text read above; ranges running
+        # into the media elements are trimmed to the content
+        formats = formats_from_ranges({tag: self.note_editor.tag_ranges(tag) for tag in FORMAT_TAGS},
+                                      text, content_start, len(content))
+        self._dirty = False
+        folder, position = self._current_location()
+        note = self.update_note(folder, position, content, formats)
+        self.notes_list.set_row(position, self._note_row(note))
+        return note
+
+    # ======================
+    # REVISION HISTORY
+    # ======================
+    def show_history(self):
+        """List the open note's revisions with a preview and a Restore button."""
+        if self.current_note_id is None or not self.current_folder:
+            messagebox.showinfo("Info", "Please select a note first")
+            return
+        
+        # Unsaved edits become the latest revision
+        self.flush_autosave()
+        note_id = self.current_note_id
+        revisions = self.note_revisions(*self._current_location())
+        if not revisions:
+            messagebox.showinfo("History", "This note has no saved revisions yet.")
+            return
+        
+        window = tk.Toplevel(self.parent.winfo_toplevel())
+        window.title(f"History: {self._current_note()['title']}")
+        frame = ttk.Frame(window, padding=10)
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        revision_list = tk.Listbox(frame, width=28, exportselection=False)
+        revision_list.pack(side=tk.LEFT, fill=tk.Y)
+        preview = ScrolledText(frame, wrap=tk.WORD, width=60, height=20)
+        preview.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        
+        # Newest first
+        numbers = [number for number, _ in reversed(revisions)]
+        for number, saved in reversed(revisions):
+            revision_list.insert(tk.END, f"#{number}  {saved}")
+        
+        def show_selected(event=None):
+            selected = revision_list.curselection()
+            if not selected:
+                return
+            location = self.locate_note(note_id)
+            if location is None:
+                return
+            revision = self.note_revision(*location, numbers[selected[0]])
+            preview.configure(state=tk.NORMAL)
+            preview.delete(1.0, tk.END)
+            preview.insert(tk.END, revision["content"])
+            preview.configure(state=tk.DISABLED)
+        
+        def restore():
+            selected = revision_list.curselection()
+            if not selected:
+                return
+            location = self.locate_note(note_id)
+            if location is None:
+                window.destroy()
+                return
+            number = numbers[selected[0]]
+            note = self.restore_revision(*location, number)
+            window.destroy()
+            if self.current_note_id == note_id:
+                self.load_note()
+            if location[0] == self.current_folder:
+                self.notes_list.set_row(location[1], self._note_row(note))
+            self.status_bar.config(text=f"Restored revision #{number}")
+        
+        revision_list.bind("<<ListboxSelect>>", show_selected)
+        ttk.Button(window, text="Restore", command=restore).pack(pady=(0, 10))
+        revision_list.selection_set(0)
+        show_selected()
+
+    # ======================
+    # AUTOSAVE
+    # ======================
+    def _on_editor_modified(self, event=None):
+        """<<Modified>> handler: mark the note dirty and re-arm the flag for the next edit."""
+        # Resetting the flag fires <<Modified>> again, and programmatic changes
+        # reset it before the event is handled; both arrive with the flag clear
+        if not self.note_editor.edit_modified():
+            return
+        self.note_editor.edit_modified(False)
+        self._mark_dirty()
+
+    def _mark_dirty(self):
+        """Note an unsaved edit and (re)start the autosave timer."""
+        if self.current_note_id is None or not self.current_folder:
+            return
+        if not self._dirty:
+            self._dirty = True
+            self._dirty_since = time.monotonic()
+        if self._autosave_id is not None:
+            self.parent.after_cancel(self._autosave_id)
+        # Each edit pushes the save back, but never past the maximum delay
+        waited_ms = int((time.monotonic() - self._dirty_since) * 1000)
+        delay = max(min(AUTOSAVE_DELAY_MS, AUTOSAVE_MAX_DELAY_MS - waited_ms), 0)
+        self._autosave_id = self.parent.after(delay, self._autosave)
+
+    def _autosave(self):
+        self._autosave_id = None
+        if not self._dirty or self.current_note_id is None or not self.current_folder:
+            return
+        note = self._save_editor()
+        self.status_bar.config(text=f"Autosaved at {note['last_modified']}")
+
+    def _cancel_autosave(self):
+        if self._autosave_id is not None:
+            self.parent.after_cancel(self._autosave_id)
+            self._autosave_id = None
+
+    def flush_autosave(self):
+        """Save the open note now if it has unsaved edits."""
+        self._cancel_autosave()
+        if self._dirty and self.current_note_id is not None and self.current_folder:
+            self._save_editor()
+        self._dirty = False
+
+    def _discard_autosave(self):
+        """Drop unsaved edits of a note that is being deleted."""
+        self._cancel_autosave()
+        self._dirty = False
+
     def delete_note(self):
         """Delete selected note."""
         if self.current_note_id is None or not self.current_folder:
             messagebox.showinfo("Info", "Please select a note to delete")
             return
         
-        note = self._notes["folders"][self.current_folder][self.current_note_id]
+        note = self._current_note()
         if messagebox.askyesno("Confirm", f"Delete note '{note['title']}'?"):
-            # Remove associated images
-            for img_id in note["images"]:
-                if img_id in self._notes["images"]:
-                    img_path = self._notes["images"][img_id]
-                    try:
-                        os.remove(img_path)
-                    except:
-                        pass
-                    del self._notes["images"][img_id]
-            
-            del self._notes["folders"][self.current_folder][self.current_note_id]
-            self.save_data(self._notes)
-            self.refresh_folders()
-            self.load_folder_notes()
+            self._discard_autosave()
+            folder, position = self._current_location()
+            self.remove_note(folder, position)
+            self._update_folder_count(folder)
+            self.notes_list.delete(position)
+            self.notes_list.selection_clear()
             self.note_editor.delete(1.0, tk.END)
             self.current_note_id = None
             self.status_bar.config(text=f"Deleted note: {note['title']}")
@@ -681,14 +842,11 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             return
         
         # Using tuple for statistics and dictionary for detailed info
-        total_notes = sum(len(notes) for notes in self._notes["folders"].values())
-        total_images = len(self._notes["images"])
+        total_notes = sum(self.note_count(name) for name in self.folders())
+        total_images = self._images.count()
         
         # Using set for unique tags across all notes
-        all_used_tags: Set[str] = set()
-        for folder_notes in self._notes["folders"].values():
-            for note in folder_notes:
-                all_used_tags.update(note.get("tags", []))
+        _, all_used_tags, _ = self.tag_usage()
         
         stats_text = f"Total Notes: {total_notes}\n"
         stats_text += f"Total Folders: {len(self._notes['folders'])}\n"
@@ -698,39 +856,138 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         
         # Add folder breakdown
         stats_text += "\nNotes by Folder:\n"
-        for folder, notes in self._notes["folders"].items():
-            stats_text += f"  {folder}: {len(notes)} notes\n"
+        for folder in self.folders():
+            stats_text += f"  {folder}: {self.note_count(folder)} notes\n"
         
         messagebox.showinfo("Notes Statistics", stats_text)
 
     # ======================
     # SEARCH FUNCTIONALITY
     # ======================
+    def attach_search_index(self, index: NoteSearchIndex) -> None:
+        """Reconcile a freshly loaded index with the notes and start the query worker."""
+        super().attach_search_index(index)
+        self._search_worker = SearchWorker(
+            index, lambda generation, results: self._search_queue.put(("results", (generation, results))))
+
+    def _on_search_changed(self, *args):
+        """Restart the debounce timer whenever the search text changes."""
+        if self._search_after_id is not None:
+            self.parent.after_cancel(self._search_after_id)
+        self._search_after_id = self.parent.after(SEARCH_DEBOUNCE_MS, self.search_notes)
+
     def search_notes(self):
-        """Search notes across all folders."""
-        query = self.search_var.get().lower()
-        if not query:
-            messagebox.showinfo("Info", "Please enter a search term")
+        """Search notes across all folders (supports folder:Name and tag:Name filters).
+        
+        The query runs on the search worker; matches are streamed into the results pane.
+        """
+        if self._search_after_id is not None:
+            self.parent.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        
+        text, folder, tags = parse_query(self.search_var.get())
+        if not text and folder is None and not tags:
+            if self._search_worker is not None:
+                self._search_worker.cancel()
+            self._search_pending = False
+            self._result_ids = []
+            self.results_list.set_rows([])
+            return
+        
+        # The query is re-run from the search box once the index has loaded
+        if self._search_index is None:
+            self._start_index_load()
+            return
+        
+        self._search_worker.submit(text, folder, tags)
+        self._search_pending = True
+        self.status_bar.config(text="Searching...")
+        self._schedule_search_poll()
+
+    def _start_index_load(self):
+        """Read the index file on a background thread."""
+        if self._index_loading:
             return
+        self._index_loading = True
+        self.status_bar.config(text="Loading search index...")
         
-        results = []
-        for folder in self._notes["folders"]:
-            for note in self._notes["folders"][folder]:
-                if (query in note["title"].lower() or 
-                    query in note["content"].lower() or 
-                    any(query in tag.lower() for tag in note["tags"])):
-                    results.append(f"{folder} > {note['title']}")
+        def load():
+            try:
+                self._search_queue.put(("index", NoteSearchIndex()))
+            except Exception as e:
+                self._search_queue.put(("error", e))
         
-        # Using match expression for search results handling
+        threading.Thread(target=load, name="search-index-loader", daemon=True).start()
+        self._schedule_search_poll()
+
+    def _schedule_search_poll(self):
+        if self._search_poll_id is None:
+            self._search_poll_id = self.parent.after(SEARCH_POLL_MS, self._poll_search_queue)
+
+    def _poll_search_queue(self):
+        """Pick up a loaded index or finished queries from the background threads."""
+        self._search_poll_id = None
+        while True:
+            try:
+                kind, payload = self._search_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Using match expression for background messages
+            match kind:
+                case "index":
+                    self._index_loading = False
+                    self.attach_search_index(payload)
+                    self.search_notes()
+                case "error":
+                    self._index_loading = False
+                    messagebox.showerror("Error", f"Could not load search index: {payload}")
+                case "results":
+                    generation, results = payload
+                    if self._search_worker.is_current(generation):
+                        self._search_pending = False
+                        self._show_search_results(results)
+        
+        if self._index_loading or self._search_pending:
+            self._schedule_search_poll()
+
+    def _show_search_results(self, results: List[SearchResult]):
+        """Replace the results pane with a finished query's matches."""
+        self._result_ids = [note_id for note_id, _, _ in results]
+        self.results_list.set_rows((f"{folder} > {title}",) for _, folder, title in results)
+        
+        # Using match expression for the status text
         match len(results):
             case 0:
-                messagebox.showinfo("Search Results", "No matching notes found.")
+                self.status_bar.config(text="No matching notes found.")
             case 1:
-                messagebox.showinfo("Search Results", f"Found 1 note:\n{results[0]}")
-            case count if count <= 10:
-                messagebox.showinfo("Search Results", f"Found {count} notes:\n" + "\n".join(results))
-            case _:
-                messagebox.showinfo("Search Results", f"Found {len(results)} notes. First 10:\n" + "\n".join(results[:10]))
+                self.status_bar.config(text="Found 1 note")
+            case count:
+                self.status_bar.config(text=f"Found {count} notes")
+
+    def open_search_result(self, event=None):
+        """Open the note selected in the results pane."""
+        selected = self.results_list.curselection()
+        if not selected:
+            return
+        
+        location = self.locate_note(self._result_ids[selected[0]])
+        if location is None:
+            self.status_bar.config(text="That note no longer exists")
+            return
+        folder, position = location
+        
+        for item in self.folder_tree.get_children():
+            if self.folder_tree.item(item)["text"] == folder:
+                self.folder_tree.selection_set(item)
+                self.folder_tree.see(item)
+                break
+        if folder != self.current_folder:
+            self.load_folder_notes()
+        
+        self.notes_list.selection_set(position)
+        self.notes_list.see(position)
+        self.load_note()
 
     # ======================
     # RICH TEXT FEATURES
@@ -769,27 +1026,13 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             # Restore link tag
             if has_link:
                 self.note_editor.tag_add("link", start, end)
+            
+            # Tag changes don't set the modified flag
+            self._mark_dirty()
 
         except tk.TclError:
             pass
 
-    def setup_image_storage(self):
-        """Create image directory if it doesn't exist."""
-        if not os.path.exists(self._image_dir):
-            os.makedirs(self._image_dir)
-
-    def text_index_to_offset(self, index) -> int:
-        """Convert a Text widget index ('1.0' / ​​'2.5' etc.) to a character offset (int) from the beginning. """
-        try:
-            # Length of text from the beginning to index = offset
-            return len(self.note_editor.get("1.0", index))
-        except Exception:
-            return 0
-
-    def offset_to_text_index(self, offset: int) -> str:
-        """Convert a character offset into an index string recognizable by Text (e.g. '1.0 + 15 chars')."""
-        return self.note_editor.index(f"1.0 + {int(offset)} chars")
-        
     def insert_image(self):
         """Insert an image into the note with automatic storage."""
         if self.current_note_id is None:
@@ -805,28 +1048,12 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
             return
             
         try:
-            # Generate unique filename
-            filename = f"img_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.path.basename(filepath)}"
-            save_path = os.path.join(self._image_dir, filename)
-            
-            # Copy image to application's image directory
-            shutil.copy2(filepath, save_path)
-            
-            # Store relative path in JSON
-            image_id = f"img_{len(self._notes['images']) + 1}"
-            self._notes['images'][image_id] = save_path
-            
-            # Add to current note
-            note = self._notes["folders"][self.current_folder][self.current_note_id]
-            note["images"].append(image_id)
-            
-            # Save the note
-            self.save_data(self._notes)
+            self.attach_image(*self._current_location(), filepath)
             
             # Display Media Elements directly at the end of the current editor
-            self.display_media_elements(note)
+            self.display_media_elements(self._current_note())
             
-            self.status_bar.config(text=f"Image added: {os.path.basename(save_path)}")
+            self.status_bar.config(text=f"Image added: {os.path.basename(filepath)}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to insert image: {str(e)}")
@@ -837,45 +1064,15 @@ class NotesOrganizer(BaseNotesApp):  # Changed inheritance
         if not url:
             return
         
-        if not url.startswith(("http://", "https://")):
-            url = "https://" + url
-        
         # Add to current note
         if self.current_note_id is not None:
-            note = self._notes["folders"][self.current_folder][self.current_note_id]
-            note["links"].append(url)
-            self.save_data(self._notes)
+            url = self.attach_link(*self._current_location(), url)
             
             # Display Media Elements directly at the end of the current editor
-            self.display_media_elements(note)
+            self.display_media_elements(self._current_note())
             
             self.status_bar.config(text=f"Link added: {url}")
 
-    def get_statistics(self) -> Dict[str, Any]:
-        """Override abstract method with detailed notes statistics"""
-        if not self._notes:
-            return {"message": "No notes available"}
-        
-        # Using dictionary for comprehensive statistics
-        total_notes = sum(len(notes) for notes in self._notes["folders"].values())
-        total_images = len(self._notes["images"])
-        
-        # Using set for unique tags across all notes
-        all_used_tags: Set[str] = set()
-        for folder_notes in self._notes["folders"].values():
-            for note in folder_notes:
-                all_used_tags.update(note.get("tags", []))
-        
-        return {
-            "total_folders": len(self._notes["folders"]),
-            "total_notes": total_notes,
-            "total_tags": len(self._notes["tags"]),
-            "used_tags": len(all_used_tags),
-            "unused_tags": len(set(self._notes["tags"]) - all_used_tags),
-            "total_images": total_images,
-            "folders_list": list(self._notes["folders"].keys())
-        }
-    
 #====================================
 # Able this if want run independent
 #====================================
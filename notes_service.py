@@ -0,0 +1,551 @@
+import os
+from datetime import datetime
+from typing import AbstractSet, Dict, List, Set, Tuple, Any, Optional, Sequence, Iterable
+from base_app import BaseNotesApp, Change, StorageBackend, folder_note_count, new_note_id
+from search_index import NoteSearchIndex, SearchResult, parse_query, content_hash
+from tag_query import evaluate, parse_tag_query
+from image_store import ImageStore
+from note_catalog import NoteCatalog
+from note_history import NoteHistory
+from rich_text import normalize_formats
+
+# Folder that always exists and cannot be deleted
+DEFAULT_FOLDER = "General"
+
+
+class NotesService(BaseNotesApp):
+    """Folders, notes, tags, images and search without any widgets.
+
+    NotesOrganizer is the Tk view on top of this class. Notes are stored and
+    edited by (folder, position) and found by their stable ids through the
+    catalog; every operation saves its change records and keeps the catalog,
+    the search index (once loaded) and the image store in step.
+    """
+    def __init__(self, filename: str = "notes_data.json", image_dir: str = "notes_images",
+                 storage: Optional[StorageBackend] = None):
+        super().__init__(filename, storage)
+
+        # Encapsulation: Make data private
+        self._notes = self.load_notes_data()
+        self._image_dir = image_dir
+
+        # Id, folder and tag indexes, filled as folders are opened
+        self._catalog = NoteCatalog()
+        self._catalog_complete = False
+
+        # Full-text index, loaded and reconciled with the notes on the first search
+        self._search_index: Optional[NoteSearchIndex] = None
+        # Revision history, loaded on the first save or history lookup
+        self._history: Optional[NoteHistory] = None
+
+        # Image storage setup
+        self.setup_image_storage()
+
+    # Encapsulation: Getter for notes
+    def get_notes(self) -> Dict[str, Any]:
+        return self._notes.copy()
+
+    # Encapsulation: Setter for notes
+    def set_notes(self, notes: Dict[str, Any]) -> None:
+        self._notes = notes
+        self._catalog.clear()
+        self._catalog_complete = False
+        self.save_notes_data(self._notes)  # Use parent method
+
+    def load_data(self) -> Dict[str, Any]:
+        """Override parent method for compatibility"""
+        return self.load_notes_data()
+
+    def save_data(self, data: Dict[str, Any], changes: Optional[Sequence[Change]] = None) -> None:
+        """Override parent method for compatibility"""
+        self.save_notes_data(data, changes)
+
+    def suspend(self) -> None:
+        super().suspend()
+        if self._search_index is not None:
+            self._search_index.flush()
+        if self._history is not None:
+            self._history.flush()
+
+    def close(self) -> None:
+        """Flush pending notes and search index writes"""
+        super().close()
+        self._images.close()
+        if self._search_index is not None:
+            self._search_index.close()
+        if self._history is not None:
+            self._history.close()
+
+    @staticmethod
+    def _note_path(folder: str, position: int, *keys) -> Tuple:
+        """Storage path of a note, or of one of its fields"""
+        return ("folders", folder, position, *keys)
+
+    def folders(self) -> List[str]:
+        return list(self._notes["folders"])
+
+    def folder_notes(self, folder: str) -> List[Dict[str, Any]]:
+        self._catalog_folder(folder)
+        return self._notes["folders"][folder]
+
+    def note_count(self, folder: str) -> int:
+        return folder_note_count(self._notes["folders"], folder)
+
+    def tags(self) -> List[str]:
+        return list(self._notes["tags"])
+
+    def note(self, folder: str, position: int) -> Dict[str, Any]:
+        """A note with its content and formats loaded"""
+        return self.load_note_body(self._notes["folders"][folder][position])
+
+    def note_by_id(self, note_id: str) -> Optional[Dict[str, Any]]:
+        """A note with its content and formats loaded, or None"""
+        location = self.locate_note(note_id)
+        return self.note(*location) if location is not None else None
+
+    def locate_note(self, note_id: str) -> Optional[Tuple[str, int]]:
+        """(folder, position) of a note, or None if it no longer exists"""
+        location = self._catalog.location(note_id)
+        if location is None and not self._catalog_complete:
+            self._catalog_all()
+            location = self._catalog.location(note_id)
+        return location
+
+    def notes_with_tag(self, tag: str) -> Set[str]:
+        """Ids of the notes carrying a tag"""
+        self._catalog_all()
+        return set(self._catalog.tagged(tag))
+
+    def _catalog_folder(self, folder: str) -> None:
+        """Add a folder to the catalog on first use, giving id-less notes an id"""
+        if self._catalog.has_folder(folder):
+            return
+        notes = self._notes["folders"][folder]
+        changes: List[Change] = []
+        for position, note in enumerate(notes):
+            if "id" not in note:
+                note["id"] = new_note_id()
+                changes.append(("set", self._note_path(folder, position, "id"), note["id"]))
+        self._catalog.add_folder(folder, notes)
+        if changes:
+            self.save_data(self._notes, changes)
+
+    def _catalog_all(self) -> None:
+        """Catalog every folder; needed once for lookups across folders"""
+        if self._catalog_complete:
+            return
+        for folder in self._notes["folders"]:
+            self._catalog_folder(folder)
+        self._catalog_complete = True
+
+#==================================================
+# Folders
+#==================================================
+    def create_folder(self, name: str) -> bool:
+        """Add an empty folder; False if the name is empty or taken"""
+        if not name or name in self._notes["folders"]:
+            return False
+        self._notes["folders"][name] = []
+        self._catalog.add_folder(name, [])
+        self.save_data(self._notes, [("set", ("folders", name), [])])
+        return True
+
+    def remove_folder(self, folder: str) -> int:
+        """Delete a folder with its notes; returns the number of notes deleted"""
+        if folder == DEFAULT_FOLDER:
+            raise ValueError(f"Cannot delete the {DEFAULT_FOLDER} folder!")
+        notes = self._notes["folders"][folder]
+        # One reference per image slot, so images shared with other notes survive
+        images_to_release: List[str] = []
+        for note in notes:
+            images_to_release.extend(note.get("images", []))
+            self._unindex_note(note)
+            self._forget_history(note)
+
+        del self._notes["folders"][folder]
+        self._catalog.drop_folder(folder)
+        self.save_data(self._notes, [("del", ("folders", folder))])
+        self._images.release(images_to_release)
+        return len(notes)
+
+#==================================================
+# Tags
+#==================================================
+    def create_tag(self, tag: str) -> bool:
+        """Add a tag to the tag list; False if the name is empty or taken"""
+        if not tag or tag in self._notes["tags"]:
+            return False
+        self._notes["tags"].append(tag)
+        self.save_data(self._notes, [("set", ("tags",), self._notes["tags"])])
+        return True
+
+    def tag_note(self, folder: str, position: int, tags: Iterable[str]) -> List[str]:
+        """Add tags to a note (avoiding duplicates); returns the note's tags"""
+        self._catalog_folder(folder)
+        note = self._notes["folders"][folder][position]
+        new_tags = set(note.get("tags", [])).union(tags)
+        self._catalog.retag(note["id"], note.get("tags", []), new_tags)
+        note["tags"] = list(new_tags)
+        self.save_data(self._notes, [("set", self._note_path(folder, position, "tags"), note["tags"])])
+        self._reindex_tags(note)
+        return note["tags"]
+
+    def untag_note(self, folder: str, position: int, tags: Iterable[str]) -> List[str]:
+        """Remove tags from a note; returns the note's tags"""
+        self._catalog_folder(folder)
+        note = self._notes["folders"][folder][position]
+        new_tags = set(note.get("tags", [])) - set(tags)
+        self._catalog.retag(note["id"], note.get("tags", []), new_tags)
+        note["tags"] = list(new_tags)
+        self.save_data(self._notes, [("set", self._note_path(folder, position, "tags"), note["tags"])])
+        self._reindex_tags(note)
+        return note["tags"]
+
+    def remove_tags(self, tags_to_delete: Sequence[str]) -> int:
+        """Delete tags from the tag list and from every note; returns the notes changed"""
+        # Remove tag from global tag list
+        for tag in tags_to_delete:
+            if tag in self._notes["tags"]:
+                self._notes["tags"].remove(tag)
+
+        changes: List[Change] = [("set", ("tags",), self._notes["tags"])]
+
+        # Remove tag from the notes carrying it, found through the tag index
+        self._catalog_all()
+        tags_to_delete = set(tags_to_delete)
+        affected: Set[str] = set()
+        for tag in tags_to_delete:
+            affected |= self._catalog.tagged(tag)
+        for note_id in affected:
+            folder, index = self._catalog.location(note_id)
+            note = self._catalog.note(note_id)
+            new_tags = [t for t in note["tags"] if t not in tags_to_delete]
+            self._catalog.retag(note_id, note["tags"], new_tags)
+            note["tags"] = new_tags
+            changes.append(("set", ("folders", folder, index, "tags"), note["tags"]))
+            self._reindex_tags(note)
+
+        self.save_data(self._notes, changes)
+        return len(changes) - 1
+
+    def filter_notes(self, query: str) -> List[SearchResult]:
+        """Notes matching a tag filter such as 'Work AND NOT (Personal OR Old)', in folder order.
+
+        Tags are matched exactly, or ignoring case when no tag has the exact
+        name. Raises ValueError with a user-facing message on bad syntax.
+        """
+        tree = parse_tag_query(query)
+        self._catalog_all()
+        used_tags = self._catalog.used_tags()
+
+        def tagged(name: str) -> AbstractSet[str]:
+            if name in used_tags:
+                return self._catalog.tagged(name)
+            ids: Set[str] = set()
+            for tag in used_tags:
+                if tag.lower() == name.lower():
+                    ids |= self._catalog.tagged(tag)
+            return ids
+
+        matches = evaluate(tree, tagged, self._catalog.all_ids)
+        # Only the matches are sorted, by folder order and then position
+        folder_order = {folder: i for i, folder in enumerate(self._notes["folders"])}
+        locations = [(self._catalog.location(note_id), note_id) for note_id in matches]
+        locations.sort(key=lambda item: (folder_order[item[0][0]], item[0][1]))
+        return [(note_id, folder, self._catalog.note(note_id)["title"])
+                for (folder, _), note_id in locations]
+
+    def tag_counts(self) -> Dict[str, int]:
+        """Notes per tag, including unused tags at 0"""
+        self._catalog_all()
+        counts = self._catalog.tag_counts()
+        return {tag: counts.get(tag, 0) for tag in self._notes["tags"]}
+
+    def tag_usage(self) -> Tuple[Set[str], Set[str], int]:
+        """(all tags, tags used by some note, total notes)"""
+        # Using sets for unique operations
+        all_tags: Set[str] = set(self._notes["tags"])
+        self._catalog_all()
+        used_tags: Set[str] = self._catalog.used_tags()
+        total_notes = sum(self.note_count(folder) for folder in self._notes["folders"])
+        return all_tags, used_tags, total_notes
+
+#==================================================
+# Notes
+#==================================================
+    def create_note(self, folder: str, title: str) -> Dict[str, Any]:
+        """Append an empty note to a folder"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        new_note = {
+            "id": new_note_id(),
+            "title": title,
+            "content": "",
+            "tags": [],
+            "images": [],
+            "links": [],
+            "created": now,
+            "last_modified": now
+        }
+        self._catalog_folder(folder)
+        folder_notes = self._notes["folders"][folder]
+        folder_notes.append(new_note)
+        self._catalog.add_note(folder, new_note)
+        self.save_data(self._notes, [("set", self._note_path(folder, len(folder_notes) - 1), new_note)])
+        self._reindex_note(folder, new_note)
+        return new_note
+
+    def update_note(self, folder: str, position: int, content: str,
+                    formats: Iterable[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """Save a note's text and its format ranges (character offsets into ``content``).
+
+        Only the fields that differ from the stored note are written, as
+        field-level records; saving an unchanged note writes nothing and
+        keeps its modification time.
+        """
+        note = self.note(folder, position)
+        previous = (note.get("content", ""), note.get("formats", []))
+        # Trimmed to the content, with overlapping ranges of one style merged
+        formats = normalize_formats(formats, len(content))
+
+        changes: List[Change] = []
+        content_changed = note.get("content") != content
+        if content_changed:
+            note["content"] = content
+            changes.append(("set", self._note_path(folder, position, "content"), content))
+            # Lets another session's search index see the edit even within the same minute
+            note["content_hash"] = content_hash(content)
+            changes.append(("set", self._note_path(folder, position, "content_hash"), note["content_hash"]))
+        if note.get("formats") != formats:
+            note["formats"] = formats
+            changes.append(("set", self._note_path(folder, position, "formats"), formats))
+        if not changes:
+            return note
+
+        note["last_modified"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+        changes.append(("set", self._note_path(folder, position, "last_modified"), note["last_modified"]))
+        if "id" not in note:
+            note["id"] = new_note_id()
+            changes.append(("set", self._note_path(folder, position, "id"), note["id"]))
+            content_changed = True
+        self.save_data(self._notes, changes)
+        self.history().record(note["id"], content, formats, previous)
+        # Formats are not searchable, so only text edits touch the index
+        if content_changed:
+            self._reindex_note(folder, note)
+        return note
+
+    def remove_note(self, folder: str, position: int) -> Dict[str, Any]:
+        self._catalog_folder(folder)
+        folder_notes = self._notes["folders"][folder]
+        note = folder_notes.pop(position)
+        self._catalog.remove_note(note["id"])
+        self._unindex_note(note)
+        self._forget_history(note)
+        # Later notes shift down, so record the whole folder
+        self.save_data(self._notes, [("set", ("folders", folder), folder_notes)])
+
+        # Images no other note references are deleted
+        self._images.release(note.get("images", []))
+        return note
+
+    def move_note(self, note_id: str, folder: str) -> Tuple[str, int]:
+        """Move a note to the end of another folder; returns its new (folder, position)"""
+        source, position = self.locate_note(note_id)
+        if folder == source:
+            return source, position
+        self._catalog_folder(folder)
+        source_notes = self._notes["folders"][source]
+        # The body moves with the note, so it must be in memory
+        note = self.load_note_body(source_notes.pop(position))
+        self._catalog.remove_note(note_id)
+        target_notes = self._notes["folders"][folder]
+        target_notes.append(note)
+        new_position = self._catalog.add_note(folder, note)
+        # Later notes of the source shift down, so record that whole folder
+        self.save_data(self._notes, [("set", ("folders", source), source_notes),
+                                     ("set", self._note_path(folder, new_position), note)])
+        if self._search_index is not None:
+            self._search_index.update_note_meta(note_id, folder=folder)
+        return folder, new_position
+
+    def attach_image(self, folder: str, position: int, filepath: str) -> str:
+        """Copy an image into the store and add it to a note; returns the image id"""
+        # Stored by content hash: inserting the same picture again copies nothing
+        image_id = self._images.add_file(filepath)
+        note = self._notes["folders"][folder][position]
+        note["images"].append(image_id)
+        self.save_data(self._notes, [("set", self._note_path(folder, position, "images"), note["images"])])
+        return image_id
+
+    def attach_link(self, folder: str, position: int, url: str) -> str:
+        """Add a link to a note, defaulting to https; returns the stored URL"""
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+        note = self._notes["folders"][folder][position]
+        note["links"].append(url)
+        self.save_data(self._notes, [("set", self._note_path(folder, position, "links"), note["links"])])
+        return url
+
+#==================================================
+# Images
+#==================================================
+    def setup_image_storage(self):
+        """Open the content-addressed image store, migrating the old image map into it"""
+        self._images = ImageStore(self._image_dir)
+        if self._notes["images"]:
+            self._migrate_legacy_images()
+
+    def _migrate_legacy_images(self):
+        """Replace img_N ids from the old path map with content-addressed ids"""
+        legacy = self._notes["images"]
+        new_ids: Dict[str, Optional[str]] = {}
+        for old_id, path in legacy.items():
+            # Paths were saved with the separator of the OS that wrote them
+            path = path.replace("\\", "/")
+            try:
+                new_ids[old_id] = self._images.import_file(path)
+            except OSError as e:
+                print(f"Dropping missing image {path}: {e}")
+                new_ids[old_id] = None
+
+        changes: List[Change] = [("del", ("images", old_id)) for old_id in legacy]
+        references: List[str] = []
+        for folder in self._notes["folders"]:
+            for position, note in enumerate(self._notes["folders"][folder]):
+                images = note.get("images", [])
+                if any(img_id in new_ids for img_id in images):
+                    images = [new_ids.get(img_id, img_id) for img_id in images]
+                    note["images"] = [img_id for img_id in images if img_id is not None]
+                    changes.append(("set", ("folders", folder, position, "images"), note["images"]))
+                references.extend(img_id for img_id in note.get("images", []) if ImageStore.is_blob_id(img_id))
+
+        old_paths = list(legacy.values())
+        legacy.clear()
+        self.save_data(self._notes, changes)
+        self.storage.flush()
+        self._images.gc(references)
+
+        # The notes point at the blobs now, so the old copies can go
+        for path in old_paths:
+            try:
+                os.remove(path.replace("\\", "/"))
+            except OSError:
+                pass
+
+#==================================================
+# History
+#==================================================
+    def history(self) -> NoteHistory:
+        """The revision history, loaded on first use"""
+        if self._history is None:
+            self._history = NoteHistory()
+        return self._history
+
+    def note_revisions(self, folder: str, position: int) -> List[Tuple[int, str]]:
+        """(revision number, save time) of a note's kept revisions, oldest first"""
+        note = self._notes["folders"][folder][position]
+        if "id" not in note:
+            return []
+        return [(number, datetime.fromtimestamp(saved).strftime("%Y-%m-%d %H:%M"))
+                for number, saved in self.history().revisions(note["id"])]
+
+    def note_revision(self, folder: str, position: int, number: int) -> Dict[str, Any]:
+        """Content and formats of one revision; raises ValueError if it is not kept"""
+        note = self._notes["folders"][folder][position]
+        revision = self.history().revision(note["id"], number) if "id" in note else None
+        if revision is None:
+            raise ValueError(f"Revision {number} not found")
+        return revision
+
+    def restore_revision(self, folder: str, position: int, number: int) -> Dict[str, Any]:
+        """Save an old revision as the note's current text (itself a new revision)"""
+        revision = self.note_revision(folder, position, number)
+        return self.update_note(folder, position, revision["content"], revision["formats"])
+
+    def _forget_history(self, note):
+        """Drop a deleted note's revisions"""
+        if "id" in note:
+            self.history().remove(note["id"])
+
+#==================================================
+# Search
+#==================================================
+    def load_search_index(self) -> NoteSearchIndex:
+        """Load the search index synchronously (live search loads it in the background)"""
+        if self._search_index is None:
+            self.attach_search_index(NoteSearchIndex())
+        return self._search_index
+
+    def attach_search_index(self, index: NoteSearchIndex) -> None:
+        """Reconcile a freshly loaded index with the notes.
+
+        Every note gets an id, stale notes are re-indexed and deleted notes dropped.
+        """
+        changes: List[Change] = []
+        stale = []
+        seen_ids: Set[str] = set()
+        for folder in self._notes["folders"]:
+            for position, note in enumerate(self._notes["folders"][folder]):
+                if "id" not in note:
+                    note["id"] = new_note_id()
+                    changes.append(("set", ("folders", folder, position, "id"), note["id"]))
+                seen_ids.add(note["id"])
+                if not index.is_current(note["id"], folder, note):
+                    stale.append((folder, note))
+
+        # Bodies are loaded one at a time as the index consumes them, so the
+        # storage's body cache never has to hold every stale note at once
+        index.index_notes((note["id"], folder, self.load_note_body(note)) for folder, note in stale)
+        for note_id in index.doc_ids() - seen_ids:
+            index.remove_note(note_id)
+        if changes:
+            self.save_data(self._notes, changes)
+        self._search_index = index
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[SearchResult]:
+        """Run a query (with folder:Name / tag:Name filters) on the calling thread"""
+        text, folder, tags = parse_query(query)
+        index = self.load_search_index()
+        results: List[SearchResult] = []
+        for note_id, _ in index.search(text, folder=folder, tags=tags, limit=limit):
+            doc = index.doc(note_id)
+            if doc is not None:
+                results.append((note_id, doc["folder"], doc["title"]))
+        return results
+
+    # Until the first search loads the index, changes are picked up by that load
+    def _reindex_note(self, folder, note):
+        """Re-index a note after its content changed"""
+        if self._search_index is not None:
+            self._search_index.index_note(note["id"], folder, note)
+
+    def _reindex_tags(self, note):
+        """Push a note's new tags to the search index"""
+        if self._search_index is not None and "id" in note:
+            self._search_index.update_note_meta(note["id"], tags=note.get("tags", []))
+
+    def _unindex_note(self, note):
+        """Drop a deleted note from the search index"""
+        if self._search_index is not None and "id" in note:
+            self._search_index.remove_note(note["id"])
+
+#==================================================
+# Statistics
+#==================================================
+    def get_statistics(self) -> Dict[str, Any]:
+        """Override abstract method with detailed notes statistics"""
+        if not self._notes:
+            return {"message": "No notes available"}
+
+        # Using dictionary for comprehensive statistics
+        all_tags, used_tags, total_notes = self.tag_usage()
+        return {
+            "total_folders": len(self._notes["folders"]),
+            "total_notes": total_notes,
+            "total_tags": len(self._notes["tags"]),
+            "used_tags": len(used_tags),
+            "unused_tags": len(all_tags - used_tags),
+            "tag_counts": self.tag_counts(),
+            "total_images": self._images.count(),
+            "folders_list": list(self._notes["folders"].keys())
+        }
@@ -1,11 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime, timedelta
-import threading
 import platform
-import os
-from base_app import BaseApp
-from typing import Dict, List, Set, Tuple, Any, Optional
+import shlex
+import subprocess
+from reminder_service import ReminderService, REPEAT_TYPES
+from virtual_list import VirtualList
+from typing import Dict, List, Set, Tuple
+
+# How often the Tk thread collects reminders the scheduler found due
+DUE_POLL_MS = 200
+# Reminders due together open at most this many popups; the rest are summarised
+MAX_POPUPS = 5
+# Sound processes allowed to play at the same time
+MAX_CONCURRENT_SOUNDS = 2
 
 # Conditionally import winsound
 if platform.system() == "Windows":
@@ -13,22 +21,24 @@ if platform.system() == "Windows":
 else:
     winsound = None
 
-class ReminderApp(BaseApp):
+class ReminderApp(ReminderService):
+    """Tk view over ReminderService: widgets, popups and sounds"""
     def __init__(self, parent):
         super().__init__("reminder_data.json")
         
         # Store parent reference
         self.parent = parent
         
-        # Encapsulation: Make data private
-        self._active_reminders = self.load_data()
         self._sound_settings = self._initialize_sound_settings()
+        self._sound_processes: List[subprocess.Popen] = []
         
         self.setup_ui()
         self.update_reminders_list()
 
-        self.reminder_thread = threading.Thread(target=self.check_reminders, daemon=True)
-        self.reminder_thread.start()
+        # The scheduler thread only queues the ids of due reminders: the reminder list,
+        # the storage and the widgets are touched on the Tk thread alone, by _drain_due_reminders
+        self.start_scheduler()
+        self._drain_id = self.parent.after(DUE_POLL_MS, self._drain_due_reminders)
 
     def _initialize_sound_settings(self) -> Dict[str, str]:
         """Initialize sound settings using dictionary"""
@@ -38,14 +48,15 @@ class ReminderApp(BaseApp):
             "linux": "paplay /usr/share/sounds/freedesktop/stereo/complete.oga"
         }
 
-    # Encapsulation: Getter method for reminders
-    def get_reminders(self) -> List[Dict]:
-        return self._active_reminders.copy()
+    # Suspend keeps the scheduler and the drain running: reminders still pop
+    # up while another app is shown, and only close() stops the thread
 
-    # Encapsulation: Setter method for reminders
-    def set_reminders(self, reminders: List[Dict]) -> None:
-        self._active_reminders = reminders
-        self.save_data(self._active_reminders)
+    def close(self) -> None:
+        """Stop the drain, the scheduler and flush pending writes"""
+        if self._drain_id is not None:
+            self.parent.after_cancel(self._drain_id)
+            self._drain_id = None
+        super().close()
 
 #==================================================
 # Setup Screen
@@ -91,7 +102,7 @@ class ReminderApp(BaseApp):
 
         ttk.Label(frame, text="Repeat:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
         self.repeat_var = tk.StringVar(value="none")
-        for i, val in enumerate(["none", "daily", "weekly"]):
+        for i, val in enumerate(REPEAT_TYPES):
             ttk.Radiobutton(frame, text=val.capitalize(), variable=self.repeat_var, value=val).grid(row=3, column=1+i, padx=5, pady=5)
 
         bframe = ttk.Frame(main)
@@ -101,11 +112,10 @@ class ReminderApp(BaseApp):
         ttk.Button(bframe, text="Show Stats", command=self.show_statistics).pack(side=tk.LEFT, padx=5)
 
         # Configure treeview columns
-        self.tree = ttk.Treeview(main, columns=("title", "message", "time", "repeat"), show="headings", height=8)
-        for col, width in [("title", 120), ("message", 200), ("time", 120), ("repeat", 80)]:
-            self.tree.heading(col, text=col.capitalize())
-            self.tree.column(col, width=width)
-        self.tree.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.reminders_list = VirtualList(main, columns=[(col, col.capitalize(), width) for col, width in
+                                                         [("title", 120), ("message", 200), ("time", 120), ("repeat", 80)]],
+                                          selectmode="extended", height=8)
+        self.reminders_list.pack(fill=tk.BOTH, expand=True, pady=5)
 
         # Button frame for bottom buttons
         button_frame = ttk.Frame(main)
@@ -117,69 +127,26 @@ class ReminderApp(BaseApp):
 # Main function
 #==================================================
     def set_reminder(self):
-        # Validate time format
-        time_str = self.time_entry.get()
-        if not self.validate_time_format(time_str):
-            messagebox.showerror("Error", "Invalid time format. Please use HH:MM format (24-hour clock) with 2 digits for both hours and minutes")
-            return
-        
         try:
-            reminder_time = datetime.strptime(self.date_entry.get() + " " + time_str, "%Y-%m-%d %H:%M")
-        except ValueError:
-            messagebox.showerror("Error", "Invalid date/time format. Please use YYYY-MM-DD for date and HH:MM for time (24-hour format)")
-            return
-
-        if reminder_time < datetime.now():
-            messagebox.showerror("Error", "Reminder must be in the future")
+            reminder_time = self.parse_reminder_time(self.date_entry.get(), self.time_entry.get())
+            # Get message from text widget instead of entry
+            reminder = self.add_reminder(self.title_entry.get(), self.message_text.get("1.0", tk.END),
+                                         reminder_time, self.repeat_var.get())
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
 
-        # Using tuple for reminder priority levels
-        priority_levels: Tuple[str, ...] = ("low", "medium", "high")
-        
-        # Get message from text widget instead of entry
-        message_content = self.message_text.get("1.0", tk.END).strip()
-        
-        reminder = {
-            "title": self.title_entry.get().strip(),
-            "message": message_content,
-            "time": reminder_time.strftime("%Y-%m-%d %H:%M"),
-            "repeat": self.repeat_var.get(),
-            "priority": priority_levels[1]  # Default to medium priority
-        }
-
-        if not reminder["title"]:
-            messagebox.showerror("Error", "Title required")
-            return
-
-        self._active_reminders.append(reminder)
-        self.save_data(self._active_reminders)
-        self.update_reminders_list()
+        self.reminders_list.insert(tk.END, self._reminder_row(reminder))
         self.clear_fields()
         messagebox.showinfo("Success", "Reminder set successfully!")
 
-    def validate_time_format(self, time_str):
-        """Validate that time is in HH:MM format with 2 digits each"""
-        try:
-            if len(time_str) != 5 or time_str[2] != ":":
-                return False
-            
-            hours, minutes = time_str.split(":")
-            if not (hours.isdigit() and minutes.isdigit()):
-                return False
-            
-            hours_num = int(hours)
-            minutes_num = int(minutes)
-            
-            return 0 <= hours_num <= 23 and 0 <= minutes_num <= 59
-        except:
-            return False
-        
     def update_reminders_list(self):
-        self.tree.delete(*self.tree.get_children())
-        for r in self._active_reminders:
-            # Truncate long messages for display
-            display_message = r["message"][:50] + "..." if len(r["message"]) > 50 else r["message"]
-            self.tree.insert("", tk.END, values=(r["title"], display_message, r["time"], r["repeat"]))
+        self.reminders_list.set_rows(self._reminder_row(r) for r in self._active_reminders)
+
+    def _reminder_row(self, r: Dict) -> Tuple[str, ...]:
+        # Truncate long messages for display
+        display_message = r["message"][:50] + "..." if len(r["message"]) > 50 else r["message"]
+        return (r["title"], display_message, r["time"], r["repeat"])
 
     def clear_fields(self):
         """Clear all input fields - FIXED THIS FUNCTION"""
@@ -193,76 +160,88 @@ class ReminderApp(BaseApp):
         self.title_entry.focus()  # Set focus to title field
 
     def delete_reminder(self):
-        selected = self.tree.selection()
+        selected = self.reminders_list.curselection()
         if not selected:
             messagebox.showinfo("Info", "Please select a reminder to delete")
             return
         
-        # Using set for selected indices
-        selected_indices: Set[int] = {self.tree.index(item) for item in selected}
-        
-        # Remove reminders in reverse order to avoid index issues
-        for index in sorted(selected_indices, reverse=True):
-            if index < len(self._active_reminders):
-                del self._active_reminders[index]
+        deleted = self.delete_reminders(selected)
+        for index in deleted:
+            self.reminders_list.delete(index)
+        messagebox.showinfo("Success", f"Deleted {len(set(selected))} reminder(s)")
+
+    def _drain_due_reminders(self):
+        """Fire the reminders the scheduler queued since the last poll"""
+        due = self.take_due()
+        if due:
+            self.fire_reminders(due)
+        self._drain_id = self.parent.after(DUE_POLL_MS, self._drain_due_reminders)
+
+    def fire_reminders(self, reminder_ids: Set[str]) -> Tuple[List[Dict], List[int], List[int]]:
+        """Reschedule or drop due reminders, then patch the list and notify"""
+        fired, removed, updated = super().fire_reminders(reminder_ids)
+        if not fired:
+            return fired, removed, updated
         
-        self.save_data(self._active_reminders)
-        self.update_reminders_list()
-        messagebox.showinfo("Success", f"Deleted {len(selected_indices)} reminder(s)")
-
-    def check_reminders(self):
-        while True:
-            now = datetime.now()
-            updated = False
-            new_list = []
-
-            for r in self._active_reminders:
-                r_time = datetime.strptime(r["time"], "%Y-%m-%d %H:%M")
-                if now >= r_time:
-                    # Show notification directly instead of using after()
-                    self.show_notification(r["title"], r["message"])
-                    
-                    # Using match expression for repeat handling (Python 3.10+)
-                    match r["repeat"]:
-                        case "daily":
-                            r["time"] = (r_time + timedelta(days=1)).strftime("%Y-%m-%d %H:%M")
-                            new_list.append(r)
-                        case "weekly":
-                            r["time"] = (r_time + timedelta(weeks=1)).strftime("%Y-%m-%d %H:%M")
-                            new_list.append(r)
-                        case "none":
-                            pass  # Don't readd one-time reminders
-                        case _:
-                            new_list.append(r)  # Keep unknown repeat types
-                    
-                    updated = True
-                else:
-                    new_list.append(r)
-
-            if updated:
-                self._active_reminders = new_list
-                self.save_data(self._active_reminders)
-                # Update the GUI in the main thread
-                if hasattr(self, 'parent') and self.parent.winfo_exists():
-                    self.parent.after(0, self.update_reminders_list)
-            
-            threading.Event().wait(10)  # Check every 10 seconds
+        # Patch only the rows that changed
+        for index in reversed(removed):
+            self.reminders_list.delete(index)
+        for index in updated:
+            self.reminders_list.set_row(index, self._reminder_row(self._active_reminders[index]))
+        self.show_notifications(fired)
+        return fired, removed, updated
+
+    def show_notifications(self, reminders: List[Dict]):
+        """Play one sound and open a non-modal popup per reminder"""
+        self.play_sound()
+        for offset, r in enumerate(reminders[:MAX_POPUPS]):
+            self._show_popup(r["title"], r["message"], offset)
+        if len(reminders) > MAX_POPUPS:
+            titles = "\n".join(r["title"] for r in reminders[MAX_POPUPS:])
+            self._show_popup(f"{len(reminders) - MAX_POPUPS} more reminders", titles, MAX_POPUPS)
 
     def show_notification(self, title: str, message: str):
+        """Play a sound and show one reminder popup"""
+        self.play_sound()
+        self._show_popup(title, message, 0)
+
+    def _show_popup(self, title: str, message: str, offset: int):
+        """Open a notification window that does not block the event loop"""
+        root = self.parent.winfo_toplevel()
+        popup = tk.Toplevel(root)
+        popup.title(title)
+        popup.attributes("-topmost", True)
+        popup.geometry(f"+{root.winfo_rootx() + 40 + 30 * offset}+{root.winfo_rooty() + 40 + 30 * offset}")
+        
+        frame = ttk.Frame(popup, padding=15)
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=title, style='Header.TLabel').pack(anchor=tk.W)
+        ttk.Label(frame, text=message, wraplength=300, justify=tk.LEFT).pack(anchor=tk.W, pady=(5, 10))
+        ttk.Button(frame, text="OK", command=popup.destroy).pack()
+
+    def play_sound(self):
         """Play sound based on platform using match expression"""
         # Using match expression for platform-specific sound handling
         match platform.system():
             case "Windows" if winsound:
-                winsound.MessageBeep()
+                winsound.MessageBeep()  # Returns immediately
             case "Darwin":
-                os.system(self._sound_settings["macos"])
+                self._start_sound(self._sound_settings["macos"])
             case "Linux":
-                os.system(self._sound_settings["linux"])
+                self._start_sound(self._sound_settings["linux"])
             case _:
                 print("Notification sound not supported on this platform")
-        
-        # Show the notification directly
-        messagebox.showinfo(title, message)
+
+    def _start_sound(self, command: str):
+        """Start a sound player process without waiting for it to finish"""
+        self._sound_processes = [p for p in self._sound_processes if p.poll() is None]
+        if len(self._sound_processes) >= MAX_CONCURRENT_SOUNDS:
+            return
+        try:
+            self._sound_processes.append(subprocess.Popen(
+                shlex.split(command), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        except OSError as e:
+            print(f"Error playing notification sound: {e}")
 
     def show_unique_reminder_types(self):
         """Demonstrate set usage - show unique reminder types"""
@@ -270,12 +249,10 @@ class ReminderApp(BaseApp):
             messagebox.showinfo("Info", "No reminders to analyze.")
             return
         
-        # Using set to get unique reminder types
-        unique_repeats: Set[str] = {reminder["repeat"] for reminder in self._active_reminders}
-        unique_titles: Set[str] = {reminder["title"] for reminder in self._active_reminders}
+        unique_repeats, unique_titles = self.unique_reminder_types()
         
         stats_text = f"Unique Repeat Types: {', '.join(unique_repeats)}\n"
-        stats_text += f"Unique Titles: {len(unique_titles)} out of {len(self._active_reminders)} reminders"
+        stats_text += f"Unique Titles: {unique_titles} out of {len(self._active_reminders)} reminders"
         
         messagebox.showinfo("Unique Reminder Types", stats_text)
 
@@ -289,10 +266,7 @@ class ReminderApp(BaseApp):
         total_reminders = len(self._active_reminders)
         
         # Repeat type distribution using dictionary
-        repeat_distribution: Dict[str, int] = {}
-        for reminder in self._active_reminders:
-            repeat_type = reminder["repeat"]
-            repeat_distribution[repeat_type] = repeat_distribution.get(repeat_type, 0) + 1
+        repeat_distribution = self.repeat_distribution()
         
         # Create statistics tuple
         stats: Tuple[int, Dict[str, int]] = (total_reminders, repeat_distribution)
@@ -304,39 +278,6 @@ class ReminderApp(BaseApp):
         
         messagebox.showinfo("Reminder Statistics", stats_text)
 
-    # Override base class method to demonstrate inheritance
-    def load_data(self) -> List[Dict]:
-        """Enhanced load_data method with additional validation"""
-        data = super().load_data()
-        
-        # Validate loaded data structure using match
-        valid_data = []
-        for item in data:
-            match item:
-                case {"title": str(), "message": str(), "time": str(), "repeat": str()}:
-                    valid_data.append(item)
-                case _:
-                    print(f"Skipping invalid reminder data: {item}")
-        
-        return valid_data
-
-    # Implement abstract method from BaseApp
-    def get_statistics(self) -> Dict[str, Any]:
-        """Return comprehensive statistics about the reminders"""
-        if not self._active_reminders:
-            return {"message": "No reminders available"}
-        
-        # Using dictionary for comprehensive statistics
-        return {
-            "total_reminders": len(self._active_reminders),
-            "repeat_types": list({r["repeat"] for r in self._active_reminders}),
-            "upcoming_reminders": [r for r in self._active_reminders 
-                                  if datetime.strptime(r["time"], "%Y-%m-%d %H:%M") > datetime.now()],
-            "repeat_distribution": {r["repeat"]: sum(1 for rem in self._active_reminders 
-                                                   if rem["repeat"] == r["repeat"]) 
-                                   for r in self._active_reminders}
-        }
-
 # if __name__ == "__main__":
 #     root = tk.Tk()
 #     app = ReminderApp(root)
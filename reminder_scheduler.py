@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple, Any, Optional, Callable, Hashable
+
+# Upper bound on one sleep, so wall-clock jumps (suspend, DST, manual changes)
+# are noticed within a minute even when the next reminder is days away
+MAX_SLEEP_SECONDS = 60.0
+
+
+class ReminderScheduler:
+    """Fires callbacks at wall-clock due times from a min-heap.
+
+    A single daemon thread sleeps on a Condition until the earliest due time;
+    ``schedule`` and ``cancel`` wake it early when the head of the heap changes.
+    Cancelled and rescheduled entries are left in the heap and skipped when
+    they surface, so both operations are O(log n).
+    """
+    def __init__(self, on_due: Callable[[Hashable], None]):
+        self._on_due = on_due
+        self._cond = threading.Condition()
+        self._heap: List[List[Any]] = []  # [due, seq, key, active]
+        self._entries: Dict[Hashable, List[Any]] = {}
+        self._counter = itertools.count()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler thread (callbacks already running are not interrupted)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1)
+
+    def schedule(self, key: Hashable, due: datetime) -> None:
+        """Add a key, or move it to a new due time"""
+        with self._cond:
+            self._deactivate(key)
+            entry = [due, next(self._counter), key, True]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def cancel(self, key: Hashable) -> None:
+        with self._cond:
+            if self._deactivate(key):
+                self._cond.notify()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._heap.clear()
+            self._entries.clear()
+            self._cond.notify()
+
+    def next_due(self) -> Optional[Tuple[datetime, Hashable]]:
+        """Earliest (due time, key) still scheduled"""
+        with self._cond:
+            self._drop_inactive()
+            if not self._heap:
+                return None
+            return self._heap[0][0], self._heap[0][2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _deactivate(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = False
+        # Rebuild once dead entries dominate, so the heap stays proportional to live keys
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[3]]
+            heapq.heapify(self._heap)
+        return True
+
+    def _drop_inactive(self) -> None:
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    self._drop_inactive()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(min(delay, MAX_SLEEP_SECONDS))
+
+                # Pop everything that is due now in one go
+                now = datetime.now()
+                due: List[Hashable] = []
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    if entry[3]:
+                        del self._entries[entry[2]]
+                        due.append(entry[2])
+
+            for key in due:
+                try:
+                    self._on_due(key)
+                except Exception as e:
+                    print(f"Error firing reminder {key}: {e}")
@@ -0,0 +1,266 @@
+from datetime import datetime, timedelta
+import queue
+import uuid
+from base_app import BaseApp, Change, StorageBackend
+from reminder_scheduler import ReminderScheduler
+from typing import Dict, List, Set, Tuple, Any, Optional, Iterable
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+# Repeat choices offered for a reminder
+REPEAT_TYPES = ("none", "daily", "weekly")
+
+
+class ReminderService(BaseApp):
+    """Reminders, their schedule and repeat handling without any widgets.
+
+    ReminderApp is the Tk view on top of this class. The scheduler thread only
+    queues the ids of due reminders; whoever owns the service (the Tk thread,
+    a batch job) collects them with ``take_due`` and passes them to
+    ``fire_reminders``, so the reminder list and storage stay single-threaded.
+    """
+    def __init__(self, filename: str = "reminder_data.json", storage: Optional[StorageBackend] = None):
+        super().__init__(filename, storage)
+
+        # Encapsulation: Make data private
+        self._active_reminders = self.load_data()
+
+        # Due times live in a heap; the scheduler thread sleeps until the next one
+        self._due_queue: "queue.Queue[str]" = queue.Queue()
+        self._scheduler = ReminderScheduler(self._due_queue.put)
+        self._schedule_all()
+
+    def start_scheduler(self) -> None:
+        self._scheduler.start()
+
+    # Encapsulation: Getter method for reminders
+    def get_reminders(self) -> List[Dict]:
+        return self._active_reminders.copy()
+
+    # Encapsulation: Setter method for reminders
+    def set_reminders(self, reminders: List[Dict]) -> None:
+        self._active_reminders = reminders
+        self.save_data(self._active_reminders)
+        self._schedule_all()
+
+    def close(self) -> None:
+        """Stop the scheduler and flush pending writes"""
+        self._scheduler.stop()
+        super().close()
+
+#==================================================
+# Reminders
+#==================================================
+    def validate_time_format(self, time_str):
+        """Validate that time is in HH:MM format with 2 digits each"""
+        try:
+            if len(time_str) != 5 or time_str[2] != ":":
+                return False
+
+            hours, minutes = time_str.split(":")
+            if not (hours.isdigit() and minutes.isdigit()):
+                return False
+
+            hours_num = int(hours)
+            minutes_num = int(minutes)
+
+            return 0 <= hours_num <= 23 and 0 <= minutes_num <= 59
+        except:
+            return False
+
+    def parse_reminder_time(self, date_str: str, time_str: str) -> datetime:
+        """Date and time entries as a datetime; raises ValueError with a user-facing message"""
+        if not self.validate_time_format(time_str):
+            raise ValueError("Invalid time format. Please use HH:MM format (24-hour clock) with 2 digits for both hours and minutes")
+        try:
+            return datetime.strptime(date_str + " " + time_str, TIME_FORMAT)
+        except ValueError:
+            raise ValueError("Invalid date/time format. Please use YYYY-MM-DD for date and HH:MM for time (24-hour format)")
+
+    def add_reminder(self, title: str, message: str, when: datetime, repeat: str = "none") -> Dict[str, Any]:
+        """Validate, save and schedule one reminder; raises ValueError with a user-facing message"""
+        if when < datetime.now():
+            raise ValueError("Reminder must be in the future")
+        if repeat not in REPEAT_TYPES:
+            raise ValueError(f"Unknown repeat type '{repeat}'")
+
+        # Using tuple for reminder priority levels
+        priority_levels: Tuple[str, ...] = ("low", "medium", "high")
+
+        reminder = {
+            "title": title.strip(),
+            "message": message.strip(),
+            "id": uuid.uuid4().hex,
+            "time": when.strftime(TIME_FORMAT),
+            "repeat": repeat,
+            "priority": priority_levels[1]  # Default to medium priority
+        }
+
+        if not reminder["title"]:
+            raise ValueError("Title required")
+
+        self._active_reminders.append(reminder)
+        self.save_data(self._active_reminders, [("set", (len(self._active_reminders) - 1,), reminder)])
+        self._scheduler.schedule(reminder["id"], when)
+        return reminder
+
+    def find_reminder(self, reminder_id: str) -> Optional[int]:
+        """Position of the reminder with this id, or None"""
+        return next((i for i, r in enumerate(self._active_reminders) if r["id"] == reminder_id), None)
+
+    def update_reminder(self, index: int, title: Optional[str] = None, message: Optional[str] = None,
+                        when: Optional[datetime] = None, repeat: Optional[str] = None) -> Dict[str, Any]:
+        """Change some fields of a reminder and reschedule it; raises ValueError like add_reminder"""
+        reminder = dict(self._active_reminders[index])
+        if title is not None:
+            reminder["title"] = title.strip()
+            if not reminder["title"]:
+                raise ValueError("Title required")
+        if message is not None:
+            reminder["message"] = message.strip()
+        if repeat is not None:
+            if repeat not in REPEAT_TYPES:
+                raise ValueError(f"Unknown repeat type '{repeat}'")
+            reminder["repeat"] = repeat
+        if when is not None:
+            if when < datetime.now():
+                raise ValueError("Reminder must be in the future")
+            reminder["time"] = when.strftime(TIME_FORMAT)
+
+        self._active_reminders[index] = reminder
+        self.save_data(self._active_reminders, [("set", (index,), reminder)])
+        self._scheduler.schedule(reminder["id"], datetime.strptime(reminder["time"], TIME_FORMAT))
+        return reminder
+
+    def delete_reminders(self, indices: Iterable[int]) -> List[int]:
+        """Delete reminders by position; returns the deleted positions, highest first"""
+        # Using set for selected indices
+        selected_indices: Set[int] = set(indices)
+
+        # Remove reminders in reverse order to avoid index issues
+        deleted = [index for index in sorted(selected_indices, reverse=True) if index < len(self._active_reminders)]
+        for index in deleted:
+            self._scheduler.cancel(self._active_reminders[index]["id"])
+            del self._active_reminders[index]
+
+        self.save_data(self._active_reminders)
+        return deleted
+
+    def _schedule_all(self):
+        """Give every reminder an id and (re)build the scheduler heap"""
+        changes: List[Change] = []
+        for index, reminder in enumerate(self._active_reminders):
+            if "id" not in reminder:
+                reminder["id"] = uuid.uuid4().hex
+                changes.append(("set", (index, "id"), reminder["id"]))
+        if changes:
+            self.save_data(self._active_reminders, changes)
+
+        self._scheduler.clear()
+        for reminder in self._active_reminders:
+            self._scheduler.schedule(reminder["id"], datetime.strptime(reminder["time"], TIME_FORMAT))
+
+    def take_due(self) -> Set[str]:
+        """Ids of the reminders the scheduler queued since the last call"""
+        due: Set[str] = set()
+        while True:
+            try:
+                due.add(self._due_queue.get_nowait())
+            except queue.Empty:
+                return due
+
+    def fire_reminders(self, reminder_ids: Set[str]) -> Tuple[List[Dict], List[int], List[int]]:
+        """Reschedule or drop due reminders.
+
+        Returns (fired reminders, removed positions, updated positions after the removals).
+        """
+        fired: List[Dict] = []
+        remaining: List[Dict] = []
+        changes: List[Change] = []
+        removed: List[int] = []
+        updated: List[int] = []
+        now = datetime.now()
+        for index, r in enumerate(self._active_reminders):
+            if r["id"] not in reminder_ids:
+                remaining.append(r)
+                continue
+            fired.append(r)
+
+            # Using match expression for repeat handling (Python 3.10+)
+            match r["repeat"]:
+                case "daily" | "weekly":
+                    step = timedelta(days=1) if r["repeat"] == "daily" else timedelta(weeks=1)
+                    r_time = datetime.strptime(r["time"], TIME_FORMAT)
+                    # Skip occurrences missed while the app was closed instead of firing each one
+                    while r_time <= now:
+                        r_time += step
+                    r["time"] = r_time.strftime(TIME_FORMAT)
+                    changes.append(("set", (len(remaining), "time"), r["time"]))
+                    updated.append(len(remaining))
+                    self._scheduler.schedule(r["id"], r_time)
+                    remaining.append(r)
+                case "none":
+                    removed.append(index)  # Don't readd one-time reminders
+                case _:
+                    remaining.append(r)  # Keep unknown repeat types without rescheduling them
+
+        if not fired:
+            return fired, removed, updated
+        if removed:
+            self._active_reminders = remaining
+            self.save_data(self._active_reminders)
+        else:
+            self.save_data(self._active_reminders, changes)
+        return fired, removed, updated
+
+#==================================================
+# Statistics
+#==================================================
+    def unique_reminder_types(self) -> Tuple[Set[str], int]:
+        """(repeat types in use, number of distinct titles)"""
+        # Using set to get unique reminder types
+        unique_repeats: Set[str] = {reminder["repeat"] for reminder in self._active_reminders}
+        unique_titles: Set[str] = {reminder["title"] for reminder in self._active_reminders}
+        return unique_repeats, len(unique_titles)
+
+    def repeat_distribution(self) -> Dict[str, int]:
+        # Repeat type distribution using dictionary
+        repeat_distribution: Dict[str, int] = {}
+        for reminder in self._active_reminders:
+            repeat_type = reminder["repeat"]
+            repeat_distribution[repeat_type] = repeat_distribution.get(repeat_type, 0) + 1
+        return repeat_distribution
+
+    # Override base class method to demonstrate inheritance
+    def load_data(self) -> List[Dict]:
+        """Enhanced load_data method with additional validation"""
+        data = super().load_data()
+
+        # Validate loaded data structure using match
+        valid_data = []
+        for item in data:
+            match item:
+                case {"title": str(), "message": str(), "time": str(), "repeat": str()}:
+                    valid_data.append(item)
+                case _:
+                    print(f"Skipping invalid reminder data: {item}")
+
+        # Positions in the stored list no longer match, so the next save is a whole one
+        if len(valid_data) != len(data):
+            self._stored_differs = True
+        return valid_data
+
+    # Implement abstract method from BaseApp
+    def get_statistics(self) -> Dict[str, Any]:
+        """Return comprehensive statistics about the reminders"""
+        if not self._active_reminders:
+            return {"message": "No reminders available"}
+
+        # Using dictionary for comprehensive statistics
+        return {
+            "total_reminders": len(self._active_reminders),
+            "repeat_types": list({r["repeat"] for r in self._active_reminders}),
+            "upcoming_reminders": [r for r in self._active_reminders
+                                  if datetime.strptime(r["time"], TIME_FORMAT) > datetime.now()],
+            "repeat_distribution": self.repeat_distribution()
+        }
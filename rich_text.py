@@ -0,0 +1,112 @@
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Sequence
+
+# Text styles saved with a note, as character-offset ranges
+FORMAT_TAGS = ("bold", "italic", "bold_italic")
+
+
+def offsets_to_indices(text: str, offsets: Sequence[int]) -> List[str]:
+    """Tk "line.column" indices of character offsets into ``text``.
+
+    The offsets are visited in sorted order in one sweep, counting newlines
+    between neighbours with ``str.count``, so converting k offsets costs
+    O(n + k log k) instead of copying the text up to every offset.
+    """
+    indices = [""] * len(offsets)
+    line, line_start, position = 1, 0, 0
+    for slot in sorted(range(len(offsets)), key=offsets.__getitem__):
+        offset = offsets[slot]
+        newlines = text.count("\n", position, offset)
+        if newlines:
+            line += newlines
+            line_start = text.rindex("\n", position, offset) + 1
+        position = offset
+        indices[slot] = f"{line}.{offset - line_start}"
+    return indices
+
+
+def indices_to_offsets(text: str, indices: Sequence[Any]) -> List[int]:
+    """Character offsets into ``text`` of Tk "line.column" indices, clamped to the text.
+
+    One split of the text gives the line lengths; the indices are visited
+    in line order, summing the lengths between neighbouring lines.
+    """
+    lines = text.split("\n")
+    positions = []
+    for index in indices:
+        line, _, column = str(index).partition(".")
+        positions.append((int(line), int(column)))
+
+    offsets = [0] * len(positions)
+    line, line_start = 1, 0
+    for slot in sorted(range(len(positions)), key=positions.__getitem__):
+        target_line, column = positions[slot]
+        if target_line > line:
+            # Every skipped line also ends in a newline
+            line_start += sum(map(len, lines[line - 1:target_line - 1])) + target_line - line
+            line = target_line
+        offsets[slot] = min(line_start + column, len(text))
+    return offsets
+
+
+def normalize_formats(formats: Iterable[Dict[str, Any]], length: int) -> List[Dict[str, Any]]:
+    """Format ranges as sorted, non-overlapping runs per style.
+
+    Ranges are clamped to ``[0, length]``, empty or unreadable ones dropped
+    and overlapping or touching ranges of one style merged, so the stored
+    list is the run-length form of the formatting.
+    """
+    # Using dictionary of lists to group ranges by style
+    by_tag: Dict[str, List[Tuple[int, int]]] = {}
+    for fmt in formats:
+        try:
+            tag, start, end = fmt["tag"], max(int(fmt["start"]), 0), min(int(fmt["end"]), length)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if start < end:
+            by_tag.setdefault(tag, []).append((start, end))
+
+    runs: List[Dict[str, Any]] = []
+    for tag, spans in by_tag.items():
+        spans.sort()
+        run_start, run_end = spans[0]
+        for start, end in spans[1:]:
+            if start <= run_end:
+                run_end = max(run_end, end)
+                continue
+            runs.append({"tag": tag, "start": run_start, "end": run_end})
+            run_start, run_end = start, end
+        runs.append({"tag": tag, "start": run_start, "end": run_end})
+    return runs
+
+
+def formats_from_ranges(tag_ranges: Dict[str, Iterable[Any]], text: str, content_start: int = 0,
+                        content_length: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Format runs from Text ``tag_ranges`` results (flat start, end, start, end... indices).
+
+    ``text`` is the widget text the indices refer to. The saved content is
+    ``content_length`` characters of it from ``content_start``; offsets are
+    made relative to that and clamped to it.
+    """
+    tags: List[str] = []
+    indices: List[Any] = []
+    for tag, ranges in tag_ranges.items():
+        ranges = list(ranges)
+        pairs = len(ranges) // 2
+        tags.extend([tag] * pairs)
+        indices.extend(ranges[:pairs * 2])
+    offsets = indices_to_offsets(text, indices)
+    formats = [{"tag": tag, "start": offsets[2 * i] - content_start, "end": offsets[2 * i + 1] - content_start}
+               for i, tag in enumerate(tags)]
+    if content_length is None:
+        content_length = len(text) - content_start
+    return normalize_formats(formats, content_length)
+
+
+def index_pairs(formats: Iterable[Dict[str, Any]], text: str) -> Dict[str, List[str]]:
+    """Flat start/end Text indices per style, ready for one ``tag_add`` call per style"""
+    runs = normalize_formats(formats, len(text))
+    indices = offsets_to_indices(text, [offset for run in runs for offset in (run["start"], run["end"])])
+    pairs: Dict[str, List[str]] = {}
+    for i, run in enumerate(runs):
+        pairs.setdefault(run["tag"], []).extend(indices[2 * i:2 * i + 2])
+    return pairs
@@ -0,0 +1,403 @@
+import bisect
+import hashlib
+import math
+import re
+import threading
+from typing import Dict, List, Set, Tuple, Any, Optional, Iterable, Callable
+from base_app import JournaledJsonStorage, Change
+
+# Bumped whenever the tokenizer or the on-disk layout changes
+INDEX_VERSION = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FILTER_PATTERN = re.compile(r'(folder|tag):("[^"]*"|\S+)', re.IGNORECASE)
+
+# BM25 parameters and the extra weight given to words in the title
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 2
+
+# index_notes() batches larger than this are written as a single snapshot
+REBUILD_BATCH_SIZE = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def content_hash(content: str) -> str:
+    """Short digest of a note's text, saved with the note so an index can tell its copy is stale"""
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:20]
+
+
+def parse_query(query: str) -> Tuple[str, Optional[str], Set[str]]:
+    """Split 'folder:Python tag:Work loops' into (text, folder, tags)"""
+    folder = None
+    tags: Set[str] = set()
+    for key, value in FILTER_PATTERN.findall(query):
+        value = value.strip('"')
+        match key.lower():
+            case "folder":
+                folder = value
+            case "tag":
+                tags.add(value)
+    return FILTER_PATTERN.sub(" ", query).strip(), folder, tags
+
+
+class NoteSearchIndex:
+    """Persistent inverted index (token -> {note id: term frequency}) over the notes.
+
+    The index lives in its own journaled JSON file, so indexing one note only
+    appends that note's postings instead of rewriting the whole index.
+    Tags are kept per document rather than as postings, so retagging a note
+    does not need its content.
+    """
+    def __init__(self, filename: str = "notes_index.json"):
+        self._storage = JournaledJsonStorage(filename, indent=None)
+        self._lock = threading.RLock()
+
+        data = None
+        try:
+            data = self._storage.load()
+        except (IOError, ValueError) as e:
+            print(f"Error loading search index: {e}")
+        if not data or data.get("version") != INDEX_VERSION:
+            data = {"version": INDEX_VERSION, "docs": {}, "postings": {}}
+            self._storage.save(data)
+        self._data = data
+        self._docs: Dict[str, Dict[str, Any]] = data["docs"]
+        self._postings: Dict[str, Dict[str, int]] = data["postings"]
+
+        # Derived in memory only: sorted vocabulary for prefix lookups,
+        # lowercase tag -> note ids, and the total length for BM25
+        self._terms: List[str] = sorted(self._postings)
+        self._terms_sorted = True
+        self._tag_docs: Dict[str, Set[str]] = {}
+        self._total_len = 0
+        for doc_id, doc in self._docs.items():
+            self._total_len += doc["len"]
+            for tag in doc["tags"]:
+                self._tag_docs.setdefault(tag.lower(), set()).add(doc_id)
+
+#==================================================
+# Updates
+#==================================================
+    def index_note(self, note_id: str, folder: str, note: Dict[str, Any]) -> None:
+        """Add or re-index one note (its content must be loaded)"""
+        with self._lock:
+            self._storage.apply(self._data, self._index(note_id, folder, note))
+
+    def index_notes(self, notes: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Index many (note id, folder, note) triples at once.
+
+        Large batches (e.g. the first build) are saved as one snapshot rather
+        than one journal record per posting.
+        """
+        with self._lock:
+            changes: List[Change] = []
+            count = 0
+            for note_id, folder, note in notes:
+                changes.extend(self._index(note_id, folder, note, keep_sorted=False))
+                count += 1
+            # Sort the vocabulary once instead of inserting every new term in place
+            self._terms.sort()
+            self._terms_sorted = True
+            if count > REBUILD_BATCH_SIZE:
+                self._storage.save(self._data)
+            elif changes:
+                self._storage.apply(self._data, changes)
+
+    def _index(self, note_id: str, folder: str, note: Dict[str, Any],
+               keep_sorted: bool = True) -> List[Change]:
+        """Update the in-memory index for one note and return the changes to persist"""
+        counts: Dict[str, int] = {}
+        for token in tokenize(note.get("title", "")):
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(note.get("content", "")):
+            counts[token] = counts.get(token, 0) + 1
+
+        changes = self._remove_postings(note_id)
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = {note_id: tf}
+                if keep_sorted:
+                    bisect.insort(self._terms, term)
+                else:
+                    self._terms.append(term)
+                    self._terms_sorted = False
+                changes.append(("set", ("postings", term), {note_id: tf}))
+            else:
+                postings[note_id] = tf
+                changes.append(("set", ("postings", term, note_id), tf))
+
+        self._untrack_tags(note_id)
+        doc = {
+            "folder": folder,
+            "title": note.get("title", ""),
+            "tags": list(note.get("tags", [])),
+            "modified": note.get("last_modified", ""),
+            "hash": content_hash(note.get("content", "")),
+            "len": sum(counts.values()),
+            "terms": list(counts)
+        }
+        self._docs[note_id] = doc
+        self._total_len += doc["len"]
+        self._track_tags(note_id)
+        changes.append(("set", ("docs", note_id), doc))
+        return changes
+
+    def update_note_meta(self, note_id: str, folder: Optional[str] = None,
+                         tags: Optional[Iterable[str]] = None, modified: Optional[str] = None) -> None:
+        """Update the folder/tags of an indexed note without touching its postings"""
+        with self._lock:
+            doc = self._docs.get(note_id)
+            if doc is None:
+                return
+            self._untrack_tags(note_id)
+            if folder is not None:
+                doc["folder"] = folder
+            if tags is not None:
+                doc["tags"] = list(tags)
+            if modified is not None:
+                doc["modified"] = modified
+            self._track_tags(note_id)
+            self._storage.apply(self._data, [("set", ("docs", note_id), doc)])
+
+    def remove_note(self, note_id: str) -> None:
+        """Drop a note from the index"""
+        with self._lock:
+            if note_id not in self._docs:
+                return
+            changes = self._remove_postings(note_id)
+            self._untrack_tags(note_id)
+            del self._docs[note_id]
+            changes.append(("del", ("docs", note_id)))
+            self._storage.apply(self._data, changes)
+
+    def _remove_postings(self, note_id: str) -> List[Change]:
+        """Unlink a note from its postings lists and return the matching changes"""
+        doc = self._docs.get(note_id)
+        if doc is None:
+            return []
+        changes: List[Change] = []
+        self._total_len -= doc["len"]
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(note_id, None)
+            if postings:
+                changes.append(("del", ("postings", term, note_id)))
+            else:
+                del self._postings[term]
+                if self._terms_sorted:
+                    del self._terms[bisect.bisect_left(self._terms, term)]
+                else:
+                    self._terms.remove(term)
+                changes.append(("del", ("postings", term)))
+        return changes
+
+    def _track_tags(self, note_id: str) -> None:
+        for tag in self._docs[note_id]["tags"]:
+            self._tag_docs.setdefault(tag.lower(), set()).add(note_id)
+
+    def _untrack_tags(self, note_id: str) -> None:
+        doc = self._docs.get(note_id)
+        if doc is None:
+            return
+        for tag in doc["tags"]:
+            ids = self._tag_docs.get(tag.lower())
+            if ids is not None:
+                ids.discard(note_id)
+                if not ids:
+                    del self._tag_docs[tag.lower()]
+
+#==================================================
+# Queries
+#==================================================
+    def is_current(self, note_id: str, folder: str, note: Dict[str, Any]) -> bool:
+        """True if the indexed copy of a note matches its metadata.
+
+        The text is compared by the ``content_hash`` saved with the note, as
+        last_modified only has minute resolution; notes saved before hashes
+        were kept fall back to the modification time.
+        """
+        doc = self._docs.get(note_id)
+        if doc is None or doc["folder"] != folder or doc["title"] != note.get("title", ""):
+            return False
+        if "content_hash" in note:
+            same_text = doc["hash"] == note["content_hash"]
+        else:
+            same_text = doc["modified"] == note.get("last_modified", "")
+        return same_text and doc["tags"] == list(note.get("tags", []))
+
+    def doc(self, note_id: str) -> Optional[Dict[str, Any]]:
+        return self._docs.get(note_id)
+
+    def doc_ids(self) -> Set[str]:
+        with self._lock:
+            return set(self._docs)
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        """Vocabulary terms matching a query token"""
+        if not prefix:
+            return [token] if token in self._postings else []
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + "\uffff")
+        return self._terms[start:end]
+
+    def _tag_matches(self, token: str, prefix: bool) -> Set[str]:
+        """Notes carrying a tag that matches a query token"""
+        matched: Set[str] = set()
+        for tag, ids in self._tag_docs.items():
+            if tag == token or (prefix and tag.startswith(token)):
+                matched |= ids
+        return matched
+
+    def search(self, query: str, folder: Optional[str] = None, tags: Optional[Iterable[str]] = None,
+               limit: Optional[int] = 50, prefix: bool = True) -> List[Tuple[str, float]]:
+        """Rank notes for a query with BM25.
+
+        Every query word must match (AND). With ``prefix`` the last word also
+        matches longer words, and any word ending in '*' is always a prefix.
+        ``folder`` and ``tags`` restrict results to one folder / notes
+        carrying all of the given tags.
+        """
+        words = query.lower().split()
+        tokens: List[Tuple[str, bool]] = []
+        for i, word in enumerate(words):
+            is_prefix = word.endswith("*") or (prefix and i == len(words) - 1)
+            tokens.extend((token, is_prefix) for token in tokenize(word))
+        required_tags = {tag.lower() for tag in tags or ()}
+
+        with self._lock:
+            doc_count = len(self._docs)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count or 1.0
+
+            # Gather the postings each token expands to, then intersect
+            matches: List[Tuple[List[Tuple[float, Dict[str, int]]], Set[str]]] = []
+            for token, is_prefix in tokens:
+                weighted = []
+                docs: Set[str] = set()
+                for term in self._expand(token, is_prefix):
+                    postings = self._postings[term]
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                    weighted.append((idf, postings))
+                    docs.update(postings)
+                tag_docs = self._tag_matches(token, is_prefix)
+                if tag_docs:
+                    idf = math.log(1 + (doc_count - len(tag_docs) + 0.5) / (len(tag_docs) + 0.5))
+                    weighted.append((idf, dict.fromkeys(tag_docs, TITLE_WEIGHT)))
+                    docs |= tag_docs
+                matches.append((weighted, docs))
+
+            if matches:
+                matches.sort(key=lambda m: len(m[1]))
+                candidates = set(matches[0][1])
+                for _, docs in matches[1:]:
+                    candidates &= docs
+            else:
+                candidates = set(self._docs)
+            for tag in required_tags:
+                candidates &= self._tag_docs.get(tag, set())
+            if folder is not None:
+                candidates = {doc_id for doc_id in candidates if self._docs[doc_id]["folder"] == folder}
+
+            scores: Dict[str, float] = dict.fromkeys(candidates, 0.0)
+            for weighted, _ in matches:
+                for idf, postings in weighted:
+                    for doc_id in candidates if len(candidates) < len(postings) else postings:
+                        tf = postings.get(doc_id)
+                        if tf is None or doc_id not in scores:
+                            continue
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._docs[doc_id]["len"] / avg_len)
+                        scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._docs[item[0]]["title"]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def flush(self) -> None:
+        self._storage.flush()
+
+    def close(self) -> None:
+        self._storage.close()
+
+
+# (note id, folder, title) rows handed back to the UI
+SearchResult = Tuple[str, str, str]
+
+
+class SearchWorker:
+    """Runs index queries on a background thread, keeping only the newest one.
+
+    ``submit`` replaces any query that has not started yet and bumps the
+    generation; results of a query that was superseded while it ran are
+    dropped instead of being delivered. ``callback(generation, results)`` is
+    called on the worker thread, so UI code must hand the results over to the
+    Tk thread itself.
+    """
+    def __init__(self, index: NoteSearchIndex, callback: Callable[[int, List[SearchResult]], None]):
+        self._index = index
+        self._callback = callback
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[int, str, Optional[str], Set[str]]] = None
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def submit(self, query: str, folder: Optional[str] = None, tags: Optional[Iterable[str]] = None) -> int:
+        """Queue a query, superseding any earlier one, and return its generation"""
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, query, folder, set(tags or ()))
+            self._cond.notify()
+            return self._generation
+
+    def cancel(self) -> None:
+        """Drop the queued query and discard the results of a running one"""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                generation, query, folder, tags = self._pending
+                self._pending = None
+
+            try:
+                results: List[SearchResult] = []
+                for note_id, _ in self._index.search(query, folder=folder, tags=tags, limit=None):
+                    if not self.is_current(generation):
+                        break
+                    doc = self._index.doc(note_id)
+                    if doc is not None:
+                        results.append((note_id, doc["folder"], doc["title"]))
+            except Exception as e:
+                print(f"Error running search: {e}")
+                results = []
+            if self.is_current(generation):
+                self._callback(generation, results)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            self._cond.notify()
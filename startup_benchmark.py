@@ -0,0 +1,107 @@
+"""Measure cold-start times of the Student Assistant app.
+
+Each run starts a fresh interpreter so nothing is already imported, and records:
+
+    time-to-menu       process spawn -> main menu painted
+    time-to-first-app  button press  -> app painted (imports included)
+
+Usage: python startup_benchmark.py [--app "Notes Organizer"] [--runs 5] [--delay 1.0] [--no-warm]
+
+``--delay`` waits on the menu before opening the app, like a user would,
+which gives the warm-up imports time to run. Every run works on fresh copies
+of the data files in a temporary directory, so opening the apps never
+migrates or rewrites the real data. Needs a display.
+"""
+import argparse
+import json
+import glob
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Data files and directories the apps read, with their journals and databases
+DATA_PATTERNS = ("*_data.json", "*_data.json.*", "notes_data", "notes_images", "notes_index.json*",
+                 "notes_history.json*", "grade_scales.json", "student_assistant.db*")
+
+
+def copy_data(destination):
+    """Copy the app's data next to this script into ``destination``"""
+    for pattern in DATA_PATTERNS:
+        for path in glob.glob(os.path.join(HERE, pattern)):
+            target = os.path.join(destination, os.path.basename(path))
+            if os.path.isdir(path):
+                shutil.copytree(path, target)
+            else:
+                shutil.copy2(path, target)
+
+
+def run_child(app_name, delay, warm):
+    """Runs inside the spawned interpreter; prints its timestamps as JSON"""
+    import tkinter as tk
+    from main_menu import StudentAssistantApp
+
+    root = tk.Tk()
+    app = StudentAssistantApp(root, warm_imports=warm)
+    root.update()
+    menu_shown = time.time()
+
+    # Keep the event loop running while "the user" looks at the menu
+    deadline = time.monotonic() + delay
+    while time.monotonic() < deadline:
+        root.update()
+        time.sleep(0.01)
+
+    clicked = time.time()
+    app.switch_to_app(app_name)
+    root.update()
+    app_shown = time.time()
+
+    app.on_closing()
+    print(json.dumps({"menu_shown": menu_shown, "clicked": clicked, "app_shown": app_shown}))
+
+
+def run_once(app_name, delay, warm):
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--app", app_name, "--delay", str(delay)]
+    if not warm:
+        command.append("--no-warm")
+    with tempfile.TemporaryDirectory(prefix="startup_benchmark.") as data_dir:
+        copy_data(data_dir)
+        started = time.time()
+        output = subprocess.run(command, cwd=data_dir, capture_output=True, text=True, check=True).stdout
+    stamps = json.loads(output.strip().splitlines()[-1])
+    return stamps["menu_shown"] - started, stamps["app_shown"] - stamps["clicked"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="Notes Organizer")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--no-warm", dest="warm", action="store_false")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.app, args.delay, args.warm)
+        return
+
+    menu_times, app_times = [], []
+    for _ in range(args.runs):
+        menu, first_app = run_once(args.app, args.delay, args.warm)
+        menu_times.append(menu)
+        app_times.append(first_app)
+
+    print(f"{args.app}, {args.runs} runs, warm imports {'on' if args.warm else 'off'}")
+    for label, times in (("time-to-menu", menu_times), ("time-to-first-app", app_times)):
+        print(f"  {label:<18} median {statistics.median(times) * 1000:7.1f} ms"
+              f"  min {min(times) * 1000:7.1f} ms  max {max(times) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import re
+from typing import AbstractSet, List, Tuple, Any, Callable, Optional
+
+# Quoted names (for tags with spaces), parentheses or bare words
+TOKEN_PATTERN = re.compile(r'\s*(?:"([^"]*)"|(\()|(\))|([^\s()"]+))')
+
+OPERATORS = ("AND", "OR", "NOT")
+
+
+def tokenize(query: str) -> List[Tuple[str, str]]:
+    """Split a tag query into (kind, text) tokens: "tag", "op", "(" or ")"."""
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            raise ValueError("Unclosed quote in tag filter")
+        quoted, opening, closing, word = match.groups()
+        position = match.end()
+        if quoted is not None:
+            tokens.append(("tag", quoted))
+        elif opening:
+            tokens.append(("(", opening))
+        elif closing:
+            tokens.append((")", closing))
+        elif word.upper() in OPERATORS:
+            tokens.append(("op", word.upper()))
+        else:
+            tokens.append(("tag", word))
+    return tokens
+
+
+def parse_tag_query(query: str) -> Any:
+    """Parse 'Work AND NOT (Personal OR "Old stuff")' into a nested tuple tree.
+
+    Nodes are ("tag", name), ("not", node), ("and", [nodes]) and
+    ("or", [nodes]). NOT binds tighter than AND, AND tighter than OR, and
+    tags written side by side are ANDed. Raises ValueError on bad syntax.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        raise ValueError("Empty tag filter")
+    position = 0
+
+    def peek() -> Optional[Tuple[str, str]]:
+        return tokens[position] if position < len(tokens) else None
+
+    def parse_or() -> Any:
+        nonlocal position
+        terms = [parse_and()]
+        while peek() == ("op", "OR"):
+            position += 1
+            terms.append(parse_and())
+        return terms[0] if len(terms) == 1 else ("or", terms)
+
+    def parse_and() -> Any:
+        nonlocal position
+        terms = [parse_not()]
+        while True:
+            token = peek()
+            if token == ("op", "AND"):
+                position += 1
+            elif token is None or token[0] == ")" or token == ("op", "OR"):
+                break
+            terms.append(parse_not())
+        return terms[0] if len(terms) == 1 else ("and", terms)
+
+    def parse_not() -> Any:
+        nonlocal position
+        token = peek()
+        if token == ("op", "NOT"):
+            position += 1
+            return ("not", parse_not())
+        if token is None:
+            raise ValueError("Tag filter ends where a tag was expected")
+        position += 1
+        match token:
+            case ("tag", name):
+                return ("tag", name)
+            case ("(", _):
+                node = parse_or()
+                if peek() is None or peek()[0] != ")":
+                    raise ValueError("Missing ')' in tag filter")
+                position += 1
+                return node
+            case (_, text):
+                raise ValueError(f"Unexpected '{text}' in tag filter")
+
+    tree = parse_or()
+    if position < len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position][1]}' in tag filter")
+    return tree
+
+
+def evaluate(node: Any, tagged: Callable[[str], AbstractSet[str]],
+             everything: Callable[[], AbstractSet[str]]) -> AbstractSet[str]:
+    """Ids matching a parsed query.
+
+    ``tagged(name)`` returns the ids carrying a tag and ``everything()``
+    all ids. Neither is modified, so they can be the caller's own index
+    sets, and the result may be one of them; ``everything`` is only called
+    for a NOT with nothing to subtract it from. ANDs start from their
+    smallest positive set and subtract their NOT terms, so no complement is
+    built for "A AND NOT B".
+    """
+    match node:
+        case ("tag", name):
+            return tagged(name)
+        case ("not", child):
+            return everything() - evaluate(child, tagged, everything)
+        case ("or", children):
+            return set().union(*(evaluate(child, tagged, everything) for child in children))
+        case ("and", children):
+            positive = [evaluate(child, tagged, everything) for child in children if child[0] != "not"]
+            negative = [child[1] for child in children if child[0] == "not"]
+            if positive:
+                positive.sort(key=len)
+                result = positive[0]
+                for ids in positive[1:]:
+                    if not result:
+                        break
+                    # A new set no bigger than the smallest input
+                    result = result & ids
+            else:
+                result = everything()
+            for child in negative:
+                if not result:
+                    break
+                result = result - evaluate(child, tagged, everything)
+            return result
+    raise ValueError(f"Unknown tag filter node {node!r}")
@@ -0,0 +1,149 @@
+import os
+import queue
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional, Callable
+from image_store import ImageStore
+
+# PIL is imported on first use, keeping it out of the app's start-up imports
+
+# Longest edge, in pixels, of each cached thumbnail size
+THUMBNAIL_SIZES = (160, 320, 640)
+
+# PhotoImages kept in memory, counted as width * height * 4 bytes
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Decoder threads; decoding is mostly C code that releases the GIL
+DECODE_WORKERS = 2
+
+# Interval for collecting decoded thumbnails while requests are outstanding
+POLL_MS = 30
+
+ThumbnailKey = Tuple[str, int]
+
+
+class ThumbnailCache:
+    """Thumbnails of stored images, cached on disk and as PhotoImages in memory.
+
+    ``request`` returns a cached PhotoImage straight away, or queues the
+    thumbnail for a worker thread and later calls ``callback(photo)`` on the
+    Tk thread (``callback(None)`` if the image cannot be decoded). Blob ids
+    are content hashes, so thumbnails on disk never go stale.
+    """
+    def __init__(self, master, store: ImageStore, cache_dir: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MEMORY_BUDGET, workers: int = DECODE_WORKERS):
+        self._master = master
+        self._store = store
+        self.cache_dir = cache_dir or os.path.join(store.root, "thumbs")
+        self.max_bytes = max_bytes
+        self._photos: "OrderedDict[ThumbnailKey, Any]" = OrderedDict()  # PhotoImages
+        self._bytes = 0
+        self._callbacks: Dict[ThumbnailKey, List[Callable[[Any], None]]] = {}
+        self._done: "queue.Queue[Tuple[ThumbnailKey, Any]]" = queue.Queue()  # decoded PIL images
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._poll_id = None
+
+    @staticmethod
+    def size_for(width: int) -> int:
+        """Largest thumbnail size that fits in ``width`` pixels"""
+        fitting = [size for size in THUMBNAIL_SIZES if size <= width]
+        return fitting[-1] if fitting else THUMBNAIL_SIZES[0]
+
+    def thumbnail_path(self, image_id: str, size: int) -> str:
+        digest = os.path.splitext(image_id)[0]
+        return os.path.join(self.cache_dir, str(size), digest[:2], digest + ".png")
+
+    def request(self, image_id: str, size: int, callback: Callable[[Any], None]) -> Any:
+        """Return the thumbnail if it is in memory, otherwise load it and call ``callback`` later"""
+        key = (image_id, size)
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+
+        callbacks = self._callbacks.get(key)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return None
+        self._callbacks[key] = [callback]
+        self._executor.submit(self._decode, key)
+        if self._poll_id is None:
+            self._poll_id = self._master.after(POLL_MS, self._poll)
+        return None
+
+    def _decode(self, key: ThumbnailKey) -> None:
+        """Worker thread: read the thumbnail from disk, or build and save it"""
+        image_id, size = key
+        image = None
+        try:
+            from PIL import Image
+
+            path = self.thumbnail_path(image_id, size)
+            if os.path.exists(path):
+                image = Image.open(path)
+                image.load()
+            else:
+                image = Image.open(self._store.path(image_id))
+                image.draft("RGB", (size, size))  # Lets JPEG decode at reduced scale
+                image.thumbnail((size, size))
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                self._save(image, path)
+        except Exception as e:
+            # Any failure (e.g. a DecompressionBombError) just leaves the image unshown
+            print(f"Error loading thumbnail for {image_id}: {e}")
+            image = None
+        finally:
+            # Always answer, so the callbacks are released and polling stops
+            self._done.put((key, image))
+
+    def _save(self, image, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, format="PNG")
+            os.replace(tmp, path)
+        except OSError:
+            os.remove(tmp)
+            raise
+
+    def _poll(self) -> None:
+        """Tk thread: turn decoded thumbnails into PhotoImages and run the callbacks"""
+        from PIL import ImageTk
+
+        self._poll_id = None
+        while True:
+            try:
+                key, image = self._done.get_nowait()
+            except queue.Empty:
+                break
+            photo = None
+            if image is not None:
+                photo = ImageTk.PhotoImage(image, master=self._master)
+                self._remember(key, photo)
+            for callback in self._callbacks.pop(key, []):
+                callback(photo)
+        if self._callbacks:
+            self._poll_id = self._master.after(POLL_MS, self._poll)
+
+    def _remember(self, key: ThumbnailKey, photo) -> None:
+        """Add to the LRU and evict the least recently used photos over budget.
+
+        Evicted photos stay alive as long as a widget still holds them.
+        """
+        self._photos[key] = photo
+        self._bytes += photo.width() * photo.height() * 4
+        while self._bytes > self.max_bytes and len(self._photos) > 1:
+            _, old = self._photos.popitem(last=False)
+            self._bytes -= old.width() * old.height() * 4
+
+    def close(self) -> None:
+        if self._poll_id is not None:
+            self._master.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._callbacks.clear()
+        self._photos.clear()
+        self._bytes = 0
@@ -0,0 +1,274 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import List, Set, Tuple, Any, Optional, Iterable, Sequence
+
+# Modifier bits of a Tk event's state field
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+# Rows scrolled per mouse-wheel notch
+WHEEL_ROWS = 3
+
+
+class VirtualList(ttk.Frame):
+    """Scrollable list that only renders the rows currently in view.
+
+    Rows are tuples of column values kept in a Python list. The Treeview holds
+    one item per visible line ("slot") whose values are swapped as the list
+    scrolls, so loading, inserting or removing rows costs O(visible rows) of
+    widget work however long the list is. The calls mirror the Listbox ones
+    the apps already use (insert, delete, curselection, selection_set, see)
+    and <<ListboxSelect>> is generated when the user changes the selection.
+    """
+    def __init__(self, parent, columns: Sequence[Tuple[str, str, Optional[int]]],
+                 selectmode: str = "browse", height: int = 8, show_headings: bool = True, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._rows: List[Tuple[Any, ...]] = []
+        self._first = 0
+        self._shown = 0
+        self._selected: Set[int] = set()
+        self._anchor: Optional[int] = None
+        self._selectmode = selectmode
+        self._render_id = None
+
+        self.tree = ttk.Treeview(self, columns=[name for name, _, _ in columns],
+                                 show="headings" if show_headings else "", height=height)
+        for name, heading, width in columns:
+            self.tree.heading(name, text=heading)
+            if width is not None:
+                self.tree.column(name, width=width)
+        self._scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self._scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self._slots: List[str] = []
+        self._resize_slots(height)
+
+        # Widget bindings run before the Treeview class bindings; returning
+        # "break" keeps the Treeview from selecting slots on its own
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Configure>", lambda e: self._fit_slots())
+        self.tree.bind("<MouseWheel>", lambda e: self._scroll_by(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(WHEEL_ROWS))
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(key, lambda e, step=step: self._on_key(step))
+
+#==================================================
+# Model
+#==================================================
+    def set_rows(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        """Replace every row, clearing the selection and scrolling to the top"""
+        self._rows = list(rows)
+        self._first = 0
+        self._selected.clear()
+        self._anchor = None
+        self._schedule_render()
+
+    def insert(self, index, *rows: Tuple[Any, ...]) -> None:
+        """Insert rows before ``index`` (or at tk.END)"""
+        index = self._index(index, allow_end=True)
+        self._rows[index:index] = rows
+        self._shift(index, len(rows))
+        if index < self._first:
+            self._first += len(rows)  # Keep the rows in view where they are
+        self._schedule_render()
+
+    def delete(self, first, last=None) -> None:
+        """Delete the row at ``first``, or rows ``first``..``last`` inclusive"""
+        first = self._index(first)
+        last = first if last is None else self._index(last)
+        if not self._rows or last < first:
+            return
+        del self._rows[first:last + 1]
+        count = last - first + 1
+        self._selected = {i if i < first else i - count for i in self._selected if not first <= i <= last}
+        if self._anchor is not None and self._anchor >= first:
+            self._anchor = None if self._anchor <= last else self._anchor - count
+        if first < self._first:
+            self._first -= min(count, self._first - first)
+        self._schedule_render()
+
+    def set_row(self, index: int, row: Tuple[Any, ...]) -> None:
+        """Replace one row in place"""
+        self._rows[index] = row
+        if self._first <= index < self._first + len(self._slots):
+            self._schedule_render()
+
+    def get(self, index: int) -> Tuple[Any, ...]:
+        return self._rows[index]
+
+    def size(self) -> int:
+        return len(self._rows)
+
+    def _index(self, index, allow_end: bool = False) -> int:
+        if index == tk.END:
+            return len(self._rows) if allow_end else len(self._rows) - 1
+        return int(index)
+
+    def _shift(self, start: int, count: int) -> None:
+        """Move selected indices at or after ``start`` down by ``count`` rows"""
+        self._selected = {i + count if i >= start else i for i in self._selected}
+        if self._anchor is not None and self._anchor >= start:
+            self._anchor += count
+
+#==================================================
+# Selection
+#==================================================
+    def curselection(self) -> Tuple[int, ...]:
+        return tuple(sorted(self._selected))
+
+    def selection_set(self, index) -> None:
+        index = self._index(index)
+        if 0 <= index < len(self._rows):
+            if self._selectmode == "browse":
+                self._selected.clear()
+            self._selected.add(index)
+            self._anchor = index
+            self._schedule_render()
+
+    def selection_clear(self) -> None:
+        self._selected.clear()
+        self._anchor = None
+        self._schedule_render()
+
+    def see(self, index) -> None:
+        """Scroll so that row ``index`` is visible"""
+        index = self._index(index)
+        if index < self._first:
+            self._first = index
+        elif index >= self._first + len(self._slots):
+            self._first = index - len(self._slots) + 1
+        self._schedule_render()
+
+    def _on_click(self, event):
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None  # Let headings and column separators work as usual
+        self.tree.focus_set()
+        slot = self.tree.identify_row(event.y)
+        if not slot:
+            return "break"
+        index = self._first + self._slots.index(slot)
+
+        if self._selectmode == "extended" and event.state & CONTROL_MASK:
+            self._selected ^= {index}
+            self._anchor = index
+        elif self._selectmode == "extended" and event.state & SHIFT_MASK and self._anchor is not None:
+            low, high = sorted((self._anchor, index))
+            self._selected = set(range(low, high + 1))
+        else:
+            self._selected = {index}
+            self._anchor = index
+        self._selection_changed()
+        return "break"
+
+    def _on_key(self, step):
+        if not self._rows:
+            return "break"
+        current = self._anchor if self._anchor is not None else self._first - 1
+        # Using match expression for navigation keys
+        match step:
+            case "page":
+                index = current + len(self._slots)
+            case "-page":
+                index = current - len(self._slots)
+            case "home":
+                index = 0
+            case "end":
+                index = len(self._rows) - 1
+            case _:
+                index = current + step
+        index = max(0, min(index, len(self._rows) - 1))
+        self._selected = {index}
+        self._anchor = index
+        self.see(index)
+        self._selection_changed()
+        return "break"
+
+    def _selection_changed(self) -> None:
+        self._render()
+        self.event_generate("<<ListboxSelect>>")
+
+#==================================================
+# Rendering
+#==================================================
+    def yview(self, *args) -> None:
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        match args:
+            case ("moveto", fraction):
+                self._first = int(float(fraction) * len(self._rows))
+            case ("scroll", amount, "units"):
+                self._first += int(amount)
+            case ("scroll", amount, "pages"):
+                self._first += int(amount) * len(self._slots)
+        self._render()
+
+    def _scroll_by(self, rows: int):
+        self._first += rows
+        self._render()
+        return "break"
+
+    def _resize_slots(self, count: int) -> None:
+        """Create or drop Treeview items so there is one per visible line"""
+        while len(self._slots) < count:
+            slot = self.tree.insert("", tk.END, values=())
+            self.tree.detach(slot)  # _render attaches slots as rows fill them
+            self._slots.append(slot)
+        if len(self._slots) > count:
+            self.tree.delete(*self._slots[count:])
+            del self._slots[count:]
+            self._shown = min(self._shown, count)
+
+    def _fit_slots(self) -> None:
+        """Match the number of slots to the widget height once a row can be measured"""
+        if not self._shown:
+            return
+        bbox = self.tree.bbox(self._slots[0])
+        if not bbox:
+            return
+        _, top, _, row_height = bbox
+        count = max(1, (self.tree.winfo_height() - top) // row_height)
+        if count != len(self._slots):
+            self._resize_slots(count)
+            self._render()
+
+    def _schedule_render(self) -> None:
+        """Coalesce the changes made in one event-loop turn into one render"""
+        if self._render_id is None:
+            self._render_id = self.after_idle(self._render)
+
+    def _render(self) -> None:
+        if self._render_id is not None:
+            self.after_cancel(self._render_id)
+            self._render_id = None
+        count = len(self._rows)
+        self._first = max(0, min(self._first, count - len(self._slots)))
+        visible = min(len(self._slots), count - self._first)
+
+        # Slots past the end of the list are detached rather than blanked
+        for i in range(self._shown, visible):
+            self.tree.move(self._slots[i], "", i)
+        if visible < self._shown:
+            self.tree.detach(*self._slots[visible:self._shown])
+        self._shown = visible
+
+        selected_slots = []
+        for i in range(visible):
+            index = self._first + i
+            self.tree.item(self._slots[i], values=self._rows[index])
+            if index in self._selected:
+                selected_slots.append(self._slots[i])
+        self.tree.selection_set(selected_slots)
+
+        if count:
+            self._scrollbar.set(self._first / count, (self._first + visible) / count)
+        else:
+            self._scrollbar.set(0, 1)
+        self._fit_slots()
+
+    def destroy(self) -> None:
+        if self._render_id is not None:
+            self.after_cancel(self._render_id)
+            self._render_id = None
+        super().destroy()